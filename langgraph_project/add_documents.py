@@ -1,21 +1,26 @@
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from langchain_ollama import OllamaEmbeddings
-from langchain_chroma import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
+from vector_store import VECTOR_BACKEND, build_vectorstore
 
 # Load environment variables
 load_dotenv()
 
 # Constants
 DOCUMENTS_DIR = "documents"
-CHROMA_PERSIST_DIR = "./chroma_db"
 CHUNK_SIZE = 500  # Reduced chunk size for better granularity
 CHUNK_OVERLAP = 100  # Reduced overlap
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
+# Parallel PDF parsing (worker processes and per-file timeout in seconds)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSE_TIMEOUT = float(os.getenv("PARSE_TIMEOUT", "300"))
 
 
 def clean_text(text: str) -> str:
@@ -48,6 +53,16 @@ def enhance_metadata(doc: Document, file_path: str) -> Dict[str, Any]:
     return metadata
 
 
+def create_text_splitter() -> RecursiveCharacterTextSplitter:
+    """Create the text splitter used for ingestion."""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=len,
+        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
+    )
+
+
 def process_document(
     file_path: str, text_splitter: RecursiveCharacterTextSplitter
 ) -> List[Document]:
@@ -85,6 +100,55 @@ def process_document(
         return []
 
 
+def _process_document_worker(file_path: str) -> List[Document]:
+    """Process-pool entry point; builds its own splitter in the worker."""
+    return process_document(file_path, create_text_splitter())
+
+
+def parse_documents(pdf_files: List[str]) -> List[Document]:
+    """Parse PDFs across a process pool, keeping the input file order.
+
+    Files that exceed PARSE_TIMEOUT are skipped. A single file (or
+    PARSE_WORKERS <= 1) is parsed in-process.
+    """
+    if PARSE_WORKERS <= 1 or len(pdf_files) <= 1:
+        text_splitter = create_text_splitter()
+        return [
+            split
+            for file_path in pdf_files
+            for split in process_document(file_path, text_splitter)
+        ]
+
+    all_splits = []
+    timed_out = False
+    workers = min(PARSE_WORKERS, len(pdf_files))
+    print(f"Parsing with {workers} worker processes...")
+    # spawn avoids forking a process that may already hold threads/locks
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        futures = [
+            executor.submit(_process_document_worker, file_path)
+            for file_path in pdf_files
+        ]
+        for file_path, future in zip(pdf_files, futures):
+            try:
+                all_splits.extend(future.result(timeout=PARSE_TIMEOUT))
+            except FutureTimeoutError:
+                timed_out = True
+                print(f"Timed out processing {file_path} after {PARSE_TIMEOUT}s")
+            except Exception as e:
+                print(f"Error processing {file_path}: {str(e)}")
+    finally:
+        if timed_out:
+            # Running tasks cannot be cancelled; stop hung workers so the script can exit
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=not timed_out, cancel_futures=True)
+    return all_splits
+
+
 def add_documents(directory_path: str):
     """Add documents from a directory to the vector store with improved processing."""
     # Initialize embeddings
@@ -92,14 +156,6 @@ def add_documents(directory_path: str):
         model=OLLAMA_MODEL, base_url="http://localhost:11434"
     )
 
-    # Initialize text splitter with smaller chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        length_function=len,
-        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
-    )
-
     # Create documents directory if it doesn't exist
     if not os.path.exists(directory_path):
         os.makedirs(directory_path)
@@ -107,8 +163,7 @@ def add_documents(directory_path: str):
         print("Please add PDF documents to this directory and run this command again.")
         return
 
-    # Process documents
-    all_splits = []
+    # Collect PDF files
     pdf_files = []
 
     # First, collect all PDF files
@@ -116,6 +171,7 @@ def add_documents(directory_path: str):
         for file in files:
             if file.endswith(".pdf"):
                 pdf_files.append(os.path.join(root, file))
+    pdf_files.sort()
 
     if not pdf_files:
         print("No PDF documents found in the specified directory.")
@@ -123,10 +179,8 @@ def add_documents(directory_path: str):
 
     print(f"\nFound {len(pdf_files)} PDF files to process.")
 
-    # Process each document
-    for file_path in pdf_files:
-        splits = process_document(file_path, text_splitter)
-        all_splits.extend(splits)
+    # Process documents in parallel (results keep the sorted file order)
+    all_splits = parse_documents(pdf_files)
 
     if not all_splits:
         print("No valid content extracted from documents.")
@@ -134,28 +188,9 @@ def add_documents(directory_path: str):
 
     print(f"\nTotal chunks created: {len(all_splits)}")
 
-    # Initialize and update vector store
-    print("\nUpdating vector store...")
-    vectorstore = Chroma(
-        collection_name="rag_docs",
-        embedding_function=embeddings,
-        persist_directory=CHROMA_PERSIST_DIR,
-    )
-
-    # Clear existing documents
-    vectorstore.delete_collection()
-    vectorstore = Chroma(
-        collection_name="rag_docs",
-        embedding_function=embeddings,
-        persist_directory=CHROMA_PERSIST_DIR,
-    )
-
-    # Add documents in batches
-    batch_size = 50
-    for i in range(0, len(all_splits), batch_size):
-        batch = all_splits[i : i + batch_size]
-        vectorstore.add_documents(batch)
-        print(f"Added batch {i//batch_size + 1}/{(len(all_splits)-1)//batch_size + 1}")
+    # Replace the vector store contents (Chroma or FAISS, selected by VECTOR_BACKEND)
+    print(f"\nUpdating vector store ({VECTOR_BACKEND})...")
+    build_vectorstore(all_splits, embeddings, batch_size=50)
 
     print(f"\nSuccessfully added {len(all_splits)} document chunks to the vector store")
 
@@ -0,0 +1,146 @@
+"""
+Embedding cache wrapper that removes repeated embedding calls to Ollama.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize unicode (NFC) and whitespace for cache key computation."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class CachedEmbeddings(Embeddings):
+    """Cache embeddings keyed by a hash of (model name + normalized text).
+
+    - Memory: keeps at most `max_entries` vectors in LRU order.
+    - Disk (optional): when `disk_path` is given, vectors are persisted to SQLite.
+    """
+
+    def __init__(
+        self,
+        base: Embeddings,
+        model_name: str,
+        max_entries: int = 1024,
+        disk_path: Optional[str] = None,
+    ):
+        self.base = base
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+            self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model_name}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                return vector
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        vector = np.frombuffer(row[0], dtype=np.float32).tolist()
+        self._remember(key, vector, persist=False)
+        return vector
+
+    def _remember(self, key: str, vector: List[float], persist: bool = True) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+            if persist and self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        (key, np.asarray(vector, dtype=np.float32).tobytes()),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"[EMBED CACHE] disk write failed: {e}")
+
+    def _lookup_many(self, texts: List[str]):
+        found: Dict[int, List[float]] = {}
+        missing: Dict[str, List[int]] = OrderedDict()
+        for idx, key in enumerate(self._key(text) for text in texts):
+            vector = self._get(key)
+            if vector is not None:
+                found[idx] = vector
+            else:
+                # Embed duplicated texts within one request only once
+                missing.setdefault(key, []).append(idx)
+        self.hits += len(found)
+        self.misses += len(missing)
+        missing_texts = [texts[indexes[0]] for indexes in missing.values()]
+        return found, missing, missing_texts
+
+    def _merge(self, size: int, found, missing, vectors) -> List[List[float]]:
+        for (key, indexes), vector in zip(missing.items(), vectors):
+            self._remember(key, vector)
+            for idx in indexes:
+                found[idx] = vector
+        return [found[idx] for idx in range(size)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        found, missing, missing_texts = self._lookup_many(texts)
+        vectors = self.base.embed_documents(missing_texts) if missing_texts else []
+        return self._merge(len(texts), found, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        vector = self.base.embed_query(text)
+        self._remember(key, vector)
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        found, missing, missing_texts = self._lookup_many(texts)
+        vectors = (
+            await self.base.aembed_documents(missing_texts) if missing_texts else []
+        )
+        return self._merge(len(texts), found, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        vector = await self.base.aembed_query(text)
+        self._remember(key, vector)
+        return vector
@@ -12,16 +12,18 @@ from langchain_core.messages import (
     BaseMessage,
     HumanMessage,
 )
-from langchain_chroma import Chroma
 from langchain_ollama import ChatOllama, OllamaEmbeddings
 from langgraph.graph import END, StateGraph
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import os
 
+from embedding_cache import CachedEmbeddings
+from vector_store import open_vectorstore, search_with_vectors
+
 # Load environment variables
 load_dotenv()
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")
 
 
 # State definition
@@ -51,98 +53,97 @@ llm = ChatOllama(
 3. 필요한 경우 예시나 실제 사례를 포함하세요.""",
 )
 
-embeddings = OllamaEmbeddings(
-    model=OLLAMA_MODEL,
+# Wrap embeddings with a cache so repeated queries are embedded only once.
+embeddings = CachedEmbeddings(
+    OllamaEmbeddings(
+        model=OLLAMA_MODEL,
+    ),
+    model_name=OLLAMA_MODEL,
+    max_entries=4096,
+    disk_path=EMBEDDING_CACHE_PATH,
 )
 
-# Initialize vector store
-vectorstore = Chroma(
-    collection_name="rag_docs",
-    embedding_function=embeddings,
-    persist_directory="./chroma_db",
-)
+# Initialize vector store (Chroma or FAISS, selected by VECTOR_BACKEND)
+vectorstore = open_vectorstore(embeddings)
 
 
-def rerank_documents(
-    query: str, docs: List[Document], scores: List[float], k: int = 5
-) -> List[Document]:
-    """Rerank documents using a more sophisticated approach."""
-    # 1. Calculate query embedding
-    query_embedding = embeddings.embed_query(query)
-
-    # 2. Get document embeddings
-    doc_embeddings = [embeddings.embed_query(doc.page_content) for doc in docs]
-
-    # 3. Calculate semantic similarity scores
-    semantic_scores = cosine_similarity([query_embedding], doc_embeddings)[0]
-
-    # 4. Calculate content length scores (normalize by max length)
-    lengths = [len(doc.page_content.split()) for doc in docs]
-    max_length = max(lengths) if lengths else 1
-    length_scores = [length / max_length for length in lengths]
-
-    # 5. Calculate metadata relevance scores
-    metadata_scores = []
-    for doc in docs:
-        score = 0
-        if doc.metadata:
-            # Add score for having metadata
-            score += 0.2
-            # Add score for specific metadata fields
-            if "source" in doc.metadata:
-                score += 0.3
-            if "page" in doc.metadata:
-                score += 0.3
-        metadata_scores.append(score)
-
-    # 6. Combine scores with weights
-    final_scores = []
-    for i in range(len(docs)):
-        score = (
-            0.5 * semantic_scores[i]  # Semantic similarity
-            + 0.2 * scores[i]  # Original similarity
-            + 0.2 * length_scores[i]  # Content length
-            + 0.1 * metadata_scores[i]  # Metadata presence
-        )
-        final_scores.append(score)
-
-    # 7. Sort and return top k documents
-    ranked_pairs = sorted(zip(final_scores, docs), reverse=True)
-    return [doc for _, doc in ranked_pairs[:k]]
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
 
 
-def filter_similar_chunks(
-    docs: List[Document], threshold: float = 0.8
+def rerank_documents(
+    query_vector: np.ndarray,
+    docs: List[Document],
+    doc_vectors: np.ndarray,
+    scores: List[float],
+    k: int = 5,
+    diversity: float = 0.3,
 ) -> List[Document]:
-    """Filter out very similar document chunks."""
+    """Rerank documents by fused relevance with MMR-style diverse selection.
+
+    Uses the stored chunk vectors, so no embedding calls are made here.
+    """
     if not docs:
         return []
+    doc_vectors = _normalize_rows(doc_vectors)
+    query_vector = _normalize_rows(query_vector[np.newaxis, :])[0]
+
+    # 1. Semantic similarity to the query
+    semantic_scores = doc_vectors @ query_vector
+
+    # 2. Content length scores (normalize by max length)
+    lengths = np.array([len(doc.page_content.split()) for doc in docs], dtype=float)
+    length_scores = lengths / max(lengths.max(), 1.0)
+
+    # 3. Metadata relevance scores
+    has_metadata = np.array([bool(doc.metadata) for doc in docs], dtype=float)
+    has_source = np.array([("source" in doc.metadata) for doc in docs], dtype=float)
+    has_page = np.array([("page" in doc.metadata) for doc in docs], dtype=float)
+    metadata_scores = 0.2 * has_metadata + 0.3 * has_source + 0.3 * has_page
+
+    # 4. Combine scores with weights
+    relevance = (
+        0.5 * semantic_scores  # Semantic similarity
+        + 0.2 * np.asarray(scores, dtype=float)  # Original similarity
+        + 0.2 * length_scores  # Content length
+        + 0.1 * metadata_scores  # Metadata presence
+    )
 
-    # Get embeddings for all documents
-    embeddings_list = [embeddings.embed_query(doc.page_content) for doc in docs]
-
-    # Calculate similarity matrix
-    similarity_matrix = cosine_similarity(embeddings_list)
+    # 5. MMR greedy selection on the precomputed similarity matrix
+    similarity = doc_vectors @ doc_vectors.T
+    selected: List[int] = []
+    max_sim_to_selected = np.zeros(len(docs))
+    available = np.ones(len(docs), dtype=bool)
+    for _ in range(min(k, len(docs))):
+        mmr = (1 - diversity) * relevance - diversity * max_sim_to_selected
+        mmr[~available] = -np.inf
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        available[best] = False
+        max_sim_to_selected = np.maximum(max_sim_to_selected, similarity[best])
+    return [docs[i] for i in selected]
 
-    # Keep track of documents to remove
-    to_remove = set()
 
-    # Check each pair of documents
-    for i in range(len(docs)):
-        if i in to_remove:
-            continue
-        for j in range(i + 1, len(docs)):
-            if j in to_remove:
-                continue
-            if similarity_matrix[i][j] > threshold:
-                # Keep the longer document
-                if len(docs[i].page_content) < len(docs[j].page_content):
-                    to_remove.add(i)
-                else:
-                    to_remove.add(j)
+def filter_similar_chunks(
+    docs: List[Document], doc_vectors: np.ndarray, threshold: float = 0.8
+) -> List[int]:
+    """Return indices of chunks to keep, dropping near-duplicates.
 
-    # Return filtered documents
-    return [doc for i, doc in enumerate(docs) if i not in to_remove]
+    Longer chunks are preferred: chunks are visited from longest to shortest and
+    kept only if their cosine similarity to every kept chunk is <= threshold.
+    """
+    if not docs:
+        return []
+    similarity = _normalize_rows(doc_vectors) @ _normalize_rows(doc_vectors).T
+    order = np.argsort([-len(doc.page_content) for doc in docs], kind="stable")
+    kept = np.zeros(len(docs), dtype=bool)
+    for i in order:
+        if not (similarity[i, kept] > threshold).any():
+            kept[i] = True
+    return [i for i in range(len(docs)) if kept[i]]
 
 
 # Retrieval function
@@ -151,15 +152,17 @@ def retrieve(state: GraphState) -> GraphState:
     query = state["query"]
     print(f"\n[검색 중...] 질문: {query}")
 
-    # 1. Initial search with high k value
-    search_results = vectorstore.similarity_search_with_score(
-        query, k=15  # Get more initial results
+    # 1. Initial search with high k value, returning the stored chunk vectors
+    # so filtering/reranking need no further embedding calls
+    query_vector = np.asarray(embeddings.embed_query(query), dtype=float)
+    results = search_with_vectors(
+        vectorstore, query_vector, k=15  # Get more initial results
     )
 
     print("\n[디버그] 검색 결과 상세:")
-    docs_with_scores = []
-    for doc, score in search_results:
-        similarity = 1 - score  # Convert distance to similarity
+    docs, scores, vectors = [], [], []
+    for doc, distance, vector in results:
+        similarity = 1 - distance  # Convert distance to similarity
         if similarity > 0.2:  # Lower threshold for initial filtering
             print(f"\n문서 유사도: {similarity:.2%}")
             # Extract source filename from path if available
@@ -170,20 +173,26 @@ def retrieve(state: GraphState) -> GraphState:
             print(f"출처: {source}")
             print(f"페이지: {page}")
             print(f"내용 미리보기: {doc.page_content[:200]}...")
-            docs_with_scores.append((doc, similarity))
+            docs.append(doc)
+            scores.append(similarity)
+            vectors.append(vector)
 
-    if not docs_with_scores:
+    if not docs:
         print("\n[주의] 관련성 높은 문서를 찾지 못했습니다.")
         state["context"] = []
         return state
 
-    # 2. Filter similar chunks
-    docs = [doc for doc, _ in docs_with_scores]
-    scores = [score for _, score in docs_with_scores]
-    filtered_docs = filter_similar_chunks(docs)
+    # 2. Filter similar chunks (scores and vectors stay aligned with kept docs)
+    doc_vectors = np.asarray(vectors, dtype=float)
+    keep = filter_similar_chunks(docs, doc_vectors)
 
     # 3. Rerank documents
-    reranked_docs = rerank_documents(query, filtered_docs, scores)
+    reranked_docs = rerank_documents(
+        query_vector,
+        [docs[i] for i in keep],
+        doc_vectors[keep],
+        [scores[i] for i in keep],
+    )
 
     if reranked_docs:
         print(f"\n[검색 완료] {len(reranked_docs)}개의 관련 문서를 찾았습니다.")
@@ -0,0 +1,163 @@
+"""
+Vector store backends for the RAG demo: Chroma (default) or an in-process FAISS HNSW index.
+
+- chroma: persistent Chroma collection in `CHROMA_PERSIST_DIR`.
+- faiss: HNSW index (optionally float16-compressed) saved as an on-disk snapshot in
+  `FAISS_INDEX_DIR` and memory-mapped on load so the OS page cache holds the vectors.
+  Requires `faiss-cpu`.
+
+Select the backend with `VECTOR_BACKEND=chroma|faiss`; the HNSW graph is tuned with
+`HNSW_M`, `HNSW_EF_CONSTRUCTION` and `HNSW_EF_SEARCH`.
+"""
+
+import logging
+import os
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "rag_docs"
+CHROMA_PERSIST_DIR = "./chroma_db"
+FAISS_INDEX_DIR = os.getenv("FAISS_INDEX_DIR", "./faiss_index")
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+HNSW_M = int(os.getenv("HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+# none | fp16 (halves index memory with negligible recall loss)
+FAISS_COMPRESSION = os.getenv("FAISS_COMPRESSION", "none").lower()
+FAISS_MMAP = os.getenv("FAISS_MMAP", "true").lower() == "true"
+
+
+def _new_hnsw_index(dim: int):
+    import faiss
+
+    if FAISS_COMPRESSION == "fp16":
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_fp16, HNSW_M)
+    else:
+        index = faiss.IndexHNSWFlat(dim, HNSW_M)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    return index
+
+
+def open_vectorstore(embeddings: Embeddings):
+    """Open the configured vector store for querying (None if no FAISS snapshot exists yet)."""
+    if VECTOR_BACKEND == "faiss":
+        if not os.path.exists(os.path.join(FAISS_INDEX_DIR, "index.faiss")):
+            logger.warning(
+                "No FAISS snapshot in %s; run add_documents.py first", FAISS_INDEX_DIR
+            )
+            return None
+        import faiss
+        from langchain_community.vectorstores import FAISS
+
+        # The snapshot and docstore pickle are written by build_vectorstore() below
+        vectorstore = FAISS.load_local(
+            FAISS_INDEX_DIR, embeddings, allow_dangerous_deserialization=True
+        )
+        if FAISS_MMAP:
+            flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+            vectorstore.index = faiss.read_index(
+                os.path.join(FAISS_INDEX_DIR, "index.faiss"), flag
+            )
+        vectorstore.index.hnsw.efSearch = HNSW_EF_SEARCH
+        return vectorstore
+
+    from langchain_chroma import Chroma
+
+    return Chroma(
+        collection_name=COLLECTION_NAME,
+        embedding_function=embeddings,
+        persist_directory=CHROMA_PERSIST_DIR,
+    )
+
+
+def build_vectorstore(
+    documents: Sequence[Document], embeddings: Embeddings, batch_size: int = 50
+) -> None:
+    """Replace the stored collection with `documents`, embedding them in batches."""
+    batches = range(0, len(documents), batch_size)
+    if VECTOR_BACKEND == "faiss":
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+
+        vectorstore = None
+        for i in batches:
+            batch = list(documents[i : i + batch_size])
+            if vectorstore is None:
+                vectors = embeddings.embed_documents([d.page_content for d in batch])
+                vectorstore = FAISS(
+                    embedding_function=embeddings,
+                    index=_new_hnsw_index(len(vectors[0])),
+                    docstore=InMemoryDocstore(),
+                    index_to_docstore_id={},
+                )
+                vectorstore.add_embeddings(
+                    [(d.page_content, v) for d, v in zip(batch, vectors)],
+                    metadatas=[d.metadata for d in batch],
+                )
+            else:
+                vectorstore.add_documents(batch)
+            print(f"Added batch {i//batch_size + 1}/{len(batches)}")
+        if vectorstore is not None:
+            # save_local writes index.faiss + index.pkl, replacing the previous snapshot
+            vectorstore.save_local(FAISS_INDEX_DIR)
+        return
+
+    from langchain_chroma import Chroma
+
+    vectorstore = Chroma(
+        collection_name=COLLECTION_NAME,
+        embedding_function=embeddings,
+        persist_directory=CHROMA_PERSIST_DIR,
+    )
+    # Clear existing documents
+    vectorstore.delete_collection()
+    vectorstore = Chroma(
+        collection_name=COLLECTION_NAME,
+        embedding_function=embeddings,
+        persist_directory=CHROMA_PERSIST_DIR,
+    )
+    for i in batches:
+        vectorstore.add_documents(list(documents[i : i + batch_size]))
+        print(f"Added batch {i//batch_size + 1}/{len(batches)}")
+
+
+def search_with_vectors(
+    vectorstore, query_vector: Sequence[float], k: int
+) -> List[Tuple[Document, float, np.ndarray]]:
+    """Return (document, squared L2 distance, stored vector) for the k nearest chunks.
+
+    The stored vectors let callers filter/rerank without re-embedding the chunks.
+    """
+    if vectorstore is None:
+        return []
+    query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+    if VECTOR_BACKEND == "faiss":
+        distances, labels = vectorstore.index.search(query, k)
+        results = []
+        for label, distance in zip(labels[0], distances[0]):
+            if label < 0:
+                continue
+            doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(label)])
+            vector = vectorstore.index.reconstruct(int(label))
+            results.append((doc, float(distance), vector))
+        return results
+
+    results = vectorstore._collection.query(
+        query_embeddings=query.tolist(),
+        n_results=k,
+        include=["documents", "metadatas", "distances", "embeddings"],
+    )
+    return [
+        (Document(page_content=text, metadata=metadata or {}), distance, vector)
+        for text, metadata, distance, vector in zip(
+            results["documents"][0],
+            results["metadatas"][0],
+            results["distances"][0],
+            results["embeddings"][0],
+        )
+    ]
@@ -9,12 +9,15 @@ from pydantic import ValidationError
 
 from app.core.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
-    authenticate_user,
+    aauthenticate_user,
+    acreate_new_user,
+    aupdate_password,
     create_access_token,
-    create_new_user,
+    get_current_user,
+    password_hasher,
 )
 from app.core.database import get_db
-from app.core.models import Token, User, UserCreate
+from app.core.models import PasswordChange, Token, User, UserCreate
 
 router = APIRouter()
 
@@ -25,7 +28,7 @@ async def login_for_access_token(
     db: Session = Depends(get_db),
 ) -> dict:
     """로그인하여 액세스 토큰을 발급받습니다."""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await aauthenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,7 +49,7 @@ async def register_user(
 ) -> User:
     """새로운 사용자를 등록합니다."""
     try:
-        return create_new_user(db, user_data.email, user_data.password)
+        return await acreate_new_user(db, user_data.email, user_data.password)
     except ValidationError as ve:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -57,3 +60,25 @@ async def register_user(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(ve),
         )
+
+
+@router.post("/password")
+async def change_password(
+    password_data: PasswordChange,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> dict:
+    """현재 비밀번호를 확인한 뒤 비밀번호를 변경합니다.
+
+    변경 후에는 해당 사용자의 캐시된 토큰 검증 결과가 폐기됩니다.
+    """
+    valid, _ = await password_hasher.verify_and_update(
+        password_data.current_password, current_user.hashed_password
+    )
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect password",
+        )
+    await aupdate_password(db, current_user.email, password_data.new_password)
+    return {"result": "비밀번호가 변경되었습니다."}
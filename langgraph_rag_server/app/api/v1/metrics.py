@@ -0,0 +1,49 @@
+"""서버 내부 상태(스케줄러 대기열 등) 지표를 제공하는 API 모듈입니다."""
+
+from app.api.v1.rag import get_current_user_api
+from app.core import chunk_cache, rag_engine
+from app.core.auth import password_hasher, user_cache
+from app.core.config import METRICS_ADMIN_EMAILS
+from app.core.database import pool_stats
+from app.core.models import User
+from app.core.ollama_pool import ollama_pool
+from app.core.scheduler import scheduler
+from app.core.services import ServiceContainer, provide_services
+from fastapi import APIRouter, Depends, HTTPException, status
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics(
+    current_user: User = Depends(get_current_user_api),
+    services: ServiceContainer = Depends(provide_services),
+):
+    """서버 내부 지표를 반환합니다.
+
+    Ollama 요청 스케줄러, 엔드포인트 풀, LLM 생성 공유, 인증 캐시, 비밀번호 해싱,
+    DB 연결 풀, 공유 청크 캐시, 벡터 인덱스 현황을 포함합니다.
+    로그인이 필요하며, `METRICS_ADMIN_EMAILS`가 지정되어 있으면 해당 사용자만 조회할 수 있습니다.
+    """
+    if METRICS_ADMIN_EMAILS and current_user.email.lower() not in METRICS_ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="지표를 조회할 권한이 없습니다.",
+        )
+    return {
+        "scheduler": scheduler.stats(),
+        "ollama_pool": ollama_pool.stats(),
+        "llm_singleflight": rag_engine.llm_flight_stats(),
+        "auth_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "db_pool": pool_stats(),
+        "chunk_cache": chunk_cache.stats(),
+        "vector_index": _vector_index_stats(services),
+    }
+
+
+def _vector_index_stats(services: ServiceContainer) -> dict:
+    return {
+        "backend": services.vector_backend,
+        "faiss_indexes": services.faiss_indexes.stats(),
+    }
@@ -1,11 +1,15 @@
 """RAG API 엔드포인트를 정의하는 모듈입니다."""
 
-from typing import Any, Dict, Optional
+import json
+from typing import AsyncIterator, Optional
 
 from app.core import rag_engine
 from app.core.auth import get_current_user
 from app.core.models import User
+from app.core.scheduler import GENERATE, scheduler
+from app.core.services import ServiceContainer, provide_services
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 from app.core.database import get_db
@@ -20,6 +24,7 @@ class QueryRequest(BaseModel):
 
     question: str
     thinking_mode: Optional[bool] = True
+    stream: Optional[bool] = False
 
 
 async def get_current_user_api(
@@ -54,11 +59,32 @@ async def get_current_user_api(
     )
 
 
+async def _ndjson_events(
+    question: str, user_id: str, thinking_mode: bool, services: ServiceContainer
+) -> AsyncIterator[str]:
+    """스트리밍 이벤트를 NDJSON 줄 단위로 직렬화합니다."""
+    async for event in rag_engine.astream_answer(
+        question, user_id, thinking_mode=thinking_mode, services=services
+    ):
+        if not thinking_mode:
+            if event["type"] == "think":
+                continue
+            if event["type"] == "done":
+                event["think"] = ""
+        yield json.dumps(event, ensure_ascii=False) + "\n"
+
+
 @router.post("/query")
 async def rag_query(
-    request: Request, query_request: QueryRequest, db: Session = Depends(get_db)
-) -> Dict[str, Any]:
-    """질문에 대해 RAG 기반 답변을 반환합니다."""
+    request: Request,
+    query_request: QueryRequest,
+    db: Session = Depends(get_db),
+    services: ServiceContainer = Depends(provide_services),
+):
+    """질문에 대해 RAG 기반 답변을 반환합니다.
+    stream=true이면 NDJSON(application/x-ndjson) 형식으로 토큰을 스트리밍합니다.
+    Ollama 요청 대기열이 가득 차면 429와 Retry-After 헤더로 응답합니다.
+    """
     # 입력값 검증: 길이 제한 및 공백만 입력 방지
     q = query_request.question
     if not (1 <= len(q.strip()) <= 300):
@@ -73,11 +99,21 @@ async def rag_query(
     thinking_mode = (
         query_request.thinking_mode if query_request.thinking_mode is not None else True
     )
-    answer = rag_engine.answer(q, current_user.id, thinking_mode=thinking_mode)
+    if query_request.stream:
+        # 스트림이 시작되면 상태 코드를 바꿀 수 없으므로 대기열이 가득 찼는지 미리 확인
+        scheduler.check(GENERATE)
+        return StreamingResponse(
+            _ndjson_events(q, current_user.id, thinking_mode, services),
+            media_type="application/x-ndjson",
+        )
+    answer = await rag_engine.aanswer(
+        q, current_user.id, thinking_mode=thinking_mode, services=services
+    )
     think_value = answer.get("think", "") if thinking_mode else ""
     sources_value = answer.get("sources", [])
     return {
         "answer": answer["answer"],
         "think": think_value,
         "sources": sources_value,
+        "context_stats": answer.get("context_stats", {}),
     }
@@ -1,20 +1,26 @@
 """인증 관련 유틸리티 함수를 제공하는 모듈입니다."""
 
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
 from uuid import uuid4
 
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import EmailStr
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
 from app.core.models import TokenData, User, UserDB
+from app.core.password_hasher import PasswordHasher
 
 # .env 파일 로드
 load_dotenv()
@@ -23,18 +29,115 @@ load_dotenv()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key")  # 기본값 설정
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# 검증된 토큰 -> 사용자 캐시 (유지 시간(초), 최대 토큰 수)
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+# bcrypt 라운드 수, 해싱 전용 스레드 수, 최대 대기 요청 수
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))
+BCRYPT_QUEUE_LIMIT = int(os.getenv("BCRYPT_QUEUE_LIMIT", "32"))
 
 # CryptContext 설정 수정
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12,  # bcrypt 라운드 수 설정
+    bcrypt__rounds=BCRYPT_ROUNDS,  # bcrypt 라운드 수 설정
+    # 저장된 해시의 라운드 수가 설정과 다르면 로그인 시 재해싱
+    bcrypt__min_desired_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=BCRYPT_ROUNDS,
     bcrypt__ident="2b",  # bcrypt 식별자 설정
 )
+# async 핸들러에서는 이벤트 루프를 막지 않도록 전용 스레드 풀에서 해싱/검증
+password_hasher = PasswordHasher(pwd_context, BCRYPT_WORKERS, BCRYPT_QUEUE_LIMIT)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
 
+class TokenUserCache:
+    """검증된 JWT와 조회한 사용자를 짧은 시간 동안 보관하는 LRU 캐시입니다.
+
+    - 캐시 적중 시 JWT 디코딩과 사용자 DB 조회를 모두 건너뜁니다.
+    - 항목은 `ttl_seconds`와 토큰 만료 시각 중 먼저 도래하는 시점에 만료됩니다.
+    - 로그아웃/비밀번호 변경 시 `invalidate_token`/`invalidate_user`로 즉시 제거합니다.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # 토큰 -> (사용자, 만료 시각(time.time() 기준))
+        self._entries: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+        # 이메일 -> 해당 사용자의 캐시된 토큰 목록
+        self._tokens_by_email: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if time.time() >= expires_at:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def put(self, token: str, user: User, token_exp: Optional[float]) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (user, expires_at)
+            self._tokens_by_email.setdefault(user.email, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            self._remove(token)
+
+    def invalidate_user(self, email: str) -> None:
+        with self._lock:
+            for token in list(self._tokens_by_email.get(email, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_email.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_email.get(entry[0].email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_email[entry[0].email]
+
+
+user_cache = TokenUserCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """비밀번호를 검증합니다."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -53,6 +156,20 @@ def get_user(db: Session, email: str) -> Optional[User]:
     return None
 
 
+async def aget_user(db: Session, email: str) -> Optional[User]:
+    """get_user()의 비동기 버전입니다.
+
+    비동기 엔진(asyncpg)이 설정되어 있으면 비동기 세션으로 조회하고,
+    아니면 전달받은 동기 세션으로 스레드 풀에서 조회하여 이벤트 루프를 막지 않습니다.
+    """
+    if AsyncSessionLocal is None:
+        return await run_in_threadpool(get_user, db, email)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(UserDB).where(UserDB.email == email))
+        user = result.scalars().first()
+        return User.model_validate(user) if user else None
+
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """사용자 인증을 수행합니다."""
     user = get_user(db, email)
@@ -63,6 +180,29 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     return user
 
 
+async def aauthenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    """authenticate_user()의 비동기 버전입니다.
+
+    bcrypt 검증은 전용 스레드 풀에서 수행하며, 라운드 수 설정이 바뀐 경우
+    로그인에 성공한 시점에 새 설정으로 재해싱하여 저장합니다.
+    """
+    user = await aget_user(db, email)
+    if not user:
+        password_hasher.record_login(False)
+        return None
+    valid, new_hash = await password_hasher.verify_and_update(
+        password, user.hashed_password
+    )
+    if not valid:
+        password_hasher.record_login(False)
+        return None
+    if new_hash:
+        await _astore_password_hash(db, email, new_hash)
+        user = user.model_copy(update={"hashed_password": new_hash})
+    password_hasher.record_login(True, rehashed=bool(new_hash))
+    return user
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """JWT 액세스 토큰을 생성합니다."""
     to_encode = data.copy()
@@ -78,7 +218,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ) -> User:
-    """현재 인증된 사용자를 반환합니다."""
+    """현재 인증된 사용자를 반환합니다.
+
+    최근에 검증한 토큰이면 캐시된 사용자를 바로 반환합니다.
+    """
+    cached = user_cache.get(token)
+    if cached is not None:
+        return cached
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -92,23 +238,83 @@ async def get_current_user(
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = get_user(db, email=token_data.email)
+    user = await aget_user(db, email=token_data.email)
     if user is None:
         raise credentials_exception
+    user_cache.put(token, user, payload.get("exp"))
     return user
 
 
+def _store_password_hash(db: Session, email: str, hashed_password: str) -> None:
+    db.query(UserDB).filter(UserDB.email == email).update(
+        {UserDB.hashed_password: hashed_password},
+        synchronize_session=False,
+    )
+    db.commit()
+    # 캐시된 사용자 정보에 이전 해시가 남아 있으므로 폐기
+    user_cache.invalidate_user(email)
+
+
+async def _astore_password_hash(db: Session, email: str, hashed_password: str) -> None:
+    if AsyncSessionLocal is None:
+        await run_in_threadpool(_store_password_hash, db, email, hashed_password)
+        return
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(UserDB)
+            .where(UserDB.email == email)
+            .values(hashed_password=hashed_password)
+        )
+        await session.commit()
+    user_cache.invalidate_user(email)
+
+
+def update_password(db: Session, email: str, password: str) -> None:
+    """사용자의 비밀번호를 변경하고, 캐시된 토큰 검증 결과를 폐기합니다."""
+    _store_password_hash(db, email, get_password_hash(password))
+
+
+async def aupdate_password(db: Session, email: str, password: str) -> None:
+    """update_password()의 비동기 버전입니다. 해싱은 전용 스레드 풀에서 수행합니다."""
+    await _astore_password_hash(db, email, await password_hasher.hash(password))
+
+
+def _ensure_email_available(db: Session, email: str) -> None:
+    if get_user(db, email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+
+
 def create_new_user(db: Session, email: EmailStr, password: str) -> User:
     """새 사용자를 생성합니다."""
     # 이메일 중복 확인
-    if get_user(db, email):
+    _ensure_email_available(db, email)
+    return _insert_user(db, email, get_password_hash(password))
+
+
+async def acreate_new_user(db: Session, email: EmailStr, password: str) -> User:
+    """create_new_user()의 비동기 버전입니다.
+
+    해싱은 전용 스레드 풀에서, DB 조회/저장은 aget_user()와 같은 방식으로 수행합니다.
+    """
+    if await aget_user(db, email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
+    hashed_password = await password_hasher.hash(password)
+    if AsyncSessionLocal is None:
+        return await run_in_threadpool(_insert_user, db, email, hashed_password)
+    async with AsyncSessionLocal() as session:
+        db_user = UserDB(id=str(uuid4()), email=email, hashed_password=hashed_password)
+        session.add(db_user)
+        await session.commit()
+        return User.model_validate(db_user)
+
 
-    # 새 사용자 생성
-    hashed_password = get_password_hash(password)
+def _insert_user(db: Session, email: str, hashed_password: str) -> User:
     db_user = UserDB(
         id=str(uuid4()),
         email=email,
@@ -0,0 +1,90 @@
+"""업로드된 PDF 원본을 내용 해시(SHA-256) 기준으로 한 부만 보관하는 모듈입니다.
+
+- 원본은 `BLOB_DIR/<해시 앞 2자리>/<해시>.pdf`에 한 번만 저장하고,
+  사용자 폴더(`DOCUMENTS_DIR/<user_id>/<파일명>`)에는 그 원본의 하드 링크를 만듭니다.
+  같은 PDF를 여러 사용자가 올려도 디스크에는 한 부만 남습니다.
+- 하드 링크를 만들 수 없는 파일 시스템에서는 복사본으로 대체합니다.
+- 사용자 파일을 삭제하거나 같은 이름에 다른 내용을 덮어쓸 때, 이전 원본을 참조하는 링크가
+  더 없으면 원본도 삭제합니다.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from typing import Optional
+from uuid import uuid4
+
+from app.core.config import BLOB_DIR
+from app.core.document_ingest import compute_file_hash
+
+logger = logging.getLogger(__name__)
+
+# 원본 생성/삭제와 링크 수 확인이 서로 끼어들지 않도록 직렬화
+_lock = threading.Lock()
+
+
+def blob_path(file_hash: str) -> str:
+    """내용 해시에 해당하는 원본 경로를 반환합니다."""
+    return os.path.join(BLOB_DIR, file_hash[:2], f"{file_hash}.pdf")
+
+
+def _link_or_copy(source: str, dest_path: str) -> None:
+    # 임시 이름으로 링크한 뒤 교체하여 같은 이름의 기존 파일도 원자적으로 덮어씀
+    temp_path = os.path.join(os.path.dirname(dest_path), f".{uuid4().hex}.link")
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    try:
+        os.replace(temp_path, dest_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _remove_if_orphaned(path: str) -> None:
+    try:
+        # 링크 수가 1이면 원본 자신만 남은 것
+        if os.stat(path).st_nlink == 1:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _replaced_blob(dest_path: str, file_hash: str) -> Optional[str]:
+    """`dest_path`가 다른 내용의 원본에 링크되어 있으면 그 원본 경로를 반환합니다."""
+    if not os.path.exists(dest_path):
+        return None
+    old_path = blob_path(compute_file_hash(dest_path))
+    if old_path == blob_path(file_hash) or not os.path.exists(old_path):
+        return None
+    # 복사본으로 저장된 파일은 링크 수로 참조 여부를 알 수 없으므로 원본을 건드리지 않음
+    return old_path if os.path.samefile(old_path, dest_path) else None
+
+
+def store(temp_path: str, file_hash: str, dest_path: str) -> None:
+    """수신한 임시 파일을 원본 저장소에 넣고 `dest_path`에 링크합니다.
+
+    같은 내용의 원본이 이미 있으면 임시 파일은 버리고 기존 원본을 링크합니다.
+    같은 이름의 파일을 다른 내용으로 덮어쓰면, 이전 원본은 더 이상 참조되지 않을 때 삭제합니다.
+    """
+    path = blob_path(file_hash)
+    with _lock:
+        old_path = _replaced_blob(dest_path, file_hash)
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.move(temp_path, path)
+        _link_or_copy(path, dest_path)
+        if old_path is not None:
+            _remove_if_orphaned(old_path)
+
+
+def remove_document(file_path: str, file_hash: str) -> None:
+    """사용자 파일을 삭제하고, 더 이상 참조되지 않는 원본도 함께 삭제합니다."""
+    path = blob_path(file_hash)
+    with _lock:
+        os.remove(file_path)
+        _remove_if_orphaned(path)
@@ -0,0 +1,161 @@
+"""같은 PDF의 청크와 임베딩을 사용자 간에 공유하는 디스크 캐시 모듈입니다.
+
+키는 (파일 내용 해시, 파서 버전/분할 설정, 임베딩 모델)로 정해지므로 누가 올린 파일인지와
+무관하게 같은 PDF는 한 번만 파싱/임베딩합니다. 다른 사용자가 같은 PDF를 올리면 캐시된
+벡터를 그 사용자의 컬렉션에 그 사용자의 메타데이터(원본 경로, 파일명, user_id)로 복사하므로
+컬렉션 단위의 사용자 격리는 그대로 유지됩니다.
+
+항목은 `CHUNK_CACHE_DIR/<키>.npy`(float32 벡터)와 `<키>.json`(청크 텍스트, 사용자 무관
+메타데이터, 페이지 수)으로 저장하며, 최대 `CHUNK_CACHE_MAX_ENTRIES`개를 넘으면 가장 오래
+사용하지 않은 항목부터 삭제합니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.core.config import (
+    CHUNK_CACHE_DIR,
+    CHUNK_CACHE_ENABLED,
+    CHUNK_CACHE_MAX_ENTRIES,
+    OLLAMA_EMBEDDING_MODEL,
+)
+from app.core.pdf_parser import (
+    SOURCE_METADATA_KEYS,
+    chunk_params_fingerprint,
+    set_source_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "saved": 0, "evicted": 0}
+
+
+class CachedChunks:
+    """캐시에서 읽은 파일 하나의 청크 텍스트/메타데이터/벡터입니다."""
+
+    def __init__(self, texts: List[str], metadatas: List[dict], vectors, pages: int):
+        self.texts = texts
+        self.metadatas = metadatas
+        self.vectors = vectors
+        self.pages = pages
+
+    def to_documents(self, file_path: str, user_id: Optional[str] = None) -> List[Document]:
+        """청크를 업로드한 사용자의 메타데이터를 붙인 문서 목록으로 만듭니다."""
+        documents = []
+        for text, metadata in zip(self.texts, self.metadatas):
+            doc = Document(page_content=text, metadata=dict(metadata))
+            set_source_metadata(doc, file_path, user_id)
+            documents.append(doc)
+        return documents
+
+
+def cache_key(file_hash: str) -> str:
+    """파일 해시, 파서/분할 설정, 임베딩 모델로 캐시 키를 만듭니다."""
+    raw = f"{file_hash}:{chunk_params_fingerprint()}:{OLLAMA_EMBEDDING_MODEL}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _paths(key: str) -> Tuple[str, str]:
+    base = os.path.join(CHUNK_CACHE_DIR, key)
+    return f"{base}.json", f"{base}.npy"
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _lock:
+        _stats[name] += amount
+
+
+def load(file_hash: str) -> Optional[CachedChunks]:
+    """캐시된 청크를 읽습니다. 없거나 손상되었으면 None을 반환합니다."""
+    if not CHUNK_CACHE_ENABLED:
+        return None
+    json_path, npy_path = _paths(cache_key(file_hash))
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        vectors = np.load(npy_path)
+        if len(vectors) != len(data["texts"]) or len(data["metadatas"]) != len(
+            data["texts"]
+        ):
+            raise ValueError("청크 수와 벡터 수가 다릅니다.")
+        # 최근 사용 시각을 갱신하여 정리 순서를 LRU로 유지
+        os.utime(json_path)
+    except FileNotFoundError:
+        _count("misses")
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"[CHUNK CACHE] 손상된 항목을 무시합니다: {json_path} ({e})")
+        _count("misses")
+        return None
+    _count("hits")
+    return CachedChunks(data["texts"], data["metadatas"], vectors, data.get("pages", 0))
+
+
+def save(
+    file_hash: str,
+    docs: Sequence[Document],
+    vectors: Sequence[Sequence[float]],
+    pages: int,
+) -> None:
+    """파일 하나의 청크와 벡터를 사용자 관련 메타데이터를 빼고 저장합니다."""
+    if not CHUNK_CACHE_ENABLED or not docs or len(docs) != len(vectors):
+        return
+    os.makedirs(CHUNK_CACHE_DIR, exist_ok=True)
+    json_path, npy_path = _paths(cache_key(file_hash))
+    tmp = uuid4().hex
+    data = {
+        "pages": pages,
+        "texts": [doc.page_content for doc in docs],
+        "metadatas": [
+            {k: v for k, v in doc.metadata.items() if k not in SOURCE_METADATA_KEYS}
+            for doc in docs
+        ],
+    }
+    # 벡터 파일을 먼저 교체하여 json이 보이면 벡터도 준비되어 있도록 함
+    with open(f"{npy_path}.{tmp}.tmp", "wb") as f:
+        np.save(f, np.asarray(vectors, dtype=np.float32))
+    os.replace(f"{npy_path}.{tmp}.tmp", npy_path)
+    with open(f"{json_path}.{tmp}.tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(f"{json_path}.{tmp}.tmp", json_path)
+    _count("saved")
+    _evict()
+
+
+def _evict() -> None:
+    entries = []
+    for name in os.listdir(CHUNK_CACHE_DIR):
+        if name.endswith(".json"):
+            path = os.path.join(CHUNK_CACHE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), name[: -len(".json")]))
+            except FileNotFoundError:
+                continue
+    excess = len(entries) - max(0, CHUNK_CACHE_MAX_ENTRIES)
+    if excess <= 0:
+        return
+    for _, key in sorted(entries)[:excess]:
+        for path in _paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    _count("evicted", excess)
+
+
+def stats() -> dict:
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
@@ -2,6 +2,7 @@
 
 import os
 import shutil
+from typing import Dict
 
 from dotenv import load_dotenv
 
@@ -14,11 +15,34 @@ PROJECT_ROOT = os.path.abspath(os.path.join(__file__, "../../../"))
 # 폴더 경로 상수 정의
 CHROMA_PERSIST_DIR = os.path.join(PROJECT_ROOT, "data", "chroma_db")
 DOCUMENTS_DIR = os.path.join(PROJECT_ROOT, "data", "documents")
+LEXICAL_INDEX_DIR = os.path.join(PROJECT_ROOT, "data", "lexical_index")
+# 업로드 PDF 원본(내용 해시별 1부)과 사용자 간 공유 청크/임베딩 캐시
+BLOB_DIR = os.path.join(PROJECT_ROOT, "data", "blobs")
+CHUNK_CACHE_DIR = os.path.join(PROJECT_ROOT, "data", "chunk_cache")
+# FAISS 벡터 인덱스 백엔드의 컬렉션별 인덱스 스냅샷/청크 저장소
+VECTOR_INDEX_DIR = os.path.join(PROJECT_ROOT, "data", "vector_index")
 STATIC_DIR = os.path.join(PROJECT_ROOT, "app", "static")
 TEMPLATES_DIR = os.path.join(PROJECT_ROOT, "app", "templates")
 
-FOLDER_PATHS = [CHROMA_PERSIST_DIR, DOCUMENTS_DIR, STATIC_DIR, TEMPLATES_DIR]
-FOLDER_CLEAR = [CHROMA_PERSIST_DIR, DOCUMENTS_DIR]
+FOLDER_PATHS = [
+    CHROMA_PERSIST_DIR,
+    DOCUMENTS_DIR,
+    LEXICAL_INDEX_DIR,
+    BLOB_DIR,
+    CHUNK_CACHE_DIR,
+    VECTOR_INDEX_DIR,
+    STATIC_DIR,
+    TEMPLATES_DIR,
+]
+# 키워드 색인은 벡터스토어 내용과 함께 초기화되어야 함 (인덱싱 기록 테이블은 lifespan에서 초기화)
+# 원본 저장소는 사용자 문서 폴더와 함께 초기화하고, 청크 캐시는 내용 해시 기준이므로 유지
+FOLDER_CLEAR = [
+    CHROMA_PERSIST_DIR,
+    VECTOR_INDEX_DIR,
+    DOCUMENTS_DIR,
+    LEXICAL_INDEX_DIR,
+    BLOB_DIR,
+]
 
 print(f"PROJECT_ROOT: {PROJECT_ROOT}")
 print(f"CHROMA_PERSIST_DIR: {CHROMA_PERSIST_DIR}")
@@ -51,3 +75,137 @@ def clear_directories():
 OLLAMA_LLM_MODEL = os.getenv("OLLAMA_LLM_MODEL")
 OLLAMA_EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL")
+# 여러 Ollama 엔드포인트에 요청을 분산할 때 쉼표로 구분하여 지정 (없으면 OLLAMA_BASE_URL 하나만 사용)
+OLLAMA_BASE_URLS = [
+    url.strip() for url in os.getenv("OLLAMA_BASE_URLS", "").split(",") if url.strip()
+] or [OLLAMA_BASE_URL]
+# 엔드포인트 헬스 체크 주기(초), 엔드포인트별 최대 HTTP 연결 수,
+# 모델이 이미 로드된 엔드포인트를 우선 사용할 때 허용하는 처리 중 요청 수 차이
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "15"))
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "16"))
+OLLAMA_AFFINITY_SLACK = int(os.getenv("OLLAMA_AFFINITY_SLACK", "2"))
+
+
+def _duration_seconds(value: str) -> int:
+    """30m, 1h, 45s, 600 형식의 기간을 초 단위 정수로 변환합니다. (-1은 그대로 유지)"""
+    value = value.strip().lower()
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+# 요청 후 모델을 메모리에 유지할 시간 ("30m", "1h", 초 단위 정수, -1이면 계속 유지)
+OLLAMA_KEEP_ALIVE = _duration_seconds(os.getenv("OLLAMA_KEEP_ALIVE", "30m"))
+# 앱 시작 시 LLM/임베딩 모델을 미리 로드하고 고정 지시문을 프리필할지 여부
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "true").lower() == "true"
+
+# 벡터스토어 저장 방식: per_user(사용자별 컬렉션) 또는 shared(모든 사용자를 N개 공유 컬렉션에
+# 나눠 저장하고 user_id 메타데이터로 필터링). 공유 컬렉션 수를 바꾸면 문서를 다시 인덱싱해야 함
+VECTORSTORE_MODE = os.getenv("VECTORSTORE_MODE", "per_user").lower()
+VECTORSTORE_SHARDS = max(1, int(os.getenv("VECTORSTORE_SHARDS", "1")))
+
+# 벡터 인덱스 백엔드: chroma(기본) 또는 faiss(프로세스 내 HNSW, faiss-cpu 설치 필요)
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "chroma").lower()
+# FAISS HNSW 설정 (노드당 연결 수 M, 구축/검색 시 후보 수 ef)
+VECTOR_INDEX_HNSW_M = int(os.getenv("VECTOR_INDEX_HNSW_M", "32"))
+VECTOR_INDEX_EF_CONSTRUCTION = int(os.getenv("VECTOR_INDEX_EF_CONSTRUCTION", "200"))
+VECTOR_INDEX_EF_SEARCH = int(os.getenv("VECTOR_INDEX_EF_SEARCH", "64"))
+# 벡터 압축: none(float32), fp16(절반 크기), pq(곱 양자화, 학습용 벡터가 충분할 때만 적용)
+VECTOR_INDEX_COMPRESSION = os.getenv("VECTOR_INDEX_COMPRESSION", "none").lower()
+VECTOR_INDEX_PQ_M = int(os.getenv("VECTOR_INDEX_PQ_M", "0"))  # 0이면 차원/8에 맞춰 자동 선택
+VECTOR_INDEX_PQ_MIN_TRAIN = int(os.getenv("VECTOR_INDEX_PQ_MIN_TRAIN", "10000"))
+# 디스크 스냅샷을 메모리 매핑(mmap)으로 열어 여러 워커가 페이지 캐시를 공유하도록 함
+VECTOR_INDEX_MMAP = os.getenv("VECTOR_INDEX_MMAP", "true").lower() == "true"
+# 삭제/덮어쓰기로 남은 죽은 벡터 비율이 이 값을 넘으면 스냅샷 저장 시 인덱스를 재구축
+VECTOR_INDEX_COMPACT_RATIO = float(os.getenv("VECTOR_INDEX_COMPACT_RATIO", "0.2"))
+
+# 벡터스토어 핸들 풀 설정
+VECTORSTORE_POOL_SIZE = int(os.getenv("VECTORSTORE_POOL_SIZE", "64"))
+VECTORSTORE_POOL_IDLE_SECONDS = float(os.getenv("VECTORSTORE_POOL_IDLE_SECONDS", "600"))
+
+# 비동기 RAG 질의 경로 설정 (벡터 검색용 스레드 수 및 최대 대기 요청 수)
+RAG_SEARCH_WORKERS = int(os.getenv("RAG_SEARCH_WORKERS", "4"))
+RAG_SEARCH_MAX_PENDING = int(os.getenv("RAG_SEARCH_MAX_PENDING", "32"))
+
+# 시맨틱 답변 캐시 설정 (질문 임베딩 코사인 유사도 기반)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "200"))
+
+# 질문 임베딩 캐시 설정 (메모리 LRU 크기, 디스크 캐시 사용 여부 및 경로)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_DISK = os.getenv("EMBEDDING_CACHE_DISK", "false").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH", os.path.join(PROJECT_ROOT, "data", "embedding_cache.sqlite3")
+)
+
+# 사용자 간 공유 청크/임베딩 캐시 (사용 여부, 최대 보관 파일 수)
+CHUNK_CACHE_ENABLED = os.getenv("CHUNK_CACHE_ENABLED", "true").lower() == "true"
+CHUNK_CACHE_MAX_ENTRIES = int(os.getenv("CHUNK_CACHE_MAX_ENTRIES", "1000"))
+
+# 백그라운드 인덱싱 작업 설정 (워커 스레드 수, 진행 상황 DB 기록 최소 간격(초))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_PROGRESS_INTERVAL = float(os.getenv("INGEST_PROGRESS_INTERVAL", "1.0"))
+
+# PDF 파싱 프로세스 풀 설정 (워커 프로세스 수, 파일당 제한 시간(초))
+INGEST_PARSE_WORKERS = int(
+    os.getenv("INGEST_PARSE_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+INGEST_PARSE_TIMEOUT = float(os.getenv("INGEST_PARSE_TIMEOUT", "300"))
+
+# 인덱싱 임베딩 파이프라인 설정 (동시 임베딩 요청 수, 배치 크기 범위/초기값,
+# 배치당 목표 지연 시간(초), 배치 재시도 횟수)
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_BATCH_MIN = int(os.getenv("EMBED_BATCH_MIN", "8"))
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "256"))
+EMBED_BATCH_INITIAL = int(os.getenv("EMBED_BATCH_INITIAL", "32"))
+EMBED_TARGET_LATENCY = float(os.getenv("EMBED_TARGET_LATENCY", "2.0"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "3"))
+
+# 하이브리드 검색 설정 (키워드 BM25 + 벡터 검색을 RRF로 결합)
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+# 벡터/키워드 검색에서 각각 가져올 후보 수, LLM에 전달할 최종 청크 수, RRF 상수
+RAG_CANDIDATE_K = int(os.getenv("RAG_CANDIDATE_K", "20"))
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# 프롬프트 컨텍스트 조립 설정 (문서 컨텍스트 최대 추정 토큰 수,
+# 최고 점수 대비 이 비율 미만인 청크는 제외)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2500"))
+CONTEXT_MIN_SCORE_RATIO = float(os.getenv("CONTEXT_MIN_SCORE_RATIO", "0.4"))
+
+
+def _class_map(value: str) -> Dict[str, int]:
+    """generate:4,query_embed:4 형식의 작업 종류별 정수 설정을 딕셔너리로 변환합니다."""
+    result = {}
+    for item in value.split(","):
+        if ":" in item:
+            key, number = item.split(":", 1)
+            result[key.strip()] = int(number)
+    return result
+
+
+# Ollama 요청 스케줄러 설정 (전체 동시 실행 수, 작업 종류별 가중치/동시 실행 상한/대기열 길이)
+# 작업 종류: generate(질의응답 생성), query_embed(질문 임베딩), ingest_embed(인덱싱 임베딩)
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "4"))
+SCHEDULER_WEIGHTS = _class_map(
+    os.getenv("SCHEDULER_WEIGHTS", "generate:4,query_embed:6,ingest_embed:1")
+)
+SCHEDULER_CLASS_CONCURRENCY = _class_map(
+    os.getenv(
+        "SCHEDULER_CLASS_CONCURRENCY", "generate:3,query_embed:4,ingest_embed:2"
+    )
+)
+SCHEDULER_QUEUE_LIMITS = _class_map(
+    os.getenv("SCHEDULER_QUEUE_LIMITS", "generate:16,query_embed:64,ingest_embed:64")
+)
+
+# 서버 지표 API(/api/v1/metrics) 접근을 허용할 사용자 이메일 (쉼표로 구분)
+# 비어 있으면 로그인한 모든 사용자가 조회할 수 있음
+METRICS_ADMIN_EMAILS = {
+    email.strip().lower()
+    for email in os.getenv("METRICS_ADMIN_EMAILS", "").split(",")
+    if email.strip()
+}
@@ -0,0 +1,169 @@
+"""검색된 청크를 토큰 예산에 맞춰 프롬프트 컨텍스트로 조립하는 모듈입니다.
+
+1. 최고 점수 대비 `min_score_ratio` 미만인 청크를 제외합니다.
+2. 점수 순으로 토큰 예산(`budget_tokens`) 안에 들어가는 청크만 고릅니다.
+   비용은 이미 고른 청크와의 오버랩을 잘라낸 뒤의 길이로 계산합니다.
+3. 고른 청크끼리만 같은 파일/페이지에서 청크 분할 오버랩(200자)으로 중복된 앞부분을
+   잘라내고, 다른 청크에 완전히 포함된 청크는 제외합니다. 고르지 않은 청크와의 오버랩은
+   자르지 않으므로 잘라낸 내용이 프롬프트에서 사라지지 않습니다.
+4. 고른 청크를 문서 순서(파일명, 페이지, 시작 위치)로 정렬합니다. 같은 청크 집합이면
+   점수가 조금 달라도 항상 같은 프롬프트가 만들어져 Ollama의 프롬프트 KV 캐시를 재사용할 수 있습니다.
+"""
+
+import math
+import re
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+CONTEXT_SEPARATOR = "\n---\n"
+# start_index가 없는 (이전에 인덱싱된) 청크에서 텍스트로 오버랩을 찾을 때의 최소 길이
+MIN_TEXT_OVERLAP = 30
+
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 추정합니다. (한글 1글자 ≈ 1토큰, 그 외 4글자 ≈ 1토큰)"""
+    hangul = len(_HANGUL_RE.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def _text_overlap(previous: str, current: str) -> int:
+    """previous의 끝과 current의 시작이 겹치는 길이를 반환합니다."""
+    limit = min(len(previous), len(current))
+    for size in range(limit, MIN_TEXT_OVERLAP - 1, -1):
+        if previous.endswith(current[:size]):
+            return size
+    return 0
+
+
+def _overlap(other: Document, doc: Document) -> Tuple[int, int]:
+    """doc의 본문에서 other와 겹치는 (앞부분 길이, 뒷부분 길이)를 반환합니다."""
+    text = doc.page_content
+    other_start = other.metadata.get("start_index")
+    start = doc.metadata.get("start_index")
+    if isinstance(other_start, int) and isinstance(start, int):
+        # 문서 순서로 정렬되어 있으므로 other는 항상 doc보다 앞에서 시작
+        other_end = other_start + len(other.page_content)
+        return max(0, min(other_end - start, len(text))), 0
+    if text in other.page_content:
+        return len(text), 0
+    # 위치 정보가 없으면 앞/뒤 어느 쪽이 겹치는지 텍스트로 확인
+    head = _text_overlap(other.page_content, text)
+    if head:
+        return head, 0
+    return 0, _text_overlap(text, other.page_content)
+
+
+def _location(doc: Document) -> Tuple[str, int]:
+    page = doc.metadata.get("page", 0)
+    return (
+        str(doc.metadata.get("source") or doc.metadata.get("filename", "")),
+        page if isinstance(page, int) else 0,
+    )
+
+
+def _document_order(doc: Document) -> Tuple[str, int, int]:
+    source, page = _location(doc)
+    start = doc.metadata.get("start_index", -1)
+    return source, page, start if isinstance(start, int) else -1
+
+
+def _context_tokens(chunks: List[Tuple[Document, float]]) -> int:
+    return estimate_tokens(
+        CONTEXT_SEPARATOR.join(doc.page_content for doc, _ in chunks)
+    )
+
+
+def _trim_overlaps(
+    chunks: List[Tuple[Document, float]],
+) -> Tuple[List[Tuple[Document, float]], int, int]:
+    """문서 순서로 훑으며 같은 파일/페이지의 앞 청크와 겹치는 부분을 잘라냅니다.
+
+    반환값은 (문서 순서로 정렬된 (청크, 점수) 목록, 제외된 청크 수, 잘라낸 청크 수)입니다.
+    """
+    trimmed: List[Tuple[Document, float]] = []
+    kept: List[Document] = []
+    dropped = trimmed_count = 0
+    for doc, score in sorted(chunks, key=lambda item: _document_order(item[0])):
+        text = doc.page_content
+        head = tail = 0
+        for other in kept:
+            if _location(other) == _location(doc):
+                other_head, other_tail = _overlap(other, doc)
+                head, tail = max(head, other_head), max(tail, other_tail)
+        if head + tail >= len(text):
+            text = ""
+        elif head or tail:
+            text = text[head : len(text) - tail].strip()
+        if not text:
+            dropped += 1
+            continue
+        if text != doc.page_content:
+            trimmed_count += 1
+            trimmed.append(
+                (Document(id=doc.id, page_content=text, metadata=doc.metadata), score)
+            )
+        else:
+            trimmed.append((doc, score))
+        kept.append(doc)
+    return trimmed, dropped, trimmed_count
+
+
+def pack_context(
+    search_results: List[Tuple[Document, float]],
+    budget_tokens: int,
+    min_score_ratio: float = 0.0,
+) -> Tuple[List[Tuple[Document, float]], dict]:
+    """검색 결과를 토큰 예산에 맞게 줄이고 문서 순서로 정렬하여 반환합니다.
+
+    반환값은 (조립된 (청크, 점수) 목록, 통계)이며, 잘라낸 청크는 원본을 바꾸지 않고 복사본을 만듭니다.
+    통계에는 원래/최종 추정 토큰 수와 절약된 토큰 수, 제외/잘라낸 청크 수가 포함됩니다.
+    """
+    tokens_before = _context_tokens(search_results)
+    stats = {
+        "chunks_in": len(search_results),
+        "chunks_used": 0,
+        "dropped_low_score": 0,
+        "dropped_overlap": 0,
+        "dropped_budget": 0,
+        "trimmed_chunks": 0,
+        "tokens_before": tokens_before,
+        "tokens_after": 0,
+        "tokens_saved": 0,
+        "budget_tokens": budget_tokens,
+    }
+    if not search_results:
+        return [], stats
+
+    # 1. 낮은 점수 제외 (최고 점수 청크는 항상 유지)
+    top_score = max(score for _, score in search_results)
+    candidates = [
+        (doc, score)
+        for doc, score in search_results
+        if top_score <= 0 or score >= top_score * min_score_ratio
+    ]
+    stats["dropped_low_score"] = len(search_results) - len(candidates)
+
+    # 2. 점수 순으로 예산 안에 들어가는 청크 선택 (최고 점수 청크는 예산을 넘어도 포함)
+    selected: List[Tuple[Document, float]] = []
+    for doc, score in sorted(candidates, key=lambda item: item[1], reverse=True):
+        trial, _, _ = _trim_overlaps(selected + [(doc, score)])
+        if selected and _context_tokens(trial) > budget_tokens:
+            stats["dropped_budget"] += 1
+            continue
+        selected.append((doc, score))
+
+    # 3. 고른 청크끼리만 오버랩 제거
+    packed, dropped_overlap, trimmed_chunks = _trim_overlaps(selected)
+    stats.update(dropped_overlap=dropped_overlap, trimmed_chunks=trimmed_chunks)
+
+    # 4. KV 캐시 재사용을 위해 문서 순서로 정렬 (_trim_overlaps가 문서 순서로 반환)
+    tokens_after = _context_tokens(packed)
+    stats.update(
+        chunks_used=len(packed),
+        tokens_after=tokens_after,
+        tokens_saved=max(0, tokens_before - tokens_after),
+    )
+    return packed, stats
@@ -1,6 +1,9 @@
 """데이터베이스 설정 및 연결을 관리하는 모듈입니다."""
 
+import logging
 import os
+from typing import Optional
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -9,6 +12,8 @@ from dotenv import load_dotenv
 # .env 파일 로드
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # PostgreSQL 연결 정보
 POSTGRES_USER = os.getenv("POSTGRES_USER")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
@@ -16,14 +21,34 @@ POSTGRES_HOST = os.getenv("POSTGRES_HOST")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT")
 POSTGRES_DB = os.getenv("POSTGRES_DB")
 
+# 연결 풀 설정 (엔진별 상시 연결 수, 추가 연결 수, 연결 대기 시간(초), 연결 재생성 주기(초))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# asyncpg 비동기 엔진 사용 여부와 연결별 prepared statement 캐시 크기
+# (pgbouncer transaction 모드를 거치는 경우 캐시 크기를 0으로 설정)
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "false").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
 # 데이터베이스 URL 생성
 DATABASE_URL = (
     f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
     f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+_pool_options = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
 # SQLAlchemy 엔진 생성
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **_pool_options)
 
 # 세션 생성
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -32,6 +57,34 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _create_async_engine():
+    """asyncpg 비동기 엔진을 생성합니다. 비활성화되었거나 asyncpg가 없으면 None입니다."""
+    if not DB_ASYNC_ENABLED:
+        return None
+    try:
+        import asyncpg  # noqa: F401
+        from sqlalchemy.ext.asyncio import create_async_engine
+    except ImportError:
+        logger.warning("[DB] asyncpg가 설치되어 있지 않아 동기 엔진만 사용합니다.")
+        return None
+    return create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+        **_pool_options,
+    )
+
+
+async_engine = _create_async_engine()
+AsyncSessionLocal: Optional[sessionmaker] = None
+if async_engine is not None:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    # 커밋 후에도 ORM 객체 속성을 다시 조회(지연 로딩)하지 않도록 만료하지 않음
+    AsyncSessionLocal = sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+
 # 데이터베이스 세션 의존성
 def get_db():
     db = SessionLocal()
@@ -39,3 +92,25 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _pool_snapshot(pool) -> dict:
+    checked_out = pool.checkedout()
+    capacity = DB_POOL_SIZE + max(DB_MAX_OVERFLOW, 0)
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "utilization": round(checked_out / capacity, 4) if capacity else 0.0,
+    }
+
+
+def pool_stats() -> dict:
+    """동기/비동기 엔진의 연결 풀 사용 현황을 반환합니다."""
+    return {
+        "sync": _pool_snapshot(engine.pool),
+        "async": _pool_snapshot(async_engine.sync_engine.pool)
+        if async_engine is not None
+        else None,
+    }
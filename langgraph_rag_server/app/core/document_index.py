@@ -0,0 +1,149 @@
+"""컬렉션별 인덱싱 파일 목록과 파일→청크 ID 매핑을 관리하는 모듈입니다.
+
+인덱싱 시 `ingested_files`(파일 해시)와 `document_chunks`(파일별 청크 ID) 테이블에 기록하고,
+파일 삭제 시에는 메타데이터를 검색하지 않고 해당 파일의 청크 ID만 조회하여 삭제합니다.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from app.core.database import SessionLocal
+from app.core.models import DocumentChunkDB, IngestedFileDB
+from sqlalchemy import and_, exists
+from sqlalchemy.orm import aliased
+
+logger = logging.getLogger(__name__)
+
+
+def load_manifest(collection_name: str) -> Dict[str, dict]:
+    """컬렉션의 인덱싱 목록({상대경로: {"hash", "chunk_ids"}})을 읽습니다."""
+    db = SessionLocal()
+    try:
+        manifest = {
+            row.filename: {"hash": row.file_hash, "chunk_ids": []}
+            for row in db.query(IngestedFileDB).filter(
+                IngestedFileDB.collection_name == collection_name
+            )
+        }
+        rows = (
+            db.query(DocumentChunkDB.filename, DocumentChunkDB.chunk_id)
+            .filter(DocumentChunkDB.collection_name == collection_name)
+            .order_by(DocumentChunkDB.filename, DocumentChunkDB.chunk_id)
+        )
+        for filename, chunk_id in rows:
+            if filename in manifest:
+                manifest[filename]["chunk_ids"].append(chunk_id)
+        return manifest
+    finally:
+        db.close()
+
+
+def save_entries(
+    collection_name: str, entries: Dict[str, dict], removed: List[str]
+) -> None:
+    """변경된 파일의 항목을 교체하고 삭제된 파일의 항목을 제거합니다. (한 트랜잭션)"""
+    filenames = list(entries) + [key for key in removed if key not in entries]
+    if not filenames:
+        return
+    db = SessionLocal()
+    try:
+        db.query(DocumentChunkDB).filter(
+            DocumentChunkDB.collection_name == collection_name,
+            DocumentChunkDB.filename.in_(filenames),
+        ).delete(synchronize_session=False)
+        db.query(IngestedFileDB).filter(
+            IngestedFileDB.collection_name == collection_name,
+            IngestedFileDB.filename.in_(filenames),
+        ).delete(synchronize_session=False)
+        db.bulk_insert_mappings(
+            IngestedFileDB,
+            [
+                {
+                    "collection_name": collection_name,
+                    "filename": filename,
+                    "file_hash": entry["hash"],
+                    "chunk_count": len(entry["chunk_ids"]),
+                }
+                for filename, entry in entries.items()
+            ],
+        )
+        db.bulk_insert_mappings(
+            DocumentChunkDB,
+            [
+                {
+                    "collection_name": collection_name,
+                    "filename": filename,
+                    "chunk_id": chunk_id,
+                }
+                for filename, entry in entries.items()
+                # 한 파일 안에서는 청크 ID가 중복되지 않지만 기본 키 충돌을 피하기 위해 정리
+                for chunk_id in dict.fromkeys(entry["chunk_ids"])
+            ],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def find_file_by_hash(collection_name: str, file_hash: str) -> Optional[str]:
+    """같은 내용(해시)으로 인덱싱된 파일이 있으면 그 파일명을 반환합니다."""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(IngestedFileDB.filename)
+            .filter(
+                IngestedFileDB.collection_name == collection_name,
+                IngestedFileDB.file_hash == file_hash,
+            )
+            .order_by(IngestedFileDB.filename)
+            .first()
+        )
+        return row[0] if row else None
+    finally:
+        db.close()
+
+
+def unshared_chunk_ids(collection_name: str, filename: str) -> List[str]:
+    """파일의 청크 ID 중 같은 컬렉션의 다른 파일이 참조하지 않는 것만 반환합니다.
+
+    내용이 같은 PDF를 다른 이름으로 올리면 청크 ID가 같으므로, 한쪽을 삭제해도
+    다른 쪽의 벡터는 남겨야 합니다.
+    """
+    other = aliased(DocumentChunkDB)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(DocumentChunkDB.chunk_id)
+            .filter(
+                DocumentChunkDB.collection_name == collection_name,
+                DocumentChunkDB.filename == filename,
+                ~exists().where(
+                    and_(
+                        other.collection_name == collection_name,
+                        other.chunk_id == DocumentChunkDB.chunk_id,
+                        other.filename != filename,
+                    )
+                ),
+            )
+            .order_by(DocumentChunkDB.chunk_id)
+        )
+        return [chunk_id for (chunk_id,) in rows]
+    finally:
+        db.close()
+
+
+def clear_all() -> None:
+    """모든 인덱싱 기록을 삭제합니다. (시작 시 벡터스토어 폴더와 함께 초기화)"""
+    db = SessionLocal()
+    try:
+        db.query(DocumentChunkDB).delete(synchronize_session=False)
+        db.query(IngestedFileDB).delete(synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[DOCUMENT INDEX] 인덱싱 기록 초기화 오류: {e}")
+    finally:
+        db.close()
@@ -1,106 +1,339 @@
 """PDF 문서 임베딩 및 벡터스토어 저장 기능을 제공하는 모듈입니다."""
 
+import hashlib
 import os
-import shutil
-from typing import Optional
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 
-from app.core.config import CHROMA_PERSIST_DIR, OLLAMA_BASE_URL, OLLAMA_EMBEDDING_MODEL
-from langchain_chroma import Chroma
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_ollama import OllamaEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.core.config import (
+    EMBED_BATCH_INITIAL,
+    EMBED_BATCH_MAX,
+    EMBED_BATCH_MIN,
+    EMBED_CONCURRENCY,
+    EMBED_MAX_RETRIES,
+    EMBED_TARGET_LATENCY,
+    INGEST_PARSE_TIMEOUT,
+    INGEST_PARSE_WORKERS,
+    OLLAMA_EMBEDDING_MODEL,
+)
+from app.core import chunk_cache, document_index, lexical_index, semantic_cache
+from app.core.embedding_pipeline import EmbeddingPipeline
+from app.core.pdf_parser import parse_pdfs
+from app.core.scheduler import INGEST_EMBED, ScheduledEmbeddings
+from app.core.services import ServiceContainer, get_services
+from app.core.vector_index import VectorIndex
+from app.core.vectorstore_pool import vectorstore_pool
+from app.core.vectorstore_routing import (
+    DEFAULT_COLLECTION,
+    get_user_collection_name,
+    vectorstore_name,
+)
+from langchain_core.documents import Document
 
 
-def get_user_collection_name(user_id: str) -> str:
-    """사용자별 컬렉션 이름을 반환합니다."""
-    return f"rag_docs_{user_id}"
+# 진행 콜백: (파일 키, 변경된 필드) 형태로 호출됨
+ProgressCallback = Callable[[str, dict], None]
 
 
-def ingest_documents(documents_dir: str, user_id: Optional[str] = None) -> str:
-    """PDF 문서를 임베딩하고 벡터스토어에 저장합니다."""
+class IngestError(Exception):
+    """인덱싱이 실패했거나 일부 파일을 처리하지 못했음을 나타냅니다.
+
+    일부 파일만 실패한 경우에도 성공한 파일의 청크와 인덱싱 기록은 저장된 상태입니다.
+    """
+
+
+# 같은 컬렉션에 대한 인덱싱/삭제가 동시에 인덱싱 기록을 고쳐 쓰지 않도록 직렬화
+_collection_locks: Dict[str, threading.Lock] = {}
+_collection_locks_guard = threading.Lock()
+
+
+def collection_lock(collection_name: str) -> threading.Lock:
+    """컬렉션별 잠금 객체를 반환합니다."""
+    with _collection_locks_guard:
+        return _collection_locks.setdefault(collection_name, threading.Lock())
+
+
+def compute_file_hash(file_path: str) -> str:
+    """파일 내용의 SHA-256 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_chunk_id(file_hash: str, index: int, user_id: Optional[str] = None) -> str:
+    """파일 해시와 청크 순번으로 결정적인 청크 ID를 만듭니다."""
+    prefix = f"{user_id}-" if user_id else ""
+    return f"{prefix}{file_hash[:32]}-{index:05d}"
+
+
+def delete_document(
+    filename: str,
+    user_id: Optional[str] = None,
+    services: Optional[ServiceContainer] = None,
+) -> int:
+    """삭제된 파일의 청크를 벡터스토어/키워드 색인/인덱싱 기록에서 제거합니다.
+
+    `document_chunks`에 기록된 해당 파일의 청크 ID로만 삭제하므로 컬렉션 메타데이터를
+    검색하지 않고, 다른 파일(또는 다른 사용자)의 데이터에는 접근하지 않습니다.
+    삭제한 청크 수를 반환합니다.
+    """
+    collection_name = (
+        get_user_collection_name(user_id) if user_id else DEFAULT_COLLECTION
+    )
+    with collection_lock(collection_name):
+        chunk_ids = document_index.unshared_chunk_ids(collection_name, filename)
+        if chunk_ids:
+            services = services or get_services()
+            vectorstore = services.vectorstore(vectorstore_name(user_id))
+            vectorstore.delete(ids=chunk_ids)
+            vectorstore.flush()
+            lexical_index.update(collection_name, {}, chunk_ids)
+        # 벡터 삭제가 성공한 뒤에 기록을 지워, 실패 시 다시 삭제를 시도할 수 있도록 함
+        document_index.save_entries(collection_name, {}, [filename])
+    return len(chunk_ids)
+
+
+def _existing_ids(vectorstore: VectorIndex, ids: List[str]) -> set:
+    if not ids:
+        return set()
+    return set(vectorstore.get(ids=ids, include=[])["ids"])
+
+
+def _save_chunk_cache(
+    vectorstore: VectorIndex,
+    parsed: Dict[str, Tuple[List[Document], int]],
+    entries: Dict[str, dict],
+) -> None:
+    """새로 임베딩한 파일의 청크와 벡터를 공유 캐시에 저장합니다. (실패해도 인덱싱은 성공)"""
+    for key, (splits, pages) in parsed.items():
+        chunk_ids = entries[key]["chunk_ids"]
+        try:
+            stored = vectorstore.get(ids=chunk_ids, include=["embeddings"])
+            vectors = dict(zip(stored["ids"], stored["embeddings"]))
+            chunk_cache.save(
+                entries[key]["hash"], splits, [vectors[cid] for cid in chunk_ids], pages
+            )
+        except Exception as e:
+            print(f"[CHUNK CACHE] {key} 캐시 저장 실패: {e}")
+
+
+def ingest_documents(
+    documents_dir: str,
+    user_id: Optional[str] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    services: Optional[ServiceContainer] = None,
+) -> str:
+    """PDF 문서를 임베딩하고 벡터스토어에 저장합니다.
+
+    파일별 내용 해시와 청크 ID를 `document_index`에 기록하여 새로 추가되거나 변경된 파일만 임베딩하고,
+    삭제/변경된 파일의 이전 청크만 제거합니다. 변경이 없으면 아무 작업도 하지 않습니다.
+    같은 내용의 PDF가 공유 청크 캐시(`chunk_cache`)에 있으면 파싱/임베딩 없이 벡터를 복사합니다.
+    `progress_callback`이 주어지면 파일별 단계/페이지/청크/임베딩 수를 알립니다.
+    성공하면 결과 메시지를 반환하고, 처리하지 못한 파일이 있으면 `IngestError`를 발생시킵니다.
+    """
+    collection_name = (
+        get_user_collection_name(user_id) if user_id else DEFAULT_COLLECTION
+    )
+    with collection_lock(collection_name):
+        return _ingest_locked(
+            documents_dir, user_id, collection_name, progress_callback, services
+        )
+
+
+def _ingest_locked(
+    documents_dir: str,
+    user_id: Optional[str],
+    collection_name: str,
+    progress_callback: Optional[ProgressCallback],
+    services: Optional[ServiceContainer] = None,
+) -> str:
+    def report(key: str, **update) -> None:
+        if progress_callback is not None:
+            progress_callback(key, update)
+
     if not OLLAMA_EMBEDDING_MODEL:
-        return "OLLAMA_EMBEDDING_MODEL 환경변수가 설정되어 있지 않습니다."
+        raise IngestError("OLLAMA_EMBEDDING_MODEL 환경변수가 설정되어 있지 않습니다.")
     print(f"OLLAMA_EMBEDDING_MODEL: {OLLAMA_EMBEDDING_MODEL}")
 
     # 임베딩 및 벡터스토어 초기화
-    embeddings = OllamaEmbeddings(
-        model=OLLAMA_EMBEDDING_MODEL, base_url=OLLAMA_BASE_URL
-    )
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-        separators=["\n\n", "\n", ".", "!", "?", ":", ";", ",", " ", ""],
-    )
-    # PDF 파일 수집
-    pdf_files = []
+    # 인덱싱 임베딩은 스케줄러의 낮은 우선순위 대기열을 거쳐 대화형 요청을 방해하지 않도록 함
+    services = services or get_services()
+    embeddings = ScheduledEmbeddings(services.embeddings, INGEST_EMBED, user_id)
+    # PDF 파일 수집 (인덱싱 기록의 키는 documents_dir 기준 상대경로)
+    pdf_files: Dict[str, str] = {}
     for root, _, files in os.walk(documents_dir):
         for file in files:
             if file.lower().endswith(".pdf"):
-                pdf_files.append(os.path.join(root, file))
-    if not pdf_files:
+                file_path = os.path.join(root, file)
+                pdf_files[os.path.relpath(file_path, documents_dir)] = file_path
+    # 파싱/청크 ID 순서가 실행마다 같도록 정렬
+    pdf_files = dict(sorted(pdf_files.items()))
+
+    manifest = document_index.load_manifest(collection_name)
+    if not pdf_files and not manifest:
         return "PDF 문서가 없습니다."
 
-    # 문서 로딩 및 청크 분할
-    all_splits = []
-    for file_path in pdf_files:
+    # 공유 컬렉션 모드에서는 여러 사용자의 청크가 같은 컬렉션에 저장됨 (청크 ID는 사용자별로 구분)
+    store_name = vectorstore_name(user_id)
+    vectorstore = services.vectorstore(store_name, embeddings)
+
+    # 변경 여부 판별: 해시가 같고 청크가 모두 남아 있으면 건너뜀
+    file_hashes = {key: compute_file_hash(path) for key, path in pdf_files.items()}
+    unchanged = [
+        key
+        for key, file_hash in file_hashes.items()
+        if key in manifest and manifest[key].get("hash") == file_hash
+    ]
+    present = _existing_ids(
+        vectorstore,
+        [cid for key in unchanged for cid in manifest[key].get("chunk_ids", [])],
+    )
+    unchanged = [
+        key
+        for key in unchanged
+        if all(cid in present for cid in manifest[key].get("chunk_ids", []))
+    ]
+    changed = [key for key in pdf_files if key not in unchanged]
+    removed = [key for key in manifest if key not in pdf_files]
+    for key in unchanged:
+        report(key, status="skipped")
+    if not changed and not removed:
+        return f"변경된 문서가 없습니다. (기존 {len(unchanged)}개 파일 유지)"
+    for key in changed:
+        report(key, status="parsing", pages=0, chunks=0, embedded=0)
+
+    # 파일별 저장 진행 상황 보고 (파이프라인 쓰기 스레드에서 호출됨)
+    def on_written(key: str, written: int, expected: int) -> None:
+        report(key, embedded=written)
+        if written == expected:
+            report(key, status="done")
+
+    pipeline = EmbeddingPipeline(
+        embeddings,
+        vectorstore,
+        concurrency=EMBED_CONCURRENCY,
+        min_batch=EMBED_BATCH_MIN,
+        max_batch=EMBED_BATCH_MAX,
+        initial_batch=EMBED_BATCH_INITIAL,
+        target_latency=EMBED_TARGET_LATENCY,
+        max_retries=EMBED_MAX_RETRIES,
+        on_written=on_written,
+    )
+
+    new_entries: Dict[str, dict] = {}
+    new_texts: Dict[str, Dict[str, str]] = {}
+    failures: Dict[str, str] = {}
+    # 새로 파싱/임베딩한 파일은 인덱싱이 끝난 뒤 공유 청크 캐시에 저장
+    parsed: Dict[str, Tuple[List[Document], int]] = {}
+
+    def register(key: str, splits: List[Document], pages: int) -> List[str]:
+        report(key, status="embedding", pages=pages, chunks=len(splits))
+        chunk_ids = [
+            make_chunk_id(file_hashes[key], idx, user_id) for idx in range(len(splits))
+        ]
+        new_entries[key] = {"hash": file_hashes[key], "chunk_ids": chunk_ids}
+        new_texts[key] = {cid: doc.page_content for cid, doc in zip(chunk_ids, splits)}
+        return chunk_ids
+
+    # 쓰기 단계 도중 오류가 나도 컬렉션이 일부 변경되었을 수 있으므로 캐시는 항상 폐기
+    try:
         try:
-            loader = PyPDFLoader(file_path)
-            documents = loader.load()
-            enhanced_docs = []
-            for doc in documents:
-                doc.page_content = " ".join(doc.page_content.split())
-                if not doc.page_content.strip():
+            # 다른 사용자가 이미 인덱싱한 같은 PDF는 파싱/임베딩 없이 캐시된 벡터를
+            # 이 사용자의 메타데이터로 이 컬렉션에 복사
+            to_parse = []
+            for key in changed:
+                cached = chunk_cache.load(file_hashes[key])
+                if cached is None:
+                    to_parse.append(key)
                     continue
-                doc.metadata["source"] = file_path
-                doc.metadata["filename"] = os.path.basename(file_path)
-                doc.metadata["char_count"] = len(doc.page_content)
-                doc.metadata["word_count"] = len(doc.page_content.split())
-                if user_id:
-                    doc.metadata["user_id"] = user_id
-                enhanced_docs.append(doc)
-            splits = text_splitter.split_documents(enhanced_docs)
-            all_splits.extend(splits)
-        except Exception as e:  # noqa: E722
-            return f"{file_path} 처리 중 오류: {str(e)}"
-
-    if not all_splits:
-        return "유효한 문서 내용이 추출되지 않았습니다."
-
-    # 벡터스토어 초기화 및 저장
-    collection_name = get_user_collection_name(user_id) if user_id else "rag_docs"
-    vectorstore = Chroma(
-        collection_name=collection_name,
-        embedding_function=embeddings,
-        persist_directory=CHROMA_PERSIST_DIR,
-    )
-    vectorstore.delete_collection()
-    vectorstore = Chroma(
-        collection_name=collection_name,
-        embedding_function=embeddings,
-        persist_directory=CHROMA_PERSIST_DIR,
+                docs = cached.to_documents(pdf_files[key], user_id)
+                chunk_ids = register(key, docs, cached.pages)
+                pipeline.submit_vectors(key, docs, chunk_ids, cached.vectors.tolist())
+
+            # 나머지 파일은 프로세스 풀에서 파싱하고, 파싱이 끝난 파일부터 임베딩 파이프라인에 투입
+            for key, splits, pages, error in parse_pdfs(
+                [(key, pdf_files[key]) for key in to_parse],
+                user_id,
+                workers=INGEST_PARSE_WORKERS,
+                timeout=INGEST_PARSE_TIMEOUT,
+            ):
+                if error is not None:
+                    failures[key] = error
+                    continue
+                chunk_ids = register(key, splits, pages)
+                if splits:
+                    parsed[key] = (splits, pages)
+                    # 같은 ID는 덮어쓰므로(upsert) 이전 청크를 먼저 지우지 않아도 됨
+                    pipeline.submit(key, splits, chunk_ids)
+                else:
+                    report(key, status="done")
+        finally:
+            failures.update(pipeline.close())
+
+        # 실패한 파일은 인덱싱 기록을 갱신하지 않아 다음 인덱싱 때 다시 시도됨
+        attempted = {
+            key: new_entries.pop(key) for key in failures if key in new_entries
+        }
+        for key, error in failures.items():
+            report(key, status="failed", error=error)
+        _save_chunk_cache(
+            vectorstore,
+            {key: value for key, value in parsed.items() if key in new_entries},
+            new_entries,
+        )
+
+        # 삭제/변경된 파일의 이전 청크와 실패한 파일이 일부만 저장한 새 청크 중
+        # 남길 ID 집합(새 청크, 변경 없는 파일과 실패한 파일의 기존 청크)에 없는 것만 제거
+        # (내용이 같은 다른 파일이 계속 사용하는 청크 ID는 남김)
+        kept_entries = list(new_entries.values()) + [
+            manifest[key] for key in unchanged + list(attempted) if key in manifest
+        ]
+        kept_ids = {cid for entry in kept_entries for cid in entry["chunk_ids"]}
+        stale_ids = [
+            cid
+            for key in list(new_entries) + removed
+            for cid in manifest.get(key, {}).get("chunk_ids", [])
+            if cid not in kept_ids
+        ]
+        for entry in attempted.values():
+            stale_ids.extend(cid for cid in entry["chunk_ids"] if cid not in kept_ids)
+        if stale_ids:
+            vectorstore.delete(ids=stale_ids)
+
+        # 키워드 색인도 같은 청크 ID로 갱신 (색인이 없던 기존 청크는 벡터스토어에서 보충)
+        lexical_added = {
+            cid: text for key in new_entries for cid, text in new_texts[key].items()
+        }
+        backfill = lexical_index.missing_ids(
+            collection_name,
+            [cid for key in unchanged for cid in manifest[key].get("chunk_ids", [])],
+        )
+        if backfill:
+            stored = vectorstore.get(ids=backfill, include=["documents"])
+            lexical_added.update(zip(stored["ids"], stored["documents"]))
+        lexical_index.update(collection_name, lexical_added, stale_ids)
+        # FAISS 인덱스 변경을 스냅샷으로 저장 (삭제가 많았으면 이때 재구축)
+        vectorstore.flush()
+        total_chunks = sum(len(entry["chunk_ids"]) for entry in new_entries.values())
+
+        document_index.save_entries(collection_name, new_entries, removed)
+    finally:
+        vectorstore_pool.invalidate(store_name)
+        # 문서가 바뀌었으므로 이전 답변 캐시는 더 이상 유효하지 않음
+        semantic_cache.invalidate_user(user_id)
+    if failures:
+        raise IngestError(
+            "\n".join(
+                f"{pdf_files[key]} 처리 중 오류: {error}"
+                for key, error in failures.items()
+            )
+        )
+    if changed and not total_chunks:
+        raise IngestError("유효한 문서 내용이 추출되지 않았습니다.")
+    return (
+        f"총 {total_chunks}개의 문서 청크가 벡터스토어에 저장되었습니다. "
+        f"(변경 없음 {len(unchanged)}개 파일 건너뜀, 이전 청크 {len(stale_ids)}개 삭제)"
     )
-    batch_size = 50
-    for i in range(0, len(all_splits), batch_size):
-        batch = all_splits[i : i + batch_size]
-        vectorstore.add_documents(batch)
-    return f"총 {len(all_splits)}개의 문서 청크가 벡터스토어에 저장되었습니다."
-
-
-def delete_related_chroma_files(filename: str, user_id: Optional[str] = None):
-    """ChromaDB 데이터 폴더에서 filename 관련 벡터 파일 삭제."""
-    for folder in os.listdir(CHROMA_PERSIST_DIR):
-        folder_path = os.path.join(CHROMA_PERSIST_DIR, folder)
-        if os.path.isdir(folder_path):
-            # 메타데이터 파일 탐색
-            metadata_file = os.path.join(folder_path, "metadata.json")
-            if os.path.exists(metadata_file):
-                with open(metadata_file, "r") as f:
-                    content = f.read()
-                    # 사용자 ID와 파일명이 모두 일치하는 경우에만 삭제
-                    if filename in content and (
-                        not user_id or f'"user_id": "{user_id}"' in content
-                    ):
-                        # 관련 UUID 폴더 삭제
-                        shutil.rmtree(folder_path)
-                        print(f"✅ {folder_path} 관련 데이터 삭제 완료")
+
@@ -0,0 +1,205 @@
+"""임베딩 호출 결과를 재사용하는 캐시 래퍼를 제공하는 모듈입니다."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 계산용으로 유니코드(NFC)와 공백을 정규화합니다."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 객체를 감싸 (모델명 + 정규화된 텍스트) 해시로 결과를 캐싱합니다.
+
+    - 메모리: 최대 `max_entries`개를 LRU 방식으로 보관합니다.
+    - 디스크(선택): `disk_path`가 주어지면 SQLite 파일에 저장하여 재시작 후에도 재사용합니다.
+    """
+
+    def __init__(
+        self,
+        base: Embeddings,
+        model_name: str,
+        max_entries: int = 1024,
+        disk_path: Optional[str] = None,
+    ):
+        self.base = base
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+            self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        """디스크 캐시 연결을 닫습니다. 이후에는 메모리 캐시만 사용합니다."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model_name}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _get_memory(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+            return vector
+
+    def _load(self, keys: List[str]) -> Dict[str, List[float]]:
+        """디스크 캐시에서 keys를 읽어 메모리 캐시에 올리고 찾은 벡터를 반환합니다."""
+        if not keys:
+            return {}
+        with self._lock:
+            if self._db is None:
+                return {}
+            rows = [
+                self._db.execute(
+                    "SELECT key, vector FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                for key in keys
+            ]
+        loaded = {
+            row[0]: np.frombuffer(row[1], dtype=np.float32).tolist()
+            for row in rows
+            if row is not None
+        }
+        self._remember_memory(loaded)
+        return loaded
+
+    def _remember_memory(self, vectors: Dict[str, List[float]]) -> None:
+        with self._lock:
+            for key, vector in vectors.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _persist(self, vectors: Dict[str, List[float]]) -> None:
+        """새로 계산한 벡터를 디스크 캐시에 한 번의 커밋으로 저장합니다."""
+        if not vectors:
+            return
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [
+                        (key, np.asarray(vector, dtype=np.float32).tobytes())
+                        for key, vector in vectors.items()
+                    ],
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[EMBED CACHE] 디스크 저장 실패: {e}")
+
+    def _lookup_memory(self, texts: List[str]):
+        """메모리 캐시에서 찾은 벡터와, 찾지 못한 키별 위치를 반환합니다."""
+        found: Dict[int, List[float]] = {}
+        missing: Dict[str, List[int]] = OrderedDict()
+        for idx, key in enumerate(self._key(text) for text in texts):
+            vector = self._get_memory(key)
+            if vector is not None:
+                found[idx] = vector
+            else:
+                # 같은 요청 안의 중복 텍스트는 한 번만 임베딩
+                missing.setdefault(key, []).append(idx)
+        return found, missing
+
+    def _apply_loaded(self, texts: List[str], found, missing, loaded):
+        """디스크에서 읽은 벡터를 채우고 아직 임베딩이 필요한 텍스트를 반환합니다."""
+        for key in list(missing):
+            vector = loaded.get(key)
+            if vector is not None:
+                for idx in missing.pop(key):
+                    found[idx] = vector
+        self.hits += len(found)
+        self.misses += len(missing)
+        return [texts[indexes[0]] for indexes in missing.values()]
+
+    def _merge(self, found, missing, vectors) -> Dict[str, List[float]]:
+        """새로 계산한 벡터를 메모리 캐시와 결과 위치에 채우고 반환합니다."""
+        computed = dict(zip(missing, vectors))
+        self._remember_memory(computed)
+        for key, vector in computed.items():
+            for idx in missing[key]:
+                found[idx] = vector
+        return computed
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        found, missing = self._lookup_memory(texts)
+        loaded = self._load(list(missing))
+        missing_texts = self._apply_loaded(texts, found, missing, loaded)
+        vectors = self.base.embed_documents(missing_texts) if missing_texts else []
+        self._persist(self._merge(found, missing, vectors))
+        return [found[idx] for idx in range(len(texts))]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._get_memory(key)
+        if vector is None:
+            vector = self._load([key]).get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        vector = self.base.embed_query(text)
+        self._remember_memory({key: vector})
+        self._persist({key: vector})
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # 메모리 캐시는 이벤트 루프에서 바로 확인하고, SQLite 읽기/쓰기는 스레드 풀에서 실행
+        found, missing = self._lookup_memory(texts)
+        loaded = (
+            await run_in_threadpool(self._load, list(missing))
+            if missing and self._db is not None
+            else {}
+        )
+        missing_texts = self._apply_loaded(texts, found, missing, loaded)
+        vectors = (
+            await self.base.aembed_documents(missing_texts) if missing_texts else []
+        )
+        computed = self._merge(found, missing, vectors)
+        if computed and self._db is not None:
+            await run_in_threadpool(self._persist, computed)
+        return [found[idx] for idx in range(len(texts))]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._get_memory(key)
+        if vector is None and self._db is not None:
+            vector = (await run_in_threadpool(self._load, [key])).get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        vector = await self.base.aembed_query(text)
+        self._remember_memory({key: vector})
+        if self._db is not None:
+            await run_in_threadpool(self._persist, {key: vector})
+        return vector
@@ -0,0 +1,209 @@
+"""인덱싱용 청크 임베딩과 벡터 인덱스 저장을 파이프라인으로 처리하는 모듈입니다.
+
+- 임베딩 요청을 최대 `concurrency`개까지 동시에 보냅니다.
+- 배치 크기는 관측된 배치 지연 시간에 따라 AIMD 방식(목표 이하이면 조금씩 증가,
+  초과하거나 실패하면 절반으로 감소)으로 조정합니다.
+- 임베딩이 끝난 배치는 전용 쓰기 스레드가 미리 계산된 벡터로 벡터 인덱스에 upsert하므로
+  다음 배치의 임베딩과 저장이 겹쳐서 진행됩니다.
+- 공유 청크 캐시 등에서 벡터를 이미 가진 청크는 `submit_vectors`로 임베딩 없이 저장합니다.
+- 실패한 배치는 지수 백오프로 재시도하고, 끝내 실패하면 배치를 나눠 원인 청크를 찾아
+  그 청크가 속한 파일만 실패로 기록합니다.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# 진행 콜백: (파일 키, 저장된 청크 수, 파일 전체 청크 수)
+WrittenCallback = Callable[[str, int, int], None]
+
+
+class EmbeddingPipeline:
+    """파일 단위로 청크를 받아 배치 임베딩/저장을 비동기로 진행합니다.
+
+    `submit`으로 청크를 넣고 `close`로 남은 배치를 모두 처리한 뒤 실패한 파일 목록을 받습니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        collection,
+        concurrency: int = 4,
+        min_batch: int = 8,
+        max_batch: int = 256,
+        initial_batch: int = 32,
+        target_latency: float = 2.0,
+        max_retries: int = 3,
+        on_written: Optional[WrittenCallback] = None,
+    ):
+        self.embeddings = embeddings
+        self.collection = collection
+        self.min_batch = max(1, min_batch)
+        self.max_batch = max(self.min_batch, max_batch)
+        self.batch_size = min(max(initial_batch, self.min_batch), self.max_batch)
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.on_written = on_written
+
+        self._embed_executor = ThreadPoolExecutor(
+            max_workers=max(1, concurrency), thread_name_prefix="embed"
+        )
+        # 벡터 인덱스 쓰기는 한 스레드에서 순서대로 수행
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="embed-write"
+        )
+        # 임베딩/저장 대기 중인 배치 수를 제한하여 메모리 사용량을 묶어 둠
+        self._slots = threading.BoundedSemaphore(max(1, concurrency) * 2)
+        self._lock = threading.Lock()
+        self._buffer: List[Tuple[str, str, Document]] = []
+        self._expected: Dict[str, int] = {}
+        self._written: Dict[str, int] = {}
+        self._failed: Dict[str, str] = {}
+
+        self.started = time.monotonic()
+        self.batches = 0
+        self.retries = 0
+        self.embedded = 0
+
+    def submit(self, key: str, docs: List[Document], ids: List[str]) -> None:
+        """파일 하나의 청크를 파이프라인에 추가합니다."""
+        with self._lock:
+            self._expected[key] = self._expected.get(key, 0) + len(docs)
+            self._written.setdefault(key, 0)
+        self._buffer.extend((key, cid, doc) for cid, doc in zip(ids, docs))
+        while len(self._buffer) >= self.batch_size:
+            self._dispatch(self.batch_size)
+
+    def submit_vectors(
+        self, key: str, docs: List[Document], ids: List[str], vectors: List[List[float]]
+    ) -> None:
+        """임베딩이 이미 계산된 파일의 청크를 임베딩 단계 없이 바로 저장 단계에 넣습니다."""
+        with self._lock:
+            self._expected[key] = self._expected.get(key, 0) + len(docs)
+            self._written.setdefault(key, 0)
+        items = [(key, cid, doc) for cid, doc in zip(ids, docs)]
+        for start in range(0, len(items), self.max_batch):
+            self._slots.acquire()
+            self._write_executor.submit(
+                self._write_batch,
+                items[start : start + self.max_batch],
+                vectors[start : start + self.max_batch],
+            )
+
+    def close(self) -> Dict[str, str]:
+        """남은 청크를 처리하고 모든 배치가 끝날 때까지 기다립니다. {파일 키: 오류}를 반환합니다."""
+        try:
+            while self._buffer:
+                self._dispatch(self.batch_size)
+        finally:
+            # 임베딩이 모두 끝나야 마지막 쓰기 작업까지 제출되므로 순서대로 종료
+            self._embed_executor.shutdown(wait=True)
+            self._write_executor.shutdown(wait=True)
+        elapsed = time.monotonic() - self.started
+        logger.info(
+            f"[EMBED PIPELINE] {self.embedded}개 청크, {self.batches}개 배치, "
+            f"재시도 {self.retries}회, {elapsed:.2f}초 "
+            f"({self.embedded / elapsed if elapsed > 0 else 0:.1f} 청크/초), "
+            f"최종 배치 크기 {self.batch_size}"
+        )
+        return dict(self._failed)
+
+    def _dispatch(self, size: int) -> None:
+        batch, self._buffer = self._buffer[:size], self._buffer[size:]
+        self._slots.acquire()
+        self._embed_executor.submit(self._embed_batch, batch)
+
+    def _with_retries(self, func, *args, retries: Optional[int] = None):
+        retries = self.max_retries if retries is None else retries
+        delay = 0.5
+        for attempt in range(retries + 1):
+            try:
+                return func(*args)
+            except Exception:
+                if attempt == retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+                delay *= 2
+
+    def _adjust(self, latency: float, size: int, ok: bool) -> None:
+        with self._lock:
+            if not ok or latency > self.target_latency:
+                self.batch_size = max(self.min_batch, self.batch_size // 2)
+            elif size >= self.batch_size:
+                # 목표 지연 이내로 처리된 꽉 찬 배치만 증가 신호로 사용
+                self.batch_size = min(self.max_batch, self.batch_size + self.min_batch)
+
+    def _embed_split(self, batch, retries: Optional[int] = None):
+        """배치를 임베딩합니다. 끝내 실패하면 반으로 나눠 실패 원인 청크만 골라냅니다."""
+        texts = [doc.page_content for _, _, doc in batch]
+        try:
+            return batch, self._with_retries(
+                self.embeddings.embed_documents, texts, retries=retries
+            ), []
+        except Exception as e:
+            if len(batch) == 1:
+                return [], [], [(batch[0], e)]
+        middle = len(batch) // 2
+        left_ok, left_vectors, left_failed = self._embed_split(batch[:middle], 0)
+        right_ok, right_vectors, right_failed = self._embed_split(batch[middle:], 0)
+        return (
+            left_ok + right_ok,
+            list(left_vectors) + list(right_vectors),
+            left_failed + right_failed,
+        )
+
+    def _embed_batch(self, batch: List[Tuple[str, str, Document]]) -> None:
+        started = time.monotonic()
+        ok_items, vectors, failed = self._embed_split(batch)
+        self._adjust(time.monotonic() - started, len(batch), ok=not failed)
+        for item, error in failed:
+            self._fail([item], f"임베딩 실패: {error}")
+        if not ok_items:
+            self._slots.release()
+            return
+        # 쓰기는 별도 스레드로 넘기고 임베딩 스레드는 바로 다음 배치를 처리
+        self._write_executor.submit(self._write_batch, ok_items, vectors)
+
+    def _write_batch(self, batch: List[Tuple[str, str, Document]], vectors) -> None:
+        try:
+            self._with_retries(
+                lambda: self.collection.upsert(
+                    ids=[cid for _, cid, _ in batch],
+                    embeddings=vectors,
+                    documents=[doc.page_content for _, _, doc in batch],
+                    metadatas=[doc.metadata for _, _, doc in batch],
+                )
+            )
+        except Exception as e:
+            self._fail(batch, f"벡터스토어 저장 실패: {e}")
+            return
+        finally:
+            self._slots.release()
+        counts: Dict[str, int] = {}
+        for key, _, _ in batch:
+            counts[key] = counts.get(key, 0) + 1
+        with self._lock:
+            self.batches += 1
+            self.embedded += len(batch)
+            progress = []
+            for key, count in counts.items():
+                self._written[key] += count
+                progress.append((key, self._written[key], self._expected[key]))
+        if self.on_written is not None:
+            for key, written, expected in progress:
+                self.on_written(key, written, expected)
+
+    def _fail(self, batch: List[Tuple[str, str, Document]], error: str) -> None:
+        logger.error(f"[EMBED PIPELINE] 배치({len(batch)}개) {error}")
+        with self._lock:
+            for key, _, _ in batch:
+                self._failed.setdefault(key, error)
@@ -0,0 +1,177 @@
+"""업로드된 PDF를 백그라운드에서 인덱싱하는 작업 큐를 제공하는 모듈입니다.
+
+작업 상태와 진행 상황은 `ingest_jobs` 테이블에 저장되므로 여러 워커에서 조회할 수 있고,
+실제 인덱싱은 프로세스 내 스레드 풀에서 수행됩니다.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+from uuid import uuid4
+
+from app.core.config import INGEST_PROGRESS_INTERVAL, INGEST_WORKERS
+from app.core.database import SessionLocal
+from app.core.document_ingest import ingest_documents
+from app.core.models import IngestJobDB
+from app.core.services import ServiceContainer
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+
+
+class _ProgressReporter:
+    """ingest_documents의 진행 콜백을 받아 일정 간격으로 작업 테이블에 기록합니다."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.started = time.monotonic()
+        self.files = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, file_key: str, update: dict) -> None:
+        with self._lock:
+            self.files.setdefault(file_key, {}).update(update)
+            now = time.monotonic()
+            # 파일 단계가 바뀌었거나 기록 간격이 지났을 때만 DB에 기록
+            if "status" not in update and now - self._last_flush < INGEST_PROGRESS_INTERVAL:
+                return
+            self._last_flush = now
+            snapshot = self.snapshot()
+        _update_job(self.job_id, progress=json.dumps(snapshot, ensure_ascii=False))
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        total_chunks = sum(f.get("chunks", 0) for f in self.files.values())
+        embedded = sum(f.get("embedded", 0) for f in self.files.values())
+        return {
+            "files": self.files,
+            "total_chunks": total_chunks,
+            "embedded_chunks": embedded,
+            "elapsed_seconds": round(elapsed, 2),
+            "chunks_per_second": round(embedded / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+def _update_job(job_id: str, **fields) -> None:
+    db = SessionLocal()
+    try:
+        db.query(IngestJobDB).filter(IngestJobDB.id == job_id).update(
+            fields, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[INGEST JOB] 상태 기록 오류 ({job_id}): {e}")
+    finally:
+        db.close()
+
+
+def _run_job(
+    job_id: str,
+    documents_dir: str,
+    user_id: str,
+    services: Optional[ServiceContainer] = None,
+) -> None:
+    reporter = _ProgressReporter(job_id)
+    _update_job(job_id, status="running", started_at=datetime.now())
+    try:
+        result = ingest_documents(
+            documents_dir, user_id, progress_callback=reporter, services=services
+        )
+    except Exception as e:
+        # IngestError: 설정 누락, 파일 처리 오류, 추출된 내용 없음
+        logger.error(f"[INGEST JOB] 작업 실패 ({job_id}): {e}")
+        _update_job(
+            job_id,
+            status="failed",
+            error=str(e),
+            progress=json.dumps(reporter.snapshot(), ensure_ascii=False),
+            finished_at=datetime.now(),
+        )
+        return
+    _update_job(
+        job_id,
+        status="completed",
+        result=result,
+        progress=json.dumps(reporter.snapshot(), ensure_ascii=False),
+        finished_at=datetime.now(),
+    )
+
+
+def submit_ingest_job(
+    documents_dir: str,
+    user_id: str,
+    filenames: List[str],
+    services: Optional[ServiceContainer] = None,
+) -> str:
+    """인덱싱 작업을 등록하고 작업 ID를 즉시 반환합니다.
+
+    `services`가 주어지면 요청을 받은 앱의 서비스 컨테이너로 인덱싱합니다.
+    """
+    job_id = str(uuid4())
+    db = SessionLocal()
+    try:
+        db.add(
+            IngestJobDB(
+                id=job_id,
+                user_id=user_id,
+                status="queued",
+                filenames=json.dumps(filenames, ensure_ascii=False),
+                progress="{}",
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+    _executor.submit(_run_job, job_id, documents_dir, user_id, services)
+    return job_id
+
+
+def get_job(db, job_id: str, user_id: str) -> Optional[dict]:
+    """사용자 본인의 작업 상태를 반환합니다. 없거나 다른 사용자의 작업이면 None입니다."""
+    job = (
+        db.query(IngestJobDB)
+        .filter(IngestJobDB.id == job_id, IngestJobDB.user_id == user_id)
+        .first()
+    )
+    if job is None:
+        return None
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "filenames": json.loads(job.filenames or "[]"),
+        "progress": json.loads(job.progress or "{}"),
+        "result": job.result or "",
+        "error": job.error or "",
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def fail_interrupted_jobs() -> None:
+    """서버 재시작으로 중단된(queued/running) 작업을 실패로 표시합니다."""
+    db = SessionLocal()
+    try:
+        db.query(IngestJobDB).filter(
+            IngestJobDB.status.in_(["queued", "running"])
+        ).update(
+            {
+                IngestJobDB.status: "failed",
+                IngestJobDB.error: "서버 재시작으로 작업이 중단되었습니다.",
+                IngestJobDB.finished_at: datetime.now(),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[INGEST JOB] 중단 작업 정리 오류: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,173 @@
+"""사용자별 컬렉션의 키워드(BM25) 검색용 역색인을 관리하는 모듈입니다.
+
+색인은 컬렉션마다 `LEXICAL_INDEX_DIR/<컬렉션명>.json` 파일에 저장되며,
+문서 인덱싱/삭제 시 벡터스토어와 같은 청크 ID로 함께 갱신됩니다.
+조회 시에는 파일 수정 시각이 바뀌었을 때만 다시 읽어 메모리에 보관합니다.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from app.core.config import LEXICAL_INDEX_DIR
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# 한글 단어 끝에서 떼어낼 조사/어미 (긴 것부터 검사)
+_JOSA = sorted(
+    [
+        "이었습니다", "였습니다", "입니다", "습니다", "에서는", "으로는", "에게서",
+        "이라는", "라는", "에서", "으로", "에게", "한테", "까지", "부터", "보다",
+        "처럼", "마다", "이나", "이며", "이고", "이다", "은", "는", "이", "가",
+        "을", "를", "의", "에", "로", "와", "과", "도", "만", "나", "며", "고",
+    ],
+    key=len,
+    reverse=True,
+)
+_TOKEN_RE = re.compile(r"\d+(?:[.,]\d+)*[가-힣]?|[가-힣]+|[a-z]+")
+
+# 컬렉션명 -> {"mtime", "doc_len", "postings"}
+_indexes: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def _strip_josa(word: str) -> str:
+    for josa in _JOSA:
+        if word.endswith(josa) and len(word) - len(josa) >= 2:
+            return word[: -len(josa)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """한국어 조사 제거와 숫자(+단위) 토큰을 지원하는 간단한 토크나이저입니다.
+
+    - "장수왕은" -> "장수왕" (조사 제거)와 2글자 단위 조각("장수", "수왕")
+    - "427년" -> "427년", "427"
+    """
+    text = unicodedata.normalize("NFC", text).lower()
+    tokens: List[str] = []
+    for match in _TOKEN_RE.findall(text):
+        if match[0].isdigit():
+            tokens.append(match)
+            if not match[-1].isdigit():
+                tokens.append(match[:-1])
+            continue
+        if "가" <= match[0] <= "힣":
+            if match in _JOSA:
+                # "427년에"처럼 숫자 토큰 뒤에 떨어져 나온 조사
+                continue
+            stem = _strip_josa(match)
+            tokens.append(stem)
+            # 복합어 부분 일치를 위해 2글자 조각도 색인
+            if len(stem) >= 3:
+                tokens.extend(stem[i : i + 2] for i in range(len(stem) - 1))
+            continue
+        tokens.append(match)
+    return tokens
+
+
+def _index_path(collection_name: str) -> str:
+    return os.path.join(LEXICAL_INDEX_DIR, f"{collection_name}.json")
+
+
+def _load(collection_name: str) -> dict:
+    """디스크의 색인이 바뀐 경우에만 다시 읽어 메모리 사본을 반환합니다."""
+    path = _index_path(collection_name)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    cached = _indexes.get(collection_name)
+    if cached is not None and cached["mtime"] == mtime:
+        return cached
+    index = {"mtime": mtime, "doc_len": {}, "postings": {}}
+    if mtime is not None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            index["doc_len"] = data.get("doc_len", {})
+            index["postings"] = data.get("postings", {})
+        except (OSError, ValueError):
+            # 손상된 색인은 비어 있는 것으로 보고 다음 인덱싱 때 다시 채움
+            pass
+    _indexes[collection_name] = index
+    return index
+
+
+def _save(collection_name: str, index: dict) -> None:
+    os.makedirs(LEXICAL_INDEX_DIR, exist_ok=True)
+    path = _index_path(collection_name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"doc_len": index["doc_len"], "postings": index["postings"]},
+            f,
+            ensure_ascii=False,
+        )
+    os.replace(tmp_path, path)
+    index["mtime"] = os.path.getmtime(path)
+
+
+def update(
+    collection_name: str,
+    added: Dict[str, str],
+    removed: Iterable[str] = (),
+) -> None:
+    """청크를 색인에 추가({청크 ID: 텍스트})하고 제거할 청크 ID를 삭제합니다."""
+    removed = [cid for cid in removed if cid not in added]
+    with _lock:
+        index = _load(collection_name)
+        doc_len, postings = index["doc_len"], index["postings"]
+        stale = set(removed) | (set(added) & set(doc_len))
+        if stale:
+            for term in list(postings):
+                entry = postings[term]
+                for cid in stale & entry.keys():
+                    del entry[cid]
+                if not entry:
+                    del postings[term]
+            for cid in stale:
+                doc_len.pop(cid, None)
+        for cid, text in added.items():
+            counts = Counter(tokenize(text))
+            doc_len[cid] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, {})[cid] = tf
+        if added or stale:
+            _save(collection_name, index)
+
+
+def missing_ids(collection_name: str, chunk_ids: Iterable[str]) -> List[str]:
+    """색인에 없는 청크 ID 목록을 반환합니다. (기존 데이터 보충용)"""
+    with _lock:
+        doc_len = _load(collection_name)["doc_len"]
+        return [cid for cid in chunk_ids if cid not in doc_len]
+
+
+def search(collection_name: str, query: str, k: int) -> List[Tuple[str, float]]:
+    """BM25 점수 상위 k개의 (청크 ID, 점수)를 반환합니다."""
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+    with _lock:
+        index = _load(collection_name)
+        doc_len, postings = index["doc_len"], index["postings"]
+        total = len(doc_len)
+        if total == 0:
+            return []
+        avgdl = sum(doc_len.values()) / total
+        scores: Dict[str, float] = {}
+        for term in terms:
+            entry = postings.get(term)
+            if not entry:
+                continue
+            idf = math.log(1 + (total - len(entry) + 0.5) / (len(entry) + 0.5))
+            for cid, tf in entry.items():
+                norm = tf + BM25_K1 * (
+                    1 - BM25_B + BM25_B * doc_len.get(cid, 0) / avgdl
+                )
+                scores[cid] = scores.get(cid, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
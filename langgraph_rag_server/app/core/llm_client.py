@@ -0,0 +1,98 @@
+"""Ollama LLM 호출 계층입니다.
+
+- 모든 요청에 `keep_alive`를 지정하여 요청이 뜸한 사이에 모델이 내려가지 않도록 합니다.
+- 프롬프트는 항상 [고정 지시문(system)] -> [사용자 문서 컨텍스트] -> [질문] 순서로 구성합니다.
+  Ollama는 직전 요청과 같은 앞부분(prefix)의 KV 캐시를 재사용하므로, 같은 사용자가
+  연달아 질문하면 지시문과 문서 컨텍스트 부분의 프리필을 건너뛸 수 있습니다.
+- 앱 시작 시 `warmup()`으로 모든 엔드포인트에 모델을 미리 로드하고 고정 지시문을 프리필합니다.
+- 실제 요청은 `ollama_pool`이 여러 엔드포인트 중 하나를 골라 보냅니다.
+"""
+
+import asyncio
+import logging
+from typing import List
+
+from app.core.config import (
+    OLLAMA_EMBEDDING_MODEL,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_LLM_MODEL,
+)
+from app.core.ollama_pool import (
+    OllamaBackend,
+    PooledChatModel,
+    PooledEmbeddings,
+    ollama_pool,
+)
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from ollama import AsyncClient
+
+logger = logging.getLogger(__name__)
+
+# 요청마다 바뀌지 않는 지시문 (프롬프트 맨 앞에 위치하여 항상 캐시됨)
+SYSTEM_PROMPT = (
+    "당신은 도움이 되는 AI 어시스턴트입니다. 모든 답변을 한국어로 해주세요.\n"
+    "전문적이고 정중한 어투를 사용해주세요.\n"
+    "사용자가 제공하는 [문서] 내용을 참고하여 [질문]에 답변하세요."
+)
+
+
+def create_chat_model() -> PooledChatModel:
+    """엔드포인트 풀을 통해 호출하는 질의응답용 채팅 모델을 생성합니다. (keep_alive 지정)"""
+    return PooledChatModel(OLLAMA_LLM_MODEL)
+
+
+def create_embeddings() -> PooledEmbeddings:
+    """엔드포인트 풀을 통해 호출하는 임베딩 객체를 생성합니다. (keep_alive 지정)"""
+    return PooledEmbeddings(OLLAMA_EMBEDDING_MODEL)
+
+
+def build_messages(
+    question: str, context_text: str, thinking_mode: bool
+) -> List[BaseMessage]:
+    """지시문 -> 문서 컨텍스트 -> 질문 순서의 채팅 메시지를 만듭니다.
+
+    추론 모드 여부(/no_think)도 맨 끝에 붙여 앞부분은 두 모드에서 동일하게 유지합니다.
+    """
+    content = (
+        f"[문서]\n{context_text}\n"
+        f"[질문]\n{question}\n"
+        f"[답변] 아래에 답변을 작성하세요.\n"
+        f"[답변]"
+    )
+    if not thinking_mode:
+        content += "\n/no_think"
+    return [SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=content)]
+
+
+async def _warmup_backend(backend: OllamaBackend) -> None:
+    client = AsyncClient(host=backend.url)
+    try:
+        await client.chat(
+            model=OLLAMA_LLM_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": "/no_think"},
+            ],
+            options={"num_predict": 1, "temperature": 0},
+            keep_alive=OLLAMA_KEEP_ALIVE,
+        )
+        logger.info(f"[LLM] 모델 예열 완료: {OLLAMA_LLM_MODEL} ({backend.url})")
+    except Exception as e:
+        logger.warning(f"[LLM] 모델 예열 실패: {OLLAMA_LLM_MODEL} ({backend.url}, {e})")
+    try:
+        await client.embed(
+            model=OLLAMA_EMBEDDING_MODEL, input="warmup", keep_alive=OLLAMA_KEEP_ALIVE
+        )
+        logger.info(f"[LLM] 임베딩 모델 예열 완료: {OLLAMA_EMBEDDING_MODEL} ({backend.url})")
+    except Exception as e:
+        logger.warning(
+            f"[LLM] 임베딩 모델 예열 실패: {OLLAMA_EMBEDDING_MODEL} ({backend.url}, {e})"
+        )
+
+
+async def warmup() -> None:
+    """모든 엔드포인트에 LLM과 임베딩 모델을 미리 로드하고 고정 지시문을 프리필합니다.
+
+    Ollama가 아직 준비되지 않았어도 앱 시작을 막지 않도록 실패는 경고로만 기록합니다.
+    """
+    await asyncio.gather(*(_warmup_backend(b) for b in ollama_pool.backends))
@@ -4,7 +4,16 @@ from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+)
 
 from app.core.database import Base
 
@@ -23,6 +32,69 @@ class UserDB(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
 
+class SemanticCacheDB(Base):
+    """질문 임베딩 기반 답변 캐시 모델입니다."""
+
+    __tablename__ = "semantic_cache"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, index=True)
+    embedding_model = Column(String)
+    thinking_mode = Column(Boolean, default=True)
+    question = Column(Text)
+    embedding = Column(LargeBinary)  # float32 벡터 바이트
+    answer = Column(Text)
+    think = Column(Text, default="")
+    sources = Column(Text)  # JSON 직렬화된 출처 목록
+    chunk_ids = Column(Text)  # JSON 직렬화된 근거 청크 ID 목록
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.now, index=True)
+
+
+class IngestJobDB(Base):
+    """백그라운드 문서 인덱싱 작업 모델입니다."""
+
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, index=True)
+    status = Column(String, default="queued")  # queued/running/completed/failed
+    filenames = Column(Text)  # JSON 직렬화된 업로드 파일명 목록
+    progress = Column(Text, default="{}")  # JSON 직렬화된 파일별 진행 상황
+    result = Column(Text, default="")
+    error = Column(Text, default="")
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class IngestedFileDB(Base):
+    """컬렉션에 인덱싱된 파일과 내용 해시 모델입니다. (증분 인덱싱 판단에 사용)"""
+
+    __tablename__ = "ingested_files"
+
+    collection_name = Column(String, primary_key=True)
+    filename = Column(String, primary_key=True)  # 사용자 문서 폴더 기준 상대경로
+    file_hash = Column(String)
+    chunk_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class DocumentChunkDB(Base):
+    """파일별 청크 ID 매핑 모델입니다. (파일 삭제 시 청크 ID로 바로 삭제)"""
+
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        # 같은 청크 ID를 다른 파일이 참조하는지 확인할 때 사용
+        Index("ix_document_chunks_collection_chunk", "collection_name", "chunk_id"),
+    )
+
+    collection_name = Column(String, primary_key=True)
+    filename = Column(String, primary_key=True)
+    chunk_id = Column(String, primary_key=True)
+
+
 # Pydantic 모델
 class User(BaseModel):
     """사용자 모델입니다."""
@@ -59,6 +131,18 @@ class UserCreate(BaseModel):
     _validate_password = field_validator("password")(validate_password)
 
 
+class PasswordChange(BaseModel):
+    """비밀번호 변경 요청 모델입니다."""
+
+    current_password: str
+    new_password: str
+
+    @field_validator("new_password")
+    @classmethod
+    def validate_new_password(cls, value: str) -> str:
+        return UserCreate.validate_password(value)
+
+
 class Token(BaseModel):
     """토큰 모델입니다."""
 
@@ -0,0 +1,246 @@
+"""여러 Ollama 엔드포인트에 요청을 분산하는 연결 풀 모듈입니다.
+
+- 엔드포인트(`OLLAMA_BASE_URLS`)마다 모델별 ChatOllama/OllamaEmbeddings를 한 번만 만들어
+  내부 HTTP 연결 풀(keep-alive)을 모든 요청이 함께 사용합니다.
+- 요청은 정상(healthy) 엔드포인트 중 처리 중인 요청 수가 가장 적은 곳으로 보냅니다.
+- 모델 로드는 CPU 노드에서 매우 오래 걸리므로, 해당 모델이 이미 로드된 엔드포인트를
+  우선 사용합니다. 단, 그 엔드포인트가 가장 한가한 곳보다 `affinity_slack`개 넘게 밀려 있으면
+  다른 엔드포인트로 보냅니다.
+- 백그라운드 헬스 체크가 주기적으로 `/api/ps`를 조회하여 상태와 로드된 모델 목록을 갱신하고,
+  연결 오류가 난 엔드포인트는 다음 헬스 체크가 성공할 때까지 제외합니다.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+import httpx
+from app.core.config import (
+    OLLAMA_AFFINITY_SLACK,
+    OLLAMA_BASE_URLS,
+    OLLAMA_HEALTH_INTERVAL,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_MAX_CONNECTIONS,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+from langchain_ollama import ChatOllama, OllamaEmbeddings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+# 엔드포인트 장애로 보고 제외할 오류 (모델 오류 등 요청 자체의 문제는 제외하지 않음)
+BACKEND_ERRORS = (ConnectionError, httpx.TransportError)
+
+
+class OllamaBackend:
+    """Ollama 엔드포인트 하나의 상태와 모델별 클라이언트를 보관합니다."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.healthy = True
+        self.loaded_models: Set[str] = set()
+        self.requests = 0
+        self.failures = 0
+        self.last_checked: Optional[float] = None
+        self._chat: Dict[str, ChatOllama] = {}
+        self._embeddings: Dict[str, OllamaEmbeddings] = {}
+        self._lock = threading.Lock()
+
+    def _client_kwargs(self) -> dict:
+        return {
+            "limits": httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+            )
+        }
+
+    def chat(self, model: str) -> ChatOllama:
+        with self._lock:
+            if model not in self._chat:
+                self._chat[model] = ChatOllama(
+                    model=model,
+                    base_url=self.url,
+                    temperature=0,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
+                    client_kwargs=self._client_kwargs(),
+                )
+            return self._chat[model]
+
+    def embeddings(self, model: str) -> OllamaEmbeddings:
+        with self._lock:
+            if model not in self._embeddings:
+                self._embeddings[model] = OllamaEmbeddings(
+                    model=model,
+                    base_url=self.url,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
+                    client_kwargs=self._client_kwargs(),
+                )
+            return self._embeddings[model]
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "loaded_models": sorted(self.loaded_models),
+        }
+
+
+def _model_loaded(backend: OllamaBackend, model: str) -> bool:
+    # /api/ps는 태그를 포함한 이름("qwen3:8b")을 반환하므로 태그 생략 시 ":latest"로 비교
+    name = model if ":" in model else f"{model}:latest"
+    return name in backend.loaded_models or model in backend.loaded_models
+
+
+class OllamaPool:
+    """엔드포인트 선택(최소 처리 중 요청 + 모델 친화도)과 헬스 체크를 담당합니다."""
+
+    def __init__(self, urls: List[str], affinity_slack: int, health_interval: float):
+        self.backends = [OllamaBackend(url or DEFAULT_OLLAMA_URL) for url in urls]
+        self.affinity_slack = affinity_slack
+        self.health_interval = health_interval
+        self._lock = threading.Lock()
+        # 처리 중 요청 수가 같을 때 한 엔드포인트로만 몰리지 않도록 순환 시작점을 바꿈
+        self._rotation = itertools.count()
+
+    def _choose(self, model: str) -> OllamaBackend:
+        candidates = [b for b in self.backends if b.healthy] or self.backends
+        offset = next(self._rotation) % len(candidates)
+        candidates = candidates[offset:] + candidates[:offset]
+        least = min(candidates, key=lambda b: b.outstanding)
+        warm = [b for b in candidates if _model_loaded(b, model)]
+        if warm:
+            best_warm = min(warm, key=lambda b: b.outstanding)
+            if best_warm.outstanding <= least.outstanding + self.affinity_slack:
+                return best_warm
+        return least
+
+    def _acquire(self, model: str) -> OllamaBackend:
+        with self._lock:
+            backend = self._choose(model)
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def _release(self, backend: OllamaBackend, model: str, error: Optional[BaseException]):
+        with self._lock:
+            backend.outstanding -= 1
+            if error is None:
+                backend.loaded_models.add(model if ":" in model else f"{model}:latest")
+            elif isinstance(error, BACKEND_ERRORS):
+                backend.failures += 1
+                if backend.healthy:
+                    logger.warning(f"[OLLAMA POOL] 엔드포인트 제외: {backend.url} ({error})")
+                backend.healthy = False
+
+    @contextmanager
+    def lease(self, model: str):
+        """요청을 보낼 엔드포인트를 골라 요청이 끝날 때까지 처리 중으로 표시합니다."""
+        backend = self._acquire(model)
+        error = None
+        try:
+            yield backend
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(backend, model, error)
+
+    @asynccontextmanager
+    async def alease(self, model: str):
+        """lease()의 비동기 버전입니다."""
+        backend = self._acquire(model)
+        error = None
+        try:
+            yield backend
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(backend, model, error)
+
+    async def check_health(self, client: httpx.AsyncClient) -> None:
+        """모든 엔드포인트의 /api/ps를 조회하여 상태와 로드된 모델 목록을 갱신합니다."""
+
+        async def check(backend: OllamaBackend) -> None:
+            try:
+                response = await client.get(f"{backend.url}/api/ps")
+                response.raise_for_status()
+                models = {m.get("name", "") for m in response.json().get("models", [])}
+                with self._lock:
+                    if not backend.healthy:
+                        logger.info(f"[OLLAMA POOL] 엔드포인트 복구: {backend.url}")
+                    backend.healthy = True
+                    backend.loaded_models = models
+            except Exception as e:
+                with self._lock:
+                    if backend.healthy:
+                        logger.warning(
+                            f"[OLLAMA POOL] 헬스 체크 실패: {backend.url} ({e})"
+                        )
+                    backend.healthy = False
+            backend.last_checked = time.time()
+
+        await asyncio.gather(*(check(b) for b in self.backends))
+
+    async def run_health_checks(self) -> None:
+        """앱이 실행되는 동안 주기적으로 헬스 체크를 수행합니다. (lifespan에서 시작)"""
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            while True:
+                await self.check_health(client)
+                await asyncio.sleep(self.health_interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backends": [b.stats() for b in self.backends]}
+
+
+class PooledChatModel:
+    """생성 요청마다 풀에서 엔드포인트를 골라 ChatOllama를 호출합니다."""
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def invoke(self, messages: List[BaseMessage]) -> BaseMessage:
+        with ollama_pool.lease(self.model) as backend:
+            return backend.chat(self.model).invoke(messages)
+
+    async def astream(self, messages: List[BaseMessage]) -> AsyncIterator[BaseMessageChunk]:
+        # 스트림이 끝날 때까지 같은 엔드포인트를 처리 중으로 표시
+        async with ollama_pool.alease(self.model) as backend:
+            async for chunk in backend.chat(self.model).astream(messages):
+                yield chunk
+
+
+class PooledEmbeddings(Embeddings):
+    """임베딩 호출마다 풀에서 엔드포인트를 골라 요청하는 Embeddings 구현입니다."""
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with ollama_pool.lease(self.model) as backend:
+            return backend.embeddings(self.model).embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with ollama_pool.lease(self.model) as backend:
+            return backend.embeddings(self.model).embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        async with ollama_pool.alease(self.model) as backend:
+            return await backend.embeddings(self.model).aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        async with ollama_pool.alease(self.model) as backend:
+            return await backend.embeddings(self.model).aembed_query(text)
+
+
+ollama_pool = OllamaPool(OLLAMA_BASE_URLS, OLLAMA_AFFINITY_SLACK, OLLAMA_HEALTH_INTERVAL)
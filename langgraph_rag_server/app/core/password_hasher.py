@@ -0,0 +1,146 @@
+"""bcrypt 해싱/검증을 이벤트 루프 밖의 전용 스레드 풀에서 수행하는 모듈입니다.
+
+- bcrypt는 라운드 12 기준 한 번에 수백 ms가 걸리므로, async 핸들러에서 직접 호출하면
+  그동안 같은 워커의 모든 요청(질의 스트리밍 등)이 멈춥니다.
+- 전용 풀의 스레드 수(`workers`)로 동시에 사용하는 CPU 코어 수를 제한하고,
+  대기 중인 요청이 `queue_limit`을 넘으면 `PasswordHasherBusy`로 즉시 거절합니다.
+- 검증 시 저장된 해시의 라운드 수가 현재 설정과 다르면 새 해시를 함께 반환하여
+  로그인 시점에 투명하게 재해싱할 수 있도록 합니다.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Optional, Tuple
+
+from passlib.context import CryptContext
+
+_SAMPLE_SIZE = 512
+# 분당 로그인 처리량 계산 구간(초)
+_THROUGHPUT_WINDOW = 60.0
+
+
+class PasswordHasherBusy(Exception):
+    """해싱 대기열이 가득 차 요청을 거절했음을 나타냅니다."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("로그인 요청이 많아 잠시 후 다시 시도해주세요.")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """bcrypt 작업을 제한된 스레드 풀에서 실행하고 처리량 지표를 기록합니다."""
+
+    def __init__(self, context: CryptContext, workers: int, queue_limit: int):
+        self.context = context
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="bcrypt"
+        )
+        self._lock = threading.Lock()
+        self.pending = 0  # 대기 + 실행 중
+        self.running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.rehashed = 0
+        self.logins_succeeded = 0
+        self.logins_failed = 0
+        self._service_total = 0.0
+        self._waits: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+        self._logins: Deque[float] = deque()
+
+    def _retry_after(self) -> int:
+        avg = self._service_total / self.completed if self.completed else 0.25
+        return max(1, math.ceil(avg * self.pending / self.workers))
+
+    async def _run(self, fn: Callable, *args):
+        with self._lock:
+            if self.pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise PasswordHasherBusy(self._retry_after())
+            self.pending += 1
+            self.submitted += 1
+        enqueued = time.monotonic()
+
+        def task():
+            started = time.monotonic()
+            with self._lock:
+                self.running += 1
+                self._waits.append(started - enqueued)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.pending -= 1
+                    self.completed += 1
+                    self._service_total += time.monotonic() - started
+
+        future = self._executor.submit(task)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # 요청이 취소되었는데 아직 시작 전이면 대기열에서 빼고 자리를 반납
+            if future.cancel():
+                with self._lock:
+                    self.pending -= 1
+            raise
+
+    async def hash(self, password: str) -> str:
+        """비밀번호를 현재 설정(라운드 수)으로 해시합니다."""
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """비밀번호를 검증하고, 라운드 수가 바뀌었으면 새 해시도 함께 반환합니다."""
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def record_login(self, succeeded: bool, rehashed: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if succeeded:
+                self.logins_succeeded += 1
+            else:
+                self.logins_failed += 1
+            if rehashed:
+                self.rehashed += 1
+            self._logins.append(now)
+            while self._logins and now - self._logins[0] > _THROUGHPUT_WINDOW:
+                self._logins.popleft()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            while self._logins and now - self._logins[0] > _THROUGHPUT_WINDOW:
+                self._logins.popleft()
+            waits = sorted(self._waits)
+
+            def percentile(q: float) -> float:
+                if not waits:
+                    return 0.0
+                return waits[min(len(waits) - 1, int(q * len(waits)))] * 1000
+
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "queued": self.pending - self.running,
+                "running": self.running,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "rehashed": self.rehashed,
+                "logins_succeeded": self.logins_succeeded,
+                "logins_failed": self.logins_failed,
+                "logins_per_minute": len(self._logins),
+                "queue_wait_ms_p50": round(percentile(0.5), 1),
+                "queue_wait_ms_p95": round(percentile(0.95), 1),
+                "avg_hash_ms": round(self._service_total / self.completed * 1000, 1)
+                if self.completed
+                else 0.0,
+            }
@@ -0,0 +1,157 @@
+"""PDF 로딩/정제/청크 분할 단계를 프로세스 풀에서 병렬로 실행하는 모듈입니다.
+
+워커 프로세스에서도 임포트되므로 서버 설정(app.core.config) 등 무거운 모듈에 의존하지 않습니다.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# (파일 키, 청크 목록, 페이지 수, 오류 메시지 또는 None)
+ParsedFile = Tuple[str, List[Document], int, Optional[str]]
+
+
+# 정제/분할 방식이 바뀌면 올려서 이전 결과로 만든 공유 청크 캐시를 무효화
+PARSER_VERSION = 1
+CHUNK_PARAMS = {
+    "chunk_size": 1000,
+    "chunk_overlap": 200,
+    "separators": ["\n\n", "\n", ".", "!", "?", ":", ";", ",", " ", ""],
+}
+# 업로드한 사용자/파일명에 따라 달라지는 메타데이터 키 (그 외 청크 내용은 파일 내용만으로 결정됨)
+SOURCE_METADATA_KEYS = ("source", "filename", "user_id")
+
+
+def make_text_splitter() -> RecursiveCharacterTextSplitter:
+    """인덱싱에 사용하는 텍스트 분할기를 생성합니다."""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_PARAMS["chunk_size"],
+        chunk_overlap=CHUNK_PARAMS["chunk_overlap"],
+        length_function=len,
+        # 컨텍스트 조립 시 청크 간 오버랩을 위치로 계산할 수 있도록 시작 위치를 기록
+        add_start_index=True,
+        separators=CHUNK_PARAMS["separators"],
+    )
+
+
+def chunk_params_fingerprint() -> str:
+    """파서 버전과 분할 설정을 요약한 문자열을 반환합니다. (청크 캐시 키에 사용)"""
+    payload = json.dumps({"version": PARSER_VERSION, **CHUNK_PARAMS}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def set_source_metadata(
+    doc: Document, file_path: str, user_id: Optional[str] = None
+) -> None:
+    """문서에 원본 경로/파일명/사용자 메타데이터를 기록합니다."""
+    doc.metadata["source"] = file_path
+    doc.metadata["filename"] = os.path.basename(file_path)
+    if user_id:
+        doc.metadata["user_id"] = user_id
+
+
+def parse_pdf(file_path: str, user_id: Optional[str] = None) -> Tuple[List[Document], int]:
+    """PDF 하나를 읽어 정제하고 청크로 분할합니다. (청크 목록, 페이지 수)를 반환합니다."""
+    loader = PyPDFLoader(file_path)
+    documents = loader.load()
+    enhanced_docs = []
+    for doc in documents:
+        doc.page_content = " ".join(doc.page_content.split())
+        if not doc.page_content.strip():
+            continue
+        set_source_metadata(doc, file_path, user_id)
+        doc.metadata["char_count"] = len(doc.page_content)
+        doc.metadata["word_count"] = len(doc.page_content.split())
+        enhanced_docs.append(doc)
+    return make_text_splitter().split_documents(enhanced_docs), len(documents)
+
+
+def _new_executor(workers: int) -> ProcessPoolExecutor:
+    # 인덱싱은 스레드에서 실행되므로 fork 대신 spawn으로 워커를 생성
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _terminate(executor: ProcessPoolExecutor) -> None:
+    # 실행 중인 작업은 취소할 수 없으므로 멈춘 워커 프로세스를 직접 종료
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _needs_retry(future) -> bool:
+    if not future.done() or future.cancelled():
+        return True
+    return isinstance(future.exception(), BrokenProcessPool)
+
+
+def parse_pdfs(
+    files: Iterable[Tuple[str, str]],
+    user_id: Optional[str] = None,
+    workers: int = 1,
+    timeout: Optional[float] = None,
+) -> Iterator[ParsedFile]:
+    """(파일 키, 경로) 목록을 파싱하여 입력 순서대로 결과를 내보냅니다.
+
+    파일이 2개 이상이고 `workers`가 2 이상이면 프로세스 풀에서 병렬로 파싱하며,
+    동시에 제출하는 파일 수를 `workers * 2`개로 제한하여 임베딩 단계가 앞선 결과를
+    소비하는 동안 다음 파일을 파싱합니다. `timeout`초 안에 끝나지 않은 파일은 오류로
+    보고하고, 워커를 종료한 뒤 남은 파일은 새 풀에서 계속 처리합니다.
+    """
+    files = list(files)
+    if workers <= 1 or len(files) <= 1:
+        for key, path in files:
+            try:
+                splits, pages = parse_pdf(path, user_id)
+            except Exception as e:
+                yield key, [], 0, str(e)
+            else:
+                yield key, splits, pages, None
+        return
+
+    workers = min(workers, len(files))
+    executor = _new_executor(workers)
+    remaining = iter(files)
+    pending: deque = deque()
+    try:
+        while True:
+            while len(pending) < workers * 2:
+                item = next(remaining, None)
+                if item is None:
+                    break
+                key, path = item
+                pending.append((key, path, executor.submit(parse_pdf, path, user_id)))
+            if not pending:
+                return
+            key, path, future = pending.popleft()
+            try:
+                splits, pages = future.result(timeout=timeout)
+            except (FutureTimeoutError, BrokenProcessPool) as e:
+                # 시간 초과 또는 워커 비정상 종료: 풀을 새로 만들고 끝나지 않은 파일을 재제출
+                _terminate(executor)
+                executor = _new_executor(workers)
+                pending = deque(
+                    (k, p, executor.submit(parse_pdf, p, user_id) if _needs_retry(f) else f)
+                    for k, p, f in pending
+                )
+                if isinstance(e, BrokenProcessPool):
+                    yield key, [], 0, f"파싱 프로세스 비정상 종료: {e}"
+                else:
+                    yield key, [], 0, f"파싱 제한 시간({timeout}초) 초과"
+            except Exception as e:
+                yield key, [], 0, str(e)
+            else:
+                yield key, splits, pages, None
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -1,17 +1,46 @@
 """RAG 질의응답 엔진을 제공하는 모듈입니다."""
 
 from app.core.config import (
-    CHROMA_PERSIST_DIR,
-    OLLAMA_BASE_URL,
+    CONTEXT_MIN_SCORE_RATIO,
+    CONTEXT_TOKEN_BUDGET,
+    HYBRID_SEARCH_ENABLED,
     OLLAMA_LLM_MODEL,
     OLLAMA_EMBEDDING_MODEL,
+    RAG_CANDIDATE_K,
+    RAG_SEARCH_WORKERS,
+    RAG_TOP_K,
+    RRF_K,
+)
+from app.core import lexical_index, llm_client, semantic_cache
+from app.core.context_packer import CONTEXT_SEPARATOR, pack_context
+from app.core.scheduler import (
+    GENERATE,
+    SchedulerSaturated,
+    current_user_id,
+    scheduler,
+)
+from app.core.services import ServiceContainer, get_services
+from app.core.singleflight import StreamSingleFlight
+from app.core.think_splitter import ThinkStreamSplitter
+from app.core.vector_index import FAISS, ChromaVectorIndex, VectorIndex
+from app.core.vectorstore_pool import vectorstore_pool
+from app.core.vectorstore_routing import (
+    get_user_collection_name,
+    user_filter,
+    vectorstore_name,
 )
 from chromadb.errors import InvalidCollectionException
 from langchain_chroma import Chroma
-from langchain_ollama import ChatOllama, OllamaEmbeddings
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage
+import asyncio
 import logging
-from functools import lru_cache
 import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 # 에러 메시지 상수
 ERR_NO_MODEL = "OLLAMA_LLM_MODEL 환경변수가 설정되어 있지 않습니다."
@@ -32,111 +61,583 @@ if OLLAMA_EMBEDDING_MODEL is None:
     logger.error(ERR_NO_EMBED)
     raise ValueError(ERR_NO_EMBED)
 
-llm = ChatOllama(
-    model=OLLAMA_LLM_MODEL,
-    base_url=OLLAMA_BASE_URL,
-    temperature=0,
-    system=(
-        """당신은 도움이 되는 AI 어시스턴트입니다. 모든 답변을 한국어로 해주세요.\n"
-        "전문적이고 정중한 어투를 사용해주세요."""
-    ),
-)
-embeddings = OllamaEmbeddings(
-    model=OLLAMA_EMBEDDING_MODEL,
-    base_url=OLLAMA_BASE_URL,
+# 하이브리드 검색으로 후보를 넓게 모은 뒤 상위 청크만 프롬프트에 사용
+SEARCH_K = RAG_TOP_K
+LLM_CACHE_SIZE = 128
+
+# 벡터 검색(동기 Chroma/FAISS 호출)을 이벤트 루프 밖에서 실행하는 전용 스레드 풀
+_search_executor = ThreadPoolExecutor(
+    max_workers=RAG_SEARCH_WORKERS, thread_name_prefix="rag-search"
 )
 
 
-def get_user_collection_name(user_id: str) -> str:
-    """사용자별 컬렉션 이름을 반환합니다."""
-    return f"rag_docs_{user_id}"
+def get_vectorstore(
+    collection_name: str, services: Optional[ServiceContainer] = None
+) -> VectorIndex:
+    """컬렉션의 벡터 인덱스를 반환합니다.
+
+    Chroma는 풀에서 컬렉션 핸들을 가져오고, 없으면 공유 클라이언트로 새로 열어 등록합니다.
+    FAISS는 프로세스에서 공유하는 인덱스를 그대로 사용합니다.
+    """
+    services = services or get_services()
+    if services.vector_backend == FAISS:
+        return services.vectorstore(collection_name)
+    return vectorstore_pool.get(
+        collection_name,
+        lambda: ChromaVectorIndex(
+            Chroma(
+                client=services.chroma_client,
+                collection_name=collection_name,
+                embedding_function=services.query_embeddings,
+            )
+        ),
+    )
+
+
+# 질문+context_text 조합에 대한 LLM 응답 캐시 (동기/비동기 경로 공용)
+_llm_cache: "OrderedDict[str, str]" = OrderedDict()
+_llm_cache_lock = threading.Lock()
+# 같은 프롬프트 해시로 동시에 들어온 요청이 하나의 LLM 생성을 공유하도록 함
+_llm_flights = StreamSingleFlight("LLM")
+
+
+def _get_cached_response(prompt_hash: str) -> Optional[str]:
+    with _llm_cache_lock:
+        text = _llm_cache.get(prompt_hash)
+        if text is not None:
+            _llm_cache.move_to_end(prompt_hash)
+        return text
+
+
+def _put_cached_response(prompt_hash: str, text: str) -> None:
+    with _llm_cache_lock:
+        _llm_cache[prompt_hash] = text
+        _llm_cache.move_to_end(prompt_hash)
+        while len(_llm_cache) > LLM_CACHE_SIZE:
+            _llm_cache.popitem(last=False)
 
 
-# 질문+context_text 조합에 대해 LLM 응답을 캐싱
-@lru_cache(maxsize=128)
-def cached_llm_response(prompt_hash: str, prompt: str):
-    response = llm.invoke(prompt)
-    content = response.content
+def llm_flight_stats() -> dict:
+    """진행 중인/공유된 LLM 생성 수를 반환합니다."""
+    return _llm_flights.stats()
+
+
+def _content_to_text(content) -> str:
     if isinstance(content, str):
         return content.strip()
     return str(content)
 
 
-def answer(question: str, user_id: str, thinking_mode: bool = True) -> dict:
+def cached_llm_response(
+    prompt_hash: str,
+    prompt: List[BaseMessage],
+    user_id: Optional[str] = None,
+    services: Optional[ServiceContainer] = None,
+) -> str:
+    """캐시에 없을 때만 LLM을 동기 호출합니다."""
+    cached = _get_cached_response(prompt_hash)
+    if cached is not None:
+        return cached
+    with scheduler.slot(GENERATE, user_id):
+        response = (services or get_services()).llm.invoke(prompt)
+    answer_text = _content_to_text(response.content)
+    _put_cached_response(prompt_hash, answer_text)
+    return answer_text
+
+
+async def _agenerate(
+    prompt_hash: str,
+    prompt: List[BaseMessage],
+    user_id: Optional[str],
+    services: Optional[ServiceContainer] = None,
+) -> AsyncIterator[str]:
+    """LLM 응답을 스트리밍으로 생성하고, 끝까지 생성되면 응답 캐시에 저장합니다."""
+    llm = (services or get_services()).llm
+    parts = []
+    # 생성이 끝날 때까지 스케줄러의 실행 자리를 점유
+    async with scheduler.aslot(GENERATE, user_id):
+        async for chunk in llm.astream(prompt):
+            text = chunk.content
+            if not isinstance(text, str):
+                text = str(text)
+            parts.append(text)
+            yield text
+    _put_cached_response(prompt_hash, "".join(parts).strip())
+
+
+async def astream_llm_response(
+    prompt_hash: str,
+    prompt: List[BaseMessage],
+    user_id: Optional[str] = None,
+    services: Optional[ServiceContainer] = None,
+) -> AsyncIterator[str]:
+    """캐시에 없을 때만 LLM을 호출하여 응답 조각을 반환합니다.
+
+    같은 프롬프트의 생성이 이미 진행 중이면 새로 호출하지 않고 그 생성에 합류합니다.
+    """
+    cached = _get_cached_response(prompt_hash)
+    if cached is not None:
+        yield cached
+        return
+    async for text in _llm_flights.stream(
+        prompt_hash, lambda: _agenerate(prompt_hash, prompt, user_id, services)
+    ):
+        yield text
+
+
+async def acached_llm_response(
+    prompt_hash: str,
+    prompt: List[BaseMessage],
+    user_id: Optional[str] = None,
+    services: Optional[ServiceContainer] = None,
+) -> str:
+    """캐시에 없을 때만 LLM을 비동기 호출합니다. (진행 중인 동일 생성은 공유)"""
+    parts = [
+        text
+        async for text in astream_llm_response(prompt_hash, prompt, user_id, services)
+    ]
+    return "".join(parts).strip()
+
+
+def _log_search_results(search_results: List[Tuple]) -> None:
+    logger.info(f"[RAG] 검색된 문서 청크 개수: {len(search_results)}")
+    for idx, (doc, score) in enumerate(search_results):
+        logger.debug(
+            f"[청크 {idx+1}] (유사도 점수: {score:.4f}) 파일: "
+            f"{doc.metadata.get('filename', 'unknown')} "
+            f"페이지: {doc.metadata.get('page', 'unknown')}"
+        )
+
+
+def _search(
+    vectorstore: VectorIndex,
+    collection_name: str,
+    question: str,
+    query_embedding,
+    where: Optional[dict] = None,
+) -> List[Tuple[Document, float]]:
+    """벡터 검색 결과와 키워드(BM25) 검색 결과를 RRF(Reciprocal Rank Fusion)로 결합합니다.
+
+    하이브리드 검색이 꺼져 있으면 벡터 검색 상위 SEARCH_K개를 그대로 반환합니다.
+    결합 시 점수는 RRF 점수(각 검색 결과 순위 r에 대해 1 / (RRF_K + r)의 합)입니다.
+    공유 컬렉션 모드에서는 `where`(user_id 조건)로 해당 사용자의 청크만 조회합니다.
+    """
+    if not HYBRID_SEARCH_ENABLED:
+        return vectorstore.search_by_vector(query_embedding, k=SEARCH_K, where=where)
+    vector_results = vectorstore.search_by_vector(
+        query_embedding, k=RAG_CANDIDATE_K, where=where
+    )
+    lexical_results = lexical_index.search(collection_name, question, RAG_CANDIDATE_K)
+
+    docs: Dict[str, Document] = {}
+    fused: Dict[str, float] = {}
+    for rank, (doc, _) in enumerate(vector_results, start=1):
+        key = doc.id or doc.page_content
+        docs[key] = doc
+        fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank)
+    for rank, (chunk_id, _) in enumerate(lexical_results, start=1):
+        fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank)
+    logger.info(
+        f"[RAG] 하이브리드 검색 후보: 벡터 {len(vector_results)}개, "
+        f"키워드 {len(lexical_results)}개"
+    )
+
+    top = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:SEARCH_K]
+    # 키워드 검색에만 나온 청크는 벡터스토어에서 본문/메타데이터를 가져옴
+    missing = [key for key, _ in top if key not in docs]
+    if missing:
+        stored = vectorstore.get(
+            ids=missing, where=where, include=["documents", "metadatas"]
+        )
+        for chunk_id, text, metadata in zip(
+            stored["ids"], stored["documents"], stored["metadatas"]
+        ):
+            docs[chunk_id] = Document(
+                id=chunk_id, page_content=text, metadata=metadata or {}
+            )
+    return [(docs[key], score) for key, score in top if key in docs]
+
+
+def _pack_context(search_results: List[Tuple]) -> Tuple[List[Tuple], dict]:
+    """검색 결과를 컨텍스트 토큰 예산에 맞게 줄이고 절약된 토큰 수를 기록합니다."""
+    packed, stats = pack_context(
+        search_results, CONTEXT_TOKEN_BUDGET, CONTEXT_MIN_SCORE_RATIO
+    )
+    logger.info(
+        f"[RAG] 컨텍스트 조립: 청크 {stats['chunks_in']}개 -> {stats['chunks_used']}개 "
+        f"(낮은 점수 {stats['dropped_low_score']}, 중복 {stats['dropped_overlap']}, "
+        f"예산 초과 {stats['dropped_budget']}, 오버랩 제거 {stats['trimmed_chunks']}), "
+        f"토큰 {stats['tokens_before']} -> {stats['tokens_after']} "
+        f"({stats['tokens_saved']} 절약)"
+    )
+    return packed, stats
+
+
+def _build_context(search_results: List[Tuple]) -> Tuple[str, list, list]:
+    """검색 결과에서 context_text, 출처 목록, 참고 문서 줄을 만듭니다."""
+    context_chunks = []
+    sources = []
+    source_lines = []
+    # 청크는 문서 순서로 정렬되어 있으므로 관련도는 점수 순위로 표시
+    ranks = {
+        idx: rank
+        for rank, idx in enumerate(
+            sorted(
+                range(len(search_results)),
+                key=lambda i: search_results[i][1],
+                reverse=True,
+            )
+        )
+    }
+    for idx, (doc, score) in enumerate(search_results):
+        context_chunks.append(doc.page_content)
+        src = {
+            "filename": doc.metadata.get("filename", "unknown"),
+            "source": doc.metadata.get("source", "unknown"),
+            "page": doc.metadata.get("page", "unknown"),
+            "score": float(score),
+            "preview": doc.page_content[:100],
+        }
+        sources.append(src)
+        rel = "높음" if ranks[idx] < 3 else "중간"
+        source_lines.append(
+            f"- {src['filename']} (페이지: {src['page']}, 관련도: {rel})"
+        )
+    return CONTEXT_SEPARATOR.join(context_chunks), sources, source_lines
+
+
+def _build_prompt(
+    question: str, context_text: str, thinking_mode: bool
+) -> List[BaseMessage]:
+    # 지시문 -> 문서 -> 질문 순서로 구성하여 Ollama 프롬프트 캐시를 재사용
+    return llm_client.build_messages(question, context_text, thinking_mode)
+
+
+def _prompt_hash(question: str, context_text: str, thinking_mode: bool) -> str:
+    return hashlib.sha256(
+        (question + context_text + str(thinking_mode)).encode("utf-8")
+    ).hexdigest()
+
+
+def _format_answer(answer_text: str, source_lines: list, sources: list) -> dict:
+    """응답이 <think>...</think> 태그로 시작하면 그 안의 내용을 think, 이후 내용을 answer로 분리합니다.
+    그렇지 않으면(태그 앞에 다른 텍스트가 있거나 닫는 태그가 없으면) 전체를 answer로,
+    think는 빈 문자열로 반환합니다. 스트리밍 경로의 `ThinkStreamSplitter`와 같은 규칙입니다."""
+    logger.info(f"[LLM 응답 원문] {answer_text}")
+    answer_part = ""
+    think_part = ""
+    m3 = re.match(r"\s*<think>(.*?)</think>(.*)", answer_text, re.DOTALL)
+    if m3:
+        think_part = m3.group(1).strip()
+        answer_part = m3.group(2).strip()
+    else:
+        answer_part = answer_text.strip()
+    # 참고 문서 정보 추가
+    if source_lines:
+        answer_part += "\n\n[참고 문서]\n" + "\n".join(source_lines)
+    return {"answer": answer_part, "think": think_part, "sources": sources}
+
+
+def answer(
+    question: str,
+    user_id: str,
+    thinking_mode: bool = True,
+    services: Optional[ServiceContainer] = None,
+) -> dict:
     """질문에 대해 RAG 기반 답변과 출처, (옵션)추론을 반환합니다."""
+    services = services or get_services()
     collection_name = get_user_collection_name(user_id)
+    store_name = vectorstore_name(user_id)
     try:
-        vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=embeddings,
-            persist_directory=CHROMA_PERSIST_DIR,
-        )
+        vectorstore = get_vectorstore(store_name, services)
         try:
-            search_results = vectorstore.similarity_search_with_score(question, k=8)
-            logger.info(f"[RAG] 검색된 문서 청크 개수: {len(search_results)}")
-            for idx, (doc, score) in enumerate(search_results):
-                logger.debug(
-                    f"[청크 {idx+1}] (유사도 점수: {score:.4f}) 파일: "
-                    f"{doc.metadata.get('filename', 'unknown')} "
-                    f"페이지: {doc.metadata.get('page', 'unknown')}"
-                )
+            token = current_user_id.set(user_id)
+            try:
+                query_embedding = services.query_embeddings.embed_query(question)
+            finally:
+                current_user_id.reset(token)
+            search_results = _search(
+                vectorstore,
+                collection_name,
+                question,
+                query_embedding,
+                user_filter(user_id),
+            )
+            _log_search_results(search_results)
         except InvalidCollectionException:
-            logger.warning(f"[RAG] 벡터스토어 컬렉션 없음: {collection_name}")
+            logger.warning(f"[RAG] 벡터스토어 컬렉션 없음: {store_name}")
+            vectorstore_pool.invalidate(store_name)
             return {"answer": ERR_VECTORSTORE, "sources": []}
+        except SchedulerSaturated:
+            raise
         except Exception as e:
             logger.error(f"[RAG] 벡터스토어 검색 오류: {e}")
             return {"answer": ERR_UNKNOWN, "sources": []}
         if not search_results:
             return {"answer": ERR_NO_DOCS, "sources": []}
-        context_chunks = []
-        sources = []
-        source_lines = []
-        for idx, (doc, score) in enumerate(search_results):
-            context_chunks.append(doc.page_content)
-            src = {
-                "filename": doc.metadata.get("filename", "unknown"),
-                "source": doc.metadata.get("source", "unknown"),
-                "page": doc.metadata.get("page", "unknown"),
-                "score": float(score),
-                "preview": doc.page_content[:100],
-            }
-            sources.append(src)
-            rel = "높음" if idx < 3 else "중간"
-            source_lines.append(
-                f"- {src['filename']} (페이지: {src['page']}, 관련도: {rel})"
-            )
-        context_text = "\n---\n".join(context_chunks)
-        # 프롬프트 본문은 추론/비추론 모두 완전히 동일하게 작성
-        prompt = (
-            f"아래 문서 내용을 참고하여 사용자의 질문에 답변하세요.\n"
-            f"[문서]\n{context_text}\n"
-            f"[질문]\n{question}\n"
-            f"[답변] 아래에 답변을 작성하세요.\n"
-            f"[답변]"
+        search_results, context_stats = _pack_context(search_results)
+        context_text, sources, source_lines = _build_context(search_results)
+        prompt = _build_prompt(question, context_text, thinking_mode)
+        try:
+            prompt_hash = _prompt_hash(question, context_text, thinking_mode)
+            answer_text = cached_llm_response(prompt_hash, prompt, user_id, services)
+            result = _format_answer(answer_text, source_lines, sources)
+            result["context_stats"] = context_stats
+            return result
+        except SchedulerSaturated:
+            raise
+        except Exception as e:
+            logger.error(f"[RAG] LLM 호출 오류: {e}")
+            return {"answer": ERR_LLM, "sources": sources}
+    except SchedulerSaturated:
+        raise
+    except Exception as e:
+        logger.critical(f"[RAG] 알 수 없는 오류: {e}")
+        return {"answer": ERR_UNKNOWN, "sources": []}
+
+
+async def _run_search(services: ServiceContainer, func, *args, **kwargs):
+    """동기 검색 함수를 전용 스레드 풀에서 실행합니다.
+
+    컨테이너의 세마포어로 제출되는 요청 수를 제한하여 실행 큐가 무한히 쌓이지 않도록 합니다.
+    """
+    loop = asyncio.get_running_loop()
+    async with services.search_slots():
+        return await loop.run_in_executor(
+            _search_executor, lambda: func(*args, **kwargs)
         )
-        if not thinking_mode:
-            prompt += "\n/no_think"
+
+
+def _chunk_ids_exist(
+    vectorstore: VectorIndex, chunk_ids: List[str], where: Optional[dict] = None
+) -> bool:
+    """시맨틱 캐시 항목의 근거 청크가 벡터스토어에 모두 남아 있는지 확인합니다."""
+    if not chunk_ids:
+        return False
+    found = vectorstore.get(ids=chunk_ids, where=where, include=[])
+    return len(found["ids"]) == len(set(chunk_ids))
+
+
+def _result_chunk_ids(search_results: List[Tuple]) -> List[str]:
+    return [doc.id for doc, _ in search_results if doc.id]
+
+
+async def _aretrieve(
+    question: str,
+    user_id: str,
+    thinking_mode: bool,
+    services: Optional[ServiceContainer] = None,
+) -> dict:
+    """질문을 비동기로 임베딩하고 시맨틱 캐시 조회 후 벡터 검색을 수행합니다.
+
+    {"results": 컨텍스트 예산에 맞게 조립된 검색 결과, "context_stats": 조립 통계,
+    "error": 오류 메시지, "embedding": 질문 임베딩, "cached": 시맨틱 캐시 적중 시 이전 답변}을
+    반환합니다.
+    """
+    services = services or get_services()
+    collection_name = get_user_collection_name(user_id)
+    store_name = vectorstore_name(user_id)
+    where = user_filter(user_id)
+    retrieval = {
+        "results": [],
+        "context_stats": {},
+        "error": "",
+        "embedding": None,
+        "cached": None,
+    }
+    vectorstore = await _run_search(services, get_vectorstore, store_name, services)
+    try:
+        token = current_user_id.set(user_id)
         try:
-            prompt_hash = hashlib.sha256((question + context_text + str(thinking_mode)).encode("utf-8")).hexdigest()
-            answer_text = cached_llm_response(prompt_hash, prompt)
-            logger.info(f"[LLM 응답 원문] {answer_text}")
-            # <think>...</think> 태그가 있으면 그 안의 내용을 think, 이후 내용을 answer로 분리. 없으면 전체를 answer로, think는 빈 문자열.
-            import re
-            answer_part = ""
-            think_part = ""
-            m3 = re.search(r"<think>(.*?)</think>(.*)", answer_text, re.DOTALL)
-            if m3:
-                think_part = m3.group(1).strip()
-                answer_part = m3.group(2).strip()
-            else:
-                answer_part = answer_text.strip()
-            # 참고 문서 정보 추가
-            if source_lines:
-                answer_part += "\n\n[참고 문서]\n" + "\n".join(source_lines)
-            return {"answer": answer_part, "think": think_part, "sources": sources}
+            query_embedding = await services.query_embeddings.aembed_query(question)
+        finally:
+            current_user_id.reset(token)
+        retrieval["embedding"] = query_embedding
+        cached = await _run_search(
+            services,
+            semantic_cache.lookup,
+            user_id,
+            query_embedding,
+            thinking_mode,
+            lambda chunk_ids: _chunk_ids_exist(vectorstore, chunk_ids, where),
+        )
+        if cached is not None:
+            retrieval["cached"] = cached
+            return retrieval
+        search_results = await _run_search(
+            services,
+            _search,
+            vectorstore,
+            collection_name,
+            question,
+            query_embedding,
+            where,
+        )
+        _log_search_results(search_results)
+    except InvalidCollectionException:
+        logger.warning(f"[RAG] 벡터스토어 컬렉션 없음: {store_name}")
+        vectorstore_pool.invalidate(store_name)
+        retrieval["error"] = ERR_VECTORSTORE
+        return retrieval
+    except SchedulerSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"[RAG] 벡터스토어 검색 오류: {e}")
+        retrieval["error"] = ERR_UNKNOWN
+        return retrieval
+    if not search_results:
+        retrieval["error"] = ERR_NO_DOCS
+        return retrieval
+    retrieval["results"], retrieval["context_stats"] = _pack_context(search_results)
+    return retrieval
+
+
+async def _astore_semantic_cache(
+    question: str,
+    user_id: str,
+    thinking_mode: bool,
+    retrieval: dict,
+    result: dict,
+    services: Optional[ServiceContainer] = None,
+) -> None:
+    chunk_ids = _result_chunk_ids(retrieval["results"])
+    if retrieval["embedding"] is None or not chunk_ids:
+        return
+    await _run_search(
+        services or get_services(),
+        semantic_cache.store,
+        user_id,
+        question,
+        retrieval["embedding"],
+        thinking_mode,
+        result,
+        chunk_ids,
+    )
+
+
+async def aanswer(
+    question: str,
+    user_id: str,
+    thinking_mode: bool = True,
+    services: Optional[ServiceContainer] = None,
+) -> dict:
+    """answer()의 비동기 버전입니다. 이벤트 루프를 막지 않고 임베딩/검색/생성을 수행합니다."""
+    try:
+        retrieval = await _aretrieve(question, user_id, thinking_mode, services)
+        if retrieval["cached"] is not None:
+            return retrieval["cached"]
+        if retrieval["error"]:
+            return {"answer": retrieval["error"], "sources": []}
+        search_results = retrieval["results"]
+        context_text, sources, source_lines = _build_context(search_results)
+        prompt = _build_prompt(question, context_text, thinking_mode)
+        try:
+            prompt_hash = _prompt_hash(question, context_text, thinking_mode)
+            answer_text = await acached_llm_response(
+                prompt_hash, prompt, user_id, services
+            )
+        except SchedulerSaturated:
+            raise
         except Exception as e:
             logger.error(f"[RAG] LLM 호출 오류: {e}")
             return {"answer": ERR_LLM, "sources": sources}
+        result = _format_answer(answer_text, source_lines, sources)
+        await _astore_semantic_cache(
+            question, user_id, thinking_mode, retrieval, result, services
+        )
+        return {**result, "context_stats": retrieval["context_stats"]}
+    except SchedulerSaturated:
+        # API 계층에서 429 + Retry-After로 응답
+        raise
     except Exception as e:
         logger.critical(f"[RAG] 알 수 없는 오류: {e}")
         return {"answer": ERR_UNKNOWN, "sources": []}
+
+
+async def astream_answer(
+    question: str,
+    user_id: str,
+    thinking_mode: bool = True,
+    services: Optional[ServiceContainer] = None,
+) -> AsyncIterator[dict]:
+    """aanswer()의 스트리밍 버전입니다.
+
+    검색 직후 {"type": "sources"} 이벤트를 보내고, 이후 LLM 토큰을 받는 즉시
+    {"type": "think"} / {"type": "answer"} 이벤트로 나누어 보냅니다.
+    마지막에는 항상 최종 답변을 담은 {"type": "done"} 이벤트를 보냅니다.
+    스트림 도중 스케줄러 대기열이 가득 차면 done 이벤트에 "retry_after"(초)를 함께 보냅니다.
+    """
+    try:
+        retrieval = await _aretrieve(question, user_id, thinking_mode, services)
+    except SchedulerSaturated as e:
+        yield {"type": "sources", "sources": []}
+        yield {
+            "type": "done",
+            "answer": str(e),
+            "think": "",
+            "sources": [],
+            "retry_after": e.retry_after,
+        }
+        return
+    except Exception as e:
+        logger.critical(f"[RAG] 알 수 없는 오류: {e}")
+        retrieval = {"results": [], "error": ERR_UNKNOWN, "cached": None}
+    cached = retrieval["cached"]
+    if cached is not None:
+        # 시맨틱 캐시 적중: 생성 없이 저장된 답변을 그대로 전송
+        yield {"type": "sources", "sources": cached["sources"]}
+        if cached.get("think"):
+            yield {"type": "think", "content": cached["think"]}
+        yield {"type": "done", **cached}
+        return
+    if retrieval["error"]:
+        yield {"type": "sources", "sources": []}
+        yield {
+            "type": "done",
+            "answer": retrieval["error"],
+            "think": "",
+            "sources": [],
+        }
+        return
+
+    search_results = retrieval["results"]
+    context_text, sources, source_lines = _build_context(search_results)
+    yield {"type": "sources", "sources": sources}
+
+    prompt = _build_prompt(question, context_text, thinking_mode)
+    prompt_hash = _prompt_hash(question, context_text, thinking_mode)
+    splitter = ThinkStreamSplitter()
+    try:
+        async for text in astream_llm_response(
+            prompt_hash, prompt, user_id, services
+        ):
+            for kind, delta in splitter.feed(text):
+                yield {"type": kind, "content": delta}
+        for kind, delta in splitter.finish():
+            yield {"type": kind, "content": delta}
+    except SchedulerSaturated as e:
+        yield {
+            "type": "done",
+            "answer": str(e),
+            "think": "",
+            "sources": sources,
+            "retry_after": e.retry_after,
+        }
+        return
+    except Exception as e:
+        logger.error(f"[RAG] LLM 스트리밍 오류: {e}")
+        yield {"type": "done", "answer": ERR_LLM, "think": "", "sources": sources}
+        return
+
+    answer_part = splitter.answer_text.strip()
+    if source_lines:
+        answer_part += "\n\n[참고 문서]\n" + "\n".join(source_lines)
+    result = {
+        "answer": answer_part,
+        "think": splitter.think_text.strip(),
+        "sources": sources,
+    }
+    await _astore_semantic_cache(
+        question, user_id, thinking_mode, retrieval, result, services
+    )
+    yield {"type": "done", **result, "context_stats": retrieval["context_stats"]}
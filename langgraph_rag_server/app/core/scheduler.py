@@ -0,0 +1,303 @@
+"""Ollama 백엔드로 가는 요청의 동시 실행 수를 제한하고 우선순위를 정하는 스케줄러입니다.
+
+- 요청은 작업 종류별(질의응답 생성, 질문 임베딩, 인덱싱 임베딩) 대기열에 들어갑니다.
+- 전체 동시 실행 수(`max_concurrency`)와 종류별 동시 실행 수 상한을 함께 적용하여
+  인덱싱 임베딩이 몰려도 대화형 요청이 사용할 자리가 남도록 합니다.
+- 자리가 나면 대기 중인 종류 중에서 가중치 비율(smooth weighted round-robin)로 다음 종류를 고르고,
+  같은 종류 안에서는 사용자별로 번갈아 꺼내 한 사용자가 대기열을 독점하지 못하게 합니다.
+- 대기열이 가득 차면 `SchedulerSaturated`를 발생시키며, API는 이를 429 + Retry-After로 응답합니다.
+
+동기 코드(스레드)와 비동기 코드(이벤트 루프) 모두 같은 스케줄러를 사용할 수 있습니다.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+
+from app.core.config import (
+    SCHEDULER_CLASS_CONCURRENCY,
+    SCHEDULER_MAX_CONCURRENCY,
+    SCHEDULER_QUEUE_LIMITS,
+    SCHEDULER_WEIGHTS,
+)
+from langchain_core.embeddings import Embeddings
+
+GENERATE = "generate"
+QUERY_EMBED = "query_embed"
+INGEST_EMBED = "ingest_embed"
+WORK_CLASSES = (GENERATE, QUERY_EMBED, INGEST_EMBED)
+
+ANONYMOUS = "-"
+# 명시적으로 사용자를 넘기기 어려운 경로(임베딩 래퍼 등)에서 사용할 현재 요청 사용자
+current_user_id: ContextVar[Optional[str]] = ContextVar(
+    "scheduler_user_id", default=None
+)
+
+# 대기 시간 분위수 계산에 사용할 최근 표본 수
+_SAMPLE_SIZE = 1000
+
+
+class SchedulerSaturated(Exception):
+    """작업 종류의 대기열이 가득 차 요청을 받을 수 없을 때 발생합니다."""
+
+    def __init__(self, work_class: str, retry_after: int):
+        super().__init__(
+            f"요청이 많아 처리할 수 없습니다. {retry_after}초 후 다시 시도해주세요."
+        )
+        self.work_class = work_class
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    """대기열에 들어간 요청 하나입니다. 자리가 배정되면 grant()로 깨웁니다."""
+
+    def __init__(self, work_class: str, user_id: str, loop=None):
+        self.work_class = work_class
+        self.user_id = user_id
+        self.enqueued = time.monotonic()
+        self.started = 0.0
+        self.granted = False
+        self._loop = loop
+        self._future = loop.create_future() if loop is not None else None
+        self._event = threading.Event() if loop is None else None
+
+    def grant(self) -> None:
+        self.granted = True
+        self.started = time.monotonic()
+        if self._future is not None:
+            self._loop.call_soon_threadsafe(self._resolve)
+        else:
+            self._event.set()
+
+    def _resolve(self) -> None:
+        if not self._future.done():
+            self._future.set_result(None)
+
+
+class _ClassStats:
+    def __init__(self):
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.running = 0
+        self.waits: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+        self.service_total = 0.0
+
+    def snapshot(self, queued: int) -> dict:
+        waits = sorted(self.waits)
+
+        def percentile(q: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(q * len(waits)))] * 1000
+
+        return {
+            "queued": queued,
+            "running": self.running,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "queue_wait_ms_p50": round(percentile(0.5), 1),
+            "queue_wait_ms_p95": round(percentile(0.95), 1),
+            "queue_wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+            "avg_service_ms": round(
+                self.service_total / self.completed * 1000, 1
+            )
+            if self.completed
+            else 0.0,
+        }
+
+
+class OllamaScheduler:
+    """작업 종류별 가중치/상한과 사용자별 공정성을 적용하여 실행 자리를 배정합니다."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        weights: Dict[str, int],
+        class_concurrency: Dict[str, int],
+        queue_limits: Dict[str, int],
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.weights = {c: max(1, weights.get(c, 1)) for c in WORK_CLASSES}
+        self.class_concurrency = {
+            c: max(1, class_concurrency.get(c, self.max_concurrency))
+            for c in WORK_CLASSES
+        }
+        self.queue_limits = {c: max(0, queue_limits.get(c, 0)) for c in WORK_CLASSES}
+        self._lock = threading.Lock()
+        self._running = 0
+        # 종류 -> (사용자 -> 대기 요청) ; 사용자 순서가 곧 공정성 순번
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Ticket]]"] = {
+            c: OrderedDict() for c in WORK_CLASSES
+        }
+        self._queued = {c: 0 for c in WORK_CLASSES}
+        self._credit = {c: 0 for c in WORK_CLASSES}
+        self._stats = {c: _ClassStats() for c in WORK_CLASSES}
+
+    def _retry_after(self, work_class: str) -> int:
+        stats = self._stats[work_class]
+        avg = stats.service_total / stats.completed if stats.completed else 1.0
+        waiting = self._queued[work_class] + stats.running
+        return max(1, min(60, math.ceil(waiting * avg / self.class_concurrency[work_class])))
+
+    def _reject_if_full(self, work_class: str) -> None:
+        if self._queued[work_class] >= self.queue_limits[work_class]:
+            self._stats[work_class].rejected += 1
+            raise SchedulerSaturated(work_class, self._retry_after(work_class))
+
+    def check(self, work_class: str) -> None:
+        """대기열에 자리가 없으면 미리 SchedulerSaturated를 발생시킵니다. (자리를 예약하지는 않음)"""
+        with self._lock:
+            self._reject_if_full(work_class)
+
+    def _enqueue(self, work_class: str, user_id: Optional[str], loop=None) -> _Ticket:
+        user_id = user_id or current_user_id.get() or ANONYMOUS
+        ticket = _Ticket(work_class, user_id, loop)
+        with self._lock:
+            self._reject_if_full(work_class)
+            self._stats[work_class].submitted += 1
+            self._queues[work_class].setdefault(user_id, deque()).append(ticket)
+            self._queued[work_class] += 1
+            self._dispatch()
+        return ticket
+
+    def _pick_class(self) -> Optional[str]:
+        eligible = [
+            c
+            for c in WORK_CLASSES
+            if self._queued[c]
+            and self._stats[c].running < self.class_concurrency[c]
+        ]
+        if not eligible:
+            return None
+        total = 0
+        for c in eligible:
+            self._credit[c] += self.weights[c]
+            total += self.weights[c]
+        chosen = max(eligible, key=lambda c: self._credit[c])
+        self._credit[chosen] -= total
+        return chosen
+
+    def _dispatch(self) -> None:
+        # self._lock을 잡은 상태에서 호출
+        while self._running < self.max_concurrency:
+            work_class = self._pick_class()
+            if work_class is None:
+                return
+            users = self._queues[work_class]
+            user_id, tickets = next(iter(users.items()))
+            ticket = tickets.popleft()
+            # 요청을 꺼낸 사용자는 순번의 맨 뒤로 보냄
+            del users[user_id]
+            if tickets:
+                users[user_id] = tickets
+            self._queued[work_class] -= 1
+            self._running += 1
+            stats = self._stats[work_class]
+            stats.running += 1
+            ticket.grant()
+            stats.waits.append(ticket.started - ticket.enqueued)
+
+    def _cancel(self, ticket: _Ticket) -> None:
+        """대기 중에 취소된 요청을 대기열에서 제거합니다. 이미 배정됐다면 자리를 반납합니다."""
+        with self._lock:
+            if not ticket.granted:
+                users = self._queues[ticket.work_class]
+                tickets = users.get(ticket.user_id)
+                if tickets is not None and ticket in tickets:
+                    tickets.remove(ticket)
+                    if not tickets:
+                        del users[ticket.user_id]
+                    self._queued[ticket.work_class] -= 1
+                return
+        self._release(ticket)
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._lock:
+            self._running -= 1
+            stats = self._stats[ticket.work_class]
+            stats.running -= 1
+            stats.completed += 1
+            stats.service_total += time.monotonic() - ticket.started
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, work_class: str, user_id: Optional[str] = None):
+        """스레드에서 사용할 실행 자리를 배정받을 때까지 기다립니다."""
+        ticket = self._enqueue(work_class, user_id)
+        ticket._event.wait()
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, work_class: str, user_id: Optional[str] = None):
+        """이벤트 루프를 막지 않고 실행 자리를 배정받을 때까지 기다립니다."""
+        ticket = self._enqueue(work_class, user_id, asyncio.get_running_loop())
+        try:
+            await ticket._future
+        except asyncio.CancelledError:
+            self._cancel(ticket)
+            raise
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "running": self._running,
+                "classes": {
+                    c: {
+                        **self._stats[c].snapshot(self._queued[c]),
+                        "weight": self.weights[c],
+                        "max_running": self.class_concurrency[c],
+                        "queue_limit": self.queue_limits[c],
+                    }
+                    for c in WORK_CLASSES
+                },
+            }
+
+
+class ScheduledEmbeddings(Embeddings):
+    """임베딩 호출마다 스케줄러의 실행 자리를 배정받도록 감쌉니다."""
+
+    def __init__(
+        self, base: Embeddings, work_class: str, user_id: Optional[str] = None
+    ):
+        self.base = base
+        self.work_class = work_class
+        self.user_id = user_id
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with scheduler.slot(self.work_class, self.user_id):
+            return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with scheduler.slot(self.work_class, self.user_id):
+            return self.base.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        async with scheduler.aslot(self.work_class, self.user_id):
+            return await self.base.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        async with scheduler.aslot(self.work_class, self.user_id):
+            return await self.base.aembed_query(text)
+
+
+scheduler = OllamaScheduler(
+    SCHEDULER_MAX_CONCURRENCY,
+    SCHEDULER_WEIGHTS,
+    SCHEDULER_CLASS_CONCURRENCY,
+    SCHEDULER_QUEUE_LIMITS,
+)
@@ -0,0 +1,212 @@
+"""질문 임베딩의 코사인 유사도로 이전 답변을 재사용하는 사용자별 시맨틱 캐시 모듈입니다.
+
+캐시 항목은 PostgreSQL(`semantic_cache` 테이블)에 저장되어 서버 재시작 후에도 유지되고
+여러 워커가 공유합니다. 조회 시에는 사용자별 벡터 행렬을 프로세스 메모리에 보관하고,
+DB의 항목 수/최신 생성 시각이 바뀌었을 때만 다시 읽어옵니다.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import func
+
+from app.core.config import (
+    OLLAMA_EMBEDDING_MODEL,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS,
+)
+from app.core.database import SessionLocal
+from app.core.models import SemanticCacheDB
+
+logger = logging.getLogger(__name__)
+
+# 사용자별 메모리 미러: user_id -> {"signature", "ids", "matrix", "rows"}
+_mirror: Dict[str, dict] = {}
+_mirror_lock = threading.Lock()
+
+
+def _normalize(vector) -> np.ndarray:
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    if norm == 0:
+        return arr
+    return arr / norm
+
+
+def _expiry_cutoff() -> datetime:
+    return datetime.now() - timedelta(seconds=SEMANTIC_CACHE_TTL_SECONDS)
+
+
+def _load_user_entries(db, user_id: str) -> dict:
+    """DB 상태가 바뀐 경우에만 사용자 캐시 항목을 다시 읽어 메모리 미러를 갱신합니다."""
+    count, latest = (
+        db.query(func.count(SemanticCacheDB.id), func.max(SemanticCacheDB.created_at))
+        .filter(SemanticCacheDB.user_id == user_id)
+        .one()
+    )
+    signature = (count, latest)
+    with _mirror_lock:
+        cached = _mirror.get(user_id)
+        if cached is not None and cached["signature"] == signature:
+            return cached
+    rows = (
+        db.query(SemanticCacheDB)
+        .filter(
+            SemanticCacheDB.user_id == user_id,
+            SemanticCacheDB.embedding_model == OLLAMA_EMBEDDING_MODEL,
+        )
+        .all()
+    )
+    vectors = [np.frombuffer(row.embedding, dtype=np.float32) for row in rows]
+    entry = {
+        "signature": signature,
+        "rows": [
+            {
+                "id": row.id,
+                "thinking_mode": bool(row.thinking_mode),
+                "created_at": row.created_at,
+                "answer": row.answer,
+                "think": row.think or "",
+                "sources": row.sources,
+                "chunk_ids": row.chunk_ids,
+            }
+            for row in rows
+        ],
+        "matrix": np.vstack(vectors) if vectors else None,
+    }
+    with _mirror_lock:
+        _mirror[user_id] = entry
+    return entry
+
+
+def lookup(
+    user_id: str,
+    embedding: List[float],
+    thinking_mode: bool,
+    validate_chunk_ids: Callable[[List[str]], bool],
+) -> Optional[dict]:
+    """유사한 이전 질문의 답변을 반환합니다. 근거 청크가 사라졌으면 항목을 폐기합니다."""
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    db = SessionLocal()
+    try:
+        entry = _load_user_entries(db, user_id)
+        if entry["matrix"] is None:
+            return None
+        query = _normalize(embedding)
+        if query.shape[0] != entry["matrix"].shape[1]:
+            return None
+        similarities = entry["matrix"] @ query
+        cutoff = _expiry_cutoff()
+        for idx in np.argsort(-similarities):
+            if similarities[idx] < SEMANTIC_CACHE_THRESHOLD:
+                break
+            row = entry["rows"][idx]
+            if row["thinking_mode"] != thinking_mode or row["created_at"] < cutoff:
+                continue
+            chunk_ids = json.loads(row["chunk_ids"] or "[]")
+            if not validate_chunk_ids(chunk_ids):
+                # 근거 문서가 삭제/변경된 항목은 제거
+                db.query(SemanticCacheDB).filter(SemanticCacheDB.id == row["id"]).delete()
+                db.commit()
+                continue
+            db.query(SemanticCacheDB).filter(SemanticCacheDB.id == row["id"]).update(
+                {SemanticCacheDB.hit_count: SemanticCacheDB.hit_count + 1},
+                synchronize_session=False,
+            )
+            db.commit()
+            logger.info(
+                f"[SEMANTIC CACHE] 적중 (user={user_id}, 유사도={similarities[idx]:.4f})"
+            )
+            return {
+                "answer": row["answer"],
+                "think": row["think"],
+                "sources": json.loads(row["sources"] or "[]"),
+            }
+        return None
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[SEMANTIC CACHE] 조회 오류: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def store(
+    user_id: str,
+    question: str,
+    embedding: List[float],
+    thinking_mode: bool,
+    result: dict,
+    chunk_ids: List[str],
+) -> None:
+    """답변을 캐시에 저장하고, 만료 항목과 최대 개수를 넘는 오래된 항목을 제거합니다."""
+    if not SEMANTIC_CACHE_ENABLED:
+        return
+    db = SessionLocal()
+    try:
+        db.add(
+            SemanticCacheDB(
+                id=str(uuid4()),
+                user_id=user_id,
+                embedding_model=OLLAMA_EMBEDDING_MODEL,
+                thinking_mode=thinking_mode,
+                question=question,
+                embedding=_normalize(embedding).tobytes(),
+                answer=result["answer"],
+                think=result.get("think", ""),
+                sources=json.dumps(result.get("sources", []), ensure_ascii=False),
+                chunk_ids=json.dumps(chunk_ids),
+            )
+        )
+        # TTL 만료 항목 제거
+        db.query(SemanticCacheDB).filter(
+            SemanticCacheDB.user_id == user_id,
+            SemanticCacheDB.created_at < _expiry_cutoff(),
+        ).delete(synchronize_session=False)
+        db.flush()
+        # 사용자별 최대 항목 수 초과분(오래된 순) 제거
+        stale_ids = [
+            row.id
+            for row in db.query(SemanticCacheDB.id)
+            .filter(SemanticCacheDB.user_id == user_id)
+            .order_by(SemanticCacheDB.created_at.desc())
+            .offset(SEMANTIC_CACHE_MAX_ENTRIES)
+            .all()
+        ]
+        if stale_ids:
+            db.query(SemanticCacheDB).filter(SemanticCacheDB.id.in_(stale_ids)).delete(
+                synchronize_session=False
+            )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[SEMANTIC CACHE] 저장 오류: {e}")
+    finally:
+        db.close()
+
+
+def invalidate_user(user_id: Optional[str]) -> None:
+    """사용자 문서가 변경되었을 때 해당 사용자의 캐시 항목을 모두 제거합니다."""
+    if not SEMANTIC_CACHE_ENABLED or not user_id:
+        return
+    db = SessionLocal()
+    try:
+        db.query(SemanticCacheDB).filter(SemanticCacheDB.user_id == user_id).delete(
+            synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[SEMANTIC CACHE] 무효화 오류: {e}")
+    finally:
+        db.close()
+        with _mirror_lock:
+            _mirror.pop(user_id, None)
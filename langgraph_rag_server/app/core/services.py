@@ -0,0 +1,171 @@
+"""앱 전역에서 공유하는 클라이언트(LLM, 임베딩, 벡터 인덱스)를 보관하는 서비스 컨테이너 모듈입니다.
+
+컨테이너는 `main.lifespan`에서 한 번 생성되어 `app.state.services`에 등록되고,
+라우터는 `Depends(provide_services)`로 주입받아 RAG 엔진/인덱싱 함수에 `services` 인자로
+넘깁니다. 인자 없이 호출된 경우(스크립트, 백그라운드 작업 등)에는 `get_services()`로
+전역 컨테이너를 사용하며, lifespan 없이 실행되면 처음 사용할 때 기본 컨테이너를 만듭니다.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+import chromadb
+from fastapi import Request
+from app.core.config import (
+    CHROMA_PERSIST_DIR,
+    EMBEDDING_CACHE_DISK,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_SIZE,
+    OLLAMA_EMBEDDING_MODEL,
+    RAG_SEARCH_MAX_PENDING,
+    RAG_SEARCH_WORKERS,
+    VECTOR_INDEX_BACKEND,
+    VECTOR_INDEX_DIR,
+)
+from app.core.embedding_cache import CachedEmbeddings
+from app.core.llm_client import create_chat_model, create_embeddings
+from app.core.scheduler import QUERY_EMBED, ScheduledEmbeddings
+from app.core.vector_index import (
+    FAISS,
+    ChromaVectorIndex,
+    FaissIndexRegistry,
+    VectorIndex,
+    resolve_backend,
+)
+from app.core.vectorstore_pool import vectorstore_pool
+from chromadb.api.client import SharedSystemClient
+from chromadb.config import Settings
+from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """요청마다 새로 만들지 않고 재사용할 클라이언트를 소유합니다.
+
+    - `llm`: 질의응답용 채팅 모델 (Ollama 엔드포인트 풀 경유)
+    - `embeddings`: 인덱싱/삭제 등에 사용하는 임베딩 클라이언트
+    - `query_embeddings`: 질문 임베딩용 (캐시 + 스케줄러의 질문 임베딩 대기열)
+    - `chroma_client`: 모든 컬렉션이 공유하는 Chroma PersistentClient
+    - `vector_backend`: 사용할 벡터 인덱스 (`chroma` 또는 `faiss`)
+    - `faiss_indexes`: faiss 백엔드일 때 컬렉션별로 한 번만 여는 FAISS 인덱스
+    - `search_slots()`: 검색 스레드 풀에 동시에 제출되는 요청 수를 제한하는 세마포어
+    """
+
+    def __init__(self):
+        self.llm = create_chat_model()
+        self.embeddings = create_embeddings()
+        # 동일한 질문이 반복될 때 Ollama 임베딩 호출을 생략하도록 캐시로 감쌈
+        # (캐시에 없을 때만 스케줄러의 질문 임베딩 대기열을 거쳐 Ollama를 호출)
+        self.query_embeddings = CachedEmbeddings(
+            ScheduledEmbeddings(self.embeddings, QUERY_EMBED),
+            model_name=OLLAMA_EMBEDDING_MODEL,
+            max_entries=EMBEDDING_CACHE_SIZE,
+            disk_path=EMBEDDING_CACHE_PATH if EMBEDDING_CACHE_DISK else None,
+        )
+        self.chroma_client = chromadb.PersistentClient(
+            path=CHROMA_PERSIST_DIR, settings=Settings(anonymized_telemetry=False)
+        )
+        self.vector_backend = resolve_backend(VECTOR_INDEX_BACKEND)
+        self.faiss_indexes = FaissIndexRegistry(VECTOR_INDEX_DIR)
+        self._search_slots: Optional[asyncio.Semaphore] = None
+        self._search_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def search_slots(self) -> asyncio.Semaphore:
+        """현재 이벤트 루프에 묶인 검색 세마포어를 반환합니다.
+
+        컨테이너는 이벤트 루프 밖(스크립트, 테스트)에서 만들어질 수 있으므로 세마포어는
+        실행 중인 루프 안에서 처음 사용할 때 만들고, 루프가 바뀌면 새로 만듭니다.
+        """
+        loop = asyncio.get_running_loop()
+        if self._search_slots is None or self._search_slots_loop is not loop:
+            self._search_slots = asyncio.Semaphore(
+                RAG_SEARCH_WORKERS + RAG_SEARCH_MAX_PENDING
+            )
+            self._search_slots_loop = loop
+        return self._search_slots
+
+    def vectorstore(
+        self, collection_name: str, embedding_function: Optional[Embeddings] = None
+    ) -> VectorIndex:
+        """설정된 백엔드로 컬렉션의 벡터 인덱스를 엽니다.
+
+        Chroma는 공유 PersistentClient 위에 컬렉션 핸들을 열고,
+        FAISS는 프로세스에서 공유하는 인덱스 인스턴스를 반환합니다.
+        """
+        if self.vector_backend == FAISS:
+            return self.faiss_indexes.get(collection_name)
+        return ChromaVectorIndex(
+            Chroma(
+                client=self.chroma_client,
+                collection_name=collection_name,
+                embedding_function=embedding_function or self.embeddings,
+            )
+        )
+
+    def close(self) -> None:
+        self.query_embeddings.close()
+        # 메모리에만 반영된 FAISS 인덱스 변경을 스냅샷으로 저장
+        self.faiss_indexes.close()
+        # 이 클라이언트에 묶인 컬렉션 핸들을 버리고, chromadb가 경로별로 캐시하는
+        # 시스템 객체도 정리하여 다음 컨테이너가 새 클라이언트를 열도록 함
+        vectorstore_pool.clear()
+        SharedSystemClient.clear_system_cache()
+
+
+_services: Optional[ServiceContainer] = None
+_services_lock = threading.Lock()
+# shutdown_services() 이후 남은 호출이 새 컨테이너를 조용히 만들지 않도록 표시
+_shut_down = False
+
+
+def init_services() -> ServiceContainer:
+    """서비스 컨테이너를 새로 만들어 전역으로 등록합니다. (lifespan 시작 시 호출)"""
+    global _services, _shut_down
+    with _services_lock:
+        if _services is not None:
+            _services.close()
+        _services = ServiceContainer()
+        _shut_down = False
+        return _services
+
+
+def get_services() -> ServiceContainer:
+    """등록된 서비스 컨테이너를 반환합니다.
+
+    lifespan 없이 실행되는 경우(테스트, 스크립트)에는 처음 사용할 때 기본 컨테이너를 만듭니다.
+    `shutdown_services()` 이후에는 새로 만들지 않고 RuntimeError를 발생시킵니다.
+    """
+    global _services
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                if _shut_down:
+                    raise RuntimeError("서비스 컨테이너가 이미 종료되었습니다.")
+                _services = ServiceContainer()
+    return _services
+
+
+def provide_services(request: Request) -> ServiceContainer:
+    """라우터에 서비스 컨테이너를 주입하는 FastAPI 의존성입니다.
+
+    lifespan이 등록한 `app.state.services`를 반환하고, lifespan 없이 앱을 띄운 경우
+    (테스트 클라이언트 등)에는 기본 컨테이너를 등록하여 사용합니다.
+    """
+    services = getattr(request.app.state, "services", None)
+    if services is None:
+        services = request.app.state.services = get_services()
+    return services
+
+
+def shutdown_services() -> None:
+    """서비스 컨테이너가 소유한 자원을 정리합니다. (lifespan 종료 시 호출)"""
+    global _services, _shut_down
+    with _services_lock:
+        if _services is not None:
+            _services.close()
+            _services = None
+        _shut_down = True
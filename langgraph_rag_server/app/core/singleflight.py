@@ -0,0 +1,108 @@
+"""동일한 키의 비동기 스트림 생성을 하나로 합치는(single-flight) 모듈입니다.
+
+같은 프롬프트에 대한 LLM 생성이 이미 진행 중이면 새 요청은 생성을 다시 시작하지 않고
+진행 중인 스트림에 합류합니다. 합류한 요청은 지금까지 생성된 조각을 먼저 받은 뒤
+이후 조각을 실시간으로 받으므로, 스트리밍/비스트리밍 요청 모두 같은 결과를 공유합니다.
+모든 구독자가 떠나면(클라이언트 연결 종료 등) 생성도 취소됩니다.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SharedStream:
+    """하나의 원본 스트림을 여러 구독자에게 처음부터 재생해 주는 브로드캐스터입니다."""
+
+    def __init__(self, source: AsyncIterator[str], on_finish: Callable[[], None]):
+        self._chunks: List[str] = []
+        self._error: Optional[BaseException] = None
+        self._done = False
+        self._changed = asyncio.Event()
+        self._subscribers = 0
+        self._on_finish = on_finish
+        self._task = asyncio.create_task(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[str]) -> None:
+        try:
+            async for chunk in source:
+                self._chunks.append(chunk)
+                self._notify()
+        except BaseException as e:
+            self._error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self._done = True
+            self._on_finish()
+            self._notify()
+
+    def _notify(self) -> None:
+        # 기다리는 구독자를 깨우고, 다음 변경을 위해 새 이벤트로 교체
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """생성된 조각을 처음부터 순서대로 반환합니다. 원본 오류는 그대로 다시 발생합니다."""
+        self._subscribers += 1
+        index = 0
+        try:
+            while True:
+                changed = self._changed
+                if index < len(self._chunks):
+                    yield self._chunks[index]
+                    index += 1
+                    continue
+                if self._done:
+                    if self._error is not None:
+                        if isinstance(self._error, asyncio.CancelledError):
+                            raise RuntimeError("공유 생성이 취소되었습니다.")
+                        raise self._error
+                    return
+                await changed.wait()
+        finally:
+            self._subscribers -= 1
+            if self._subscribers == 0 and not self._done:
+                # 결과를 기다리는 요청이 더 없으면 생성을 중단하고 새 요청이 합류하지 않도록 등록 해제
+                self._task.cancel()
+                self._on_finish()
+
+
+class StreamSingleFlight:
+    """키별로 진행 중인 SharedStream을 관리합니다. (이벤트 루프 하나에서만 사용)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, SharedStream] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def stream(
+        self, key: str, factory: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """진행 중인 생성이 있으면 합류하고, 없으면 factory()로 새 생성을 시작합니다."""
+        flight = self._flights.get(key)
+        if flight is None:
+            self.started += 1
+            flight = SharedStream(
+                factory(), on_finish=lambda: self._release(key, flight)
+            )
+            self._flights[key] = flight
+        else:
+            self.coalesced += 1
+            logger.info(f"[{self.name}] 진행 중인 동일 요청에 합류: {key[:12]}")
+        return flight.subscribe()
+
+    def _release(self, key: str, flight: SharedStream) -> None:
+        # 취소 후 같은 키로 새로 시작된 생성은 지우지 않음
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
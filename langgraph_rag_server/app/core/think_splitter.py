@@ -0,0 +1,93 @@
+"""LLM 스트리밍 출력에서 <think> 추론 구간과 답변 구간을 점진적으로 분리하는 모듈입니다."""
+
+from typing import List, Tuple
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+def _partial_suffix_len(text: str, tag: str) -> int:
+    """text의 끝부분이 tag의 접두사와 겹치는 길이를 반환합니다."""
+    for size in range(min(len(text), len(tag) - 1), 0, -1):
+        if tag.startswith(text[-size:]):
+            return size
+    return 0
+
+
+class ThinkStreamSplitter:
+    """토큰 조각을 받아 ("think", 텍스트) / ("answer", 텍스트) 이벤트로 변환합니다.
+
+    `rag_engine._format_answer`의 정규식 분리와 같은 결과를 스트리밍 중에 만들어냅니다.
+    응답이 (앞 공백을 제외하고) <think>로 시작할 때만 추론 구간으로 보고, 태그 앞에 다른
+    텍스트가 있으면 전체를 답변으로 취급합니다.
+    태그가 토큰 경계에서 잘려 들어와도 처리할 수 있도록 태그 후보 문자열은 버퍼에 보관합니다.
+    """
+
+    def __init__(self):
+        self.mode = "start"
+        self._buffer = ""
+        self._strip_leading = False
+        self.think_text = ""
+        self.answer_text = ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """새 토큰 조각을 처리하고 확정된 이벤트 목록을 반환합니다."""
+        self._buffer += chunk
+        events: List[Tuple[str, str]] = []
+        while True:
+            if self.mode == "start":
+                stripped = self._buffer.lstrip()
+                if stripped.startswith(THINK_OPEN):
+                    self._buffer = stripped[len(THINK_OPEN) :]
+                    self.mode = "think"
+                    self._strip_leading = True
+                    continue
+                if THINK_OPEN.startswith(stripped):
+                    # 아직 <think> 태그인지 판단할 수 없음
+                    return events
+                self.mode = "answer"
+                self._strip_leading = True
+                continue
+            if self.mode == "think":
+                end = self._buffer.find(THINK_CLOSE)
+                if end >= 0:
+                    self._emit(events, "think", self._buffer[:end])
+                    self._buffer = self._buffer[end + len(THINK_CLOSE) :]
+                    self.mode = "answer"
+                    self._strip_leading = True
+                    continue
+                keep = _partial_suffix_len(self._buffer, THINK_CLOSE)
+                self._emit(events, "think", self._buffer[: len(self._buffer) - keep])
+                self._buffer = self._buffer[len(self._buffer) - keep :]
+                return events
+            # answer 모드
+            self._emit(events, "answer", self._buffer)
+            self._buffer = ""
+            return events
+
+    def finish(self) -> List[Tuple[str, str]]:
+        """스트림 종료 시 버퍼에 남은 텍스트를 내보냅니다."""
+        events: List[Tuple[str, str]] = []
+        if self.mode == "think":
+            # 닫는 태그가 없으면 정규식 분리와 동일하게 전체를 답변으로 취급
+            self.answer_text = THINK_OPEN + self.think_text + self._buffer
+            self.think_text = ""
+        elif self._buffer:
+            self._emit(events, "answer", self._buffer.lstrip())
+        self._buffer = ""
+        self.mode = "answer"
+        return events
+
+    def _emit(self, events: List[Tuple[str, str]], kind: str, text: str) -> None:
+        if self._strip_leading:
+            text = text.lstrip()
+            if not text:
+                return
+            self._strip_leading = False
+        if not text:
+            return
+        if kind == "think":
+            self.think_text += text
+        else:
+            self.answer_text += text
+        events.append((kind, text))
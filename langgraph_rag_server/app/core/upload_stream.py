@@ -0,0 +1,219 @@
+"""PDF 업로드 요청 본문을 메모리에 모으지 않고 디스크로 바로 흘려 쓰는 모듈입니다.
+
+- multipart 본문을 도착하는 대로 파싱하여 파일 부분만 임시 파일(`.<uuid>.part`)에 비동기로 씁니다.
+- 크기 제한은 바이트가 도착하는 동안 검사하여 초과하는 즉시 수신을 중단하고,
+  `%PDF` 시그니처는 첫 데이터에서 확인합니다.
+- 쓰는 동안 SHA-256 해시를 함께 계산하여 중복 업로드 판단에 사용합니다.
+- 검증을 통과한 임시 파일은 호출한 쪽에서 원본 저장소(`blob_store`)로 옮기고,
+  중복 등으로 저장하지 않는 경우 `ReceivedFile.discard()`로 삭제합니다.
+"""
+
+import hashlib
+import os
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+import anyio
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+PDF_SIGNATURE = b"%PDF"
+# Content-Length로 미리 거절할 때 허용하는 multipart 경계/헤더 여유분
+_MULTIPART_OVERHEAD = 64 * 1024
+
+ERR_INVALID_FILENAME = "유효하지 않은 파일명입니다."
+ERR_NOT_PDF = "PDF 파일만 업로드할 수 있습니다."
+ERR_TOO_LARGE = "최대 10MB 이하의 파일만 업로드할 수 있습니다."
+ERR_INVALID_SIGNATURE = "유효한 PDF 파일이 아닙니다."
+ERR_NO_FILE = "업로드할 파일이 없습니다."
+
+
+class UploadRejected(Exception):
+    """업로드 요청이 검증을 통과하지 못했음을 나타냅니다."""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class ReceivedFile:
+    """임시 파일로 수신이 끝난 업로드 파일입니다."""
+
+    def __init__(self, filename: str, temp_path: str, size: int, sha256: str):
+        self.filename = filename
+        self.temp_path = temp_path
+        self.size = size
+        self.sha256 = sha256
+
+    def discard(self) -> None:
+        """임시 파일을 삭제합니다."""
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _decode(value: bytes) -> str:
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("latin-1")
+
+
+def _validate_part(filename: str, content_type: Optional[str]) -> None:
+    # 파일명 검증: 경로 탐색 금지
+    if not filename or ".." in filename or "/" in filename or "\\" in filename:
+        raise UploadRejected(ERR_INVALID_FILENAME)
+    # 확장자 및 MIME 타입 체크
+    if not filename.lower().endswith(".pdf"):
+        raise UploadRejected(ERR_NOT_PDF)
+    if content_type not in ["application/pdf", "application/octet-stream"]:
+        raise UploadRejected(ERR_NOT_PDF)
+
+
+class _FileReceiver:
+    """파서 이벤트를 받아 지정한 필드의 파일 부분만 임시 파일에 씁니다."""
+
+    def __init__(self, dest_dir: str, field_name: str, max_bytes: int):
+        self.dest_dir = dest_dir
+        self.field_name = field_name
+        self.max_bytes = max_bytes
+        self.result: Optional[ReceivedFile] = None
+        self._active = False
+        self._file = None
+        self._filename = ""
+        self._temp_path = ""
+        self._head = b""
+        self._size = 0
+        self._digest = hashlib.sha256()
+
+    async def handle(self, event: str, payload) -> None:
+        if event == "headers":
+            await self._begin(payload)
+        elif event == "data" and self._active:
+            await self._write(payload)
+        elif event == "end" and self._active:
+            await self._finish()
+
+    async def _begin(self, headers: dict) -> None:
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        # 지정한 필드의 첫 번째 파일만 받고 나머지 부분은 무시
+        if (
+            self.result is not None
+            or self._file is not None
+            or _decode(options.get(b"name", b"")) != self.field_name
+        ):
+            return
+        filename = _decode(options.get(b"filename", b""))
+        content_type = headers.get(b"content-type")
+        _validate_part(filename, _decode(content_type) if content_type else None)
+        self._filename = filename
+        self._temp_path = os.path.join(self.dest_dir, f".{uuid4().hex}.part")
+        self._file = await anyio.open_file(self._temp_path, "wb")
+        self._active = True
+
+    async def _write(self, data: bytes) -> None:
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            raise UploadRejected(ERR_TOO_LARGE)
+        if len(self._head) < len(PDF_SIGNATURE):
+            self._head += data[: len(PDF_SIGNATURE) - len(self._head)]
+            if not PDF_SIGNATURE.startswith(self._head):
+                raise UploadRejected(ERR_INVALID_SIGNATURE)
+        self._digest.update(data)
+        await self._file.write(data)
+
+    async def _finish(self) -> None:
+        self._active = False
+        await self._file.aclose()
+        self._file = None
+        if self._head != PDF_SIGNATURE:
+            raise UploadRejected(ERR_INVALID_SIGNATURE)
+        self.result = ReceivedFile(
+            self._filename, self._temp_path, self._size, self._digest.hexdigest()
+        )
+
+    async def abort(self) -> None:
+        if self._file is not None:
+            await self._file.aclose()
+            self._file = None
+        if self._temp_path:
+            try:
+                os.remove(self._temp_path)
+            except FileNotFoundError:
+                pass
+
+
+async def receive_pdf_upload(
+    request: Request,
+    dest_dir: str,
+    field_name: str = "file",
+    max_bytes: int = MAX_UPLOAD_BYTES,
+) -> ReceivedFile:
+    """multipart 요청에서 PDF 파일 하나를 스트리밍으로 받아 `dest_dir`의 임시 파일에 저장합니다.
+
+    검증에 실패하면 임시 파일을 지우고 `UploadRejected`를 발생시킵니다.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadRejected(ERR_NO_FILE)
+    # 본문을 받기 전에 선언된 크기로 먼저 거절
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes + _MULTIPART_OVERHEAD:
+        raise UploadRejected(ERR_TOO_LARGE)
+
+    # 파서 콜백은 동기 함수이므로 이벤트를 모아 두었다가 청크마다 비동기로 처리
+    events: List[Tuple[str, object]] = []
+    headers: dict = {}
+    header = {"field": b"", "value": b""}
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header["value"] += data[start:end]
+
+    def on_header_end():
+        headers[header["field"].lower()] = header["value"]
+        header["field"] = header["value"] = b""
+
+    def on_headers_finished():
+        events.append(("headers", dict(headers)))
+
+    def on_part_data(data: bytes, start: int, end: int):
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+    receiver = _FileReceiver(dest_dir, field_name, max_bytes)
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for event, payload in events:
+                await receiver.handle(event, payload)
+            events.clear()
+        parser.finalize()
+    except BaseException:
+        await receiver.abort()
+        raise
+    if receiver.result is None:
+        await receiver.abort()
+        raise UploadRejected(ERR_NO_FILE)
+    return receiver.result
@@ -0,0 +1,578 @@
+"""벡터 인덱스 백엔드를 같은 인터페이스(`VectorIndex`)로 사용하기 위한 모듈입니다.
+
+- `ChromaVectorIndex`: 공유 Chroma `PersistentClient`의 컬렉션을 감쌉니다. (기본값)
+- `FaissVectorIndex`: 프로세스 안에서 FAISS HNSW 인덱스로 검색합니다. (`faiss-cpu` 필요)
+
+FAISS 백엔드는 컬렉션마다 `VECTOR_INDEX_DIR/<컬렉션명>/`에 두 파일을 둡니다.
+
+- `chunks.sqlite3`: 청크 ID, 본문, 메타데이터, 원본 벡터(float32)를 보관하는 기준 저장소
+- `index.faiss`: 검색용 HNSW 인덱스 스냅샷. `flush()` 때 원자적으로 교체하고, 이후에는
+  메모리 매핑(mmap)으로 다시 열어 여러 워커가 같은 페이지 캐시를 공유합니다.
+
+스냅샷은 기준 저장소에서 언제든 다시 만들 수 있으므로, 저장 도중 중단되어 스냅샷이
+저장소보다 뒤처져 있으면 다음에 열 때 재구축합니다. HNSW는 개별 벡터를 지울 수 없으므로
+삭제/덮어쓰기된 벡터는 검색 시 ID 선택자로 제외하고, 그 비율이 `VECTOR_INDEX_COMPACT_RATIO`를
+넘으면 `flush()` 때 살아 있는 벡터만으로 재구축합니다.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from app.core.config import (
+    VECTOR_INDEX_COMPACT_RATIO,
+    VECTOR_INDEX_COMPRESSION,
+    VECTOR_INDEX_EF_CONSTRUCTION,
+    VECTOR_INDEX_EF_SEARCH,
+    VECTOR_INDEX_HNSW_M,
+    VECTOR_INDEX_MMAP,
+    VECTOR_INDEX_PQ_M,
+    VECTOR_INDEX_PQ_MIN_TRAIN,
+)
+
+logger = logging.getLogger(__name__)
+
+CHROMA = "chroma"
+FAISS = "faiss"
+COMPRESSIONS = ("none", "fp16", "pq")
+# SQLite 바인딩 변수 수 제한을 넘지 않도록 ID 목록을 나눠 조회
+_SQL_BATCH = 500
+# 필터를 통과한 벡터가 (efSearch x 이 값) 이하이거나 전체 대비 비율이 아래 값보다 낮으면
+# 그래프 탐색 대신 전수 비교로 검색 (선택도가 낮으면 HNSW 필터 탐색의 재현율이 크게 떨어짐)
+_EXACT_SEARCH_FACTOR = 4
+_EXACT_SEARCH_SELECTIVITY = 0.1
+# PQ 인덱스에서 원본 벡터로 다시 정렬할 후보 수 (k의 배수)
+_PQ_RERANK_FACTOR = 10
+_WHERE_KEY = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class VectorIndex(ABC):
+    """청크 벡터를 저장하고 검색하는 인덱스의 공통 인터페이스입니다.
+
+    `get()`의 반환 형식은 Chroma와 같습니다. ({"ids": [...], "documents": [...], ...})
+    """
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[dict],
+    ) -> None:
+        """같은 ID가 있으면 덮어쓰고 없으면 추가합니다."""
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[dict] = None,
+        include: Iterable[str] = ("documents", "metadatas"),
+    ) -> dict:
+        """ID와 메타데이터 조건으로 청크를 조회합니다."""
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """ID로 청크를 삭제합니다."""
+
+    @abstractmethod
+    def search_by_vector(
+        self, embedding: Sequence[float], k: int, where: Optional[dict] = None
+    ) -> List[Tuple[Document, float]]:
+        """벡터와 가장 가까운 청크 k개를 (문서, 관련도 점수) 목록으로 반환합니다."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """저장된 청크 수를 반환합니다."""
+
+    def flush(self) -> None:
+        """메모리의 변경 내용을 디스크에 반영합니다."""
+
+    def close(self) -> None:
+        """열린 자원을 정리합니다."""
+
+
+class ChromaVectorIndex(VectorIndex):
+    """langchain `Chroma` 벡터스토어를 `VectorIndex`로 감쌉니다."""
+
+    def __init__(self, vectorstore: Chroma):
+        self.vectorstore = vectorstore
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        self.vectorstore._collection.upsert(
+            ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas
+        )
+
+    def get(self, ids=None, where=None, include=("documents", "metadatas")) -> dict:
+        return self.vectorstore.get(ids=ids, where=where, include=list(include))
+
+    def delete(self, ids: List[str]) -> None:
+        self.vectorstore.delete(ids=ids)
+
+    def search_by_vector(self, embedding, k, where=None):
+        return self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+            embedding, k=k, filter=where
+        )
+
+    def count(self) -> int:
+        return self.vectorstore._collection.count()
+
+
+def resolve_backend(backend: str) -> str:
+    """설정된 백엔드 이름을 확인합니다. faiss가 설치되어 있지 않으면 Chroma를 사용합니다."""
+    if backend not in (CHROMA, FAISS):
+        raise ValueError(f"VECTOR_INDEX_BACKEND는 {CHROMA} 또는 {FAISS}여야 합니다: {backend}")
+    if VECTOR_INDEX_COMPRESSION not in COMPRESSIONS:
+        raise ValueError(
+            f"VECTOR_INDEX_COMPRESSION은 {', '.join(COMPRESSIONS)} 중 하나여야 합니다: "
+            f"{VECTOR_INDEX_COMPRESSION}"
+        )
+    if backend == FAISS:
+        try:
+            import faiss  # noqa: F401
+        except ImportError:
+            logger.warning("[VECTOR INDEX] faiss가 설치되어 있지 않아 Chroma를 사용합니다.")
+            return CHROMA
+    return backend
+
+
+def _where_sql(where: Optional[dict]) -> Tuple[str, list]:
+    """Chroma 형식의 동등 조건({"key": value} 또는 {"$and": [...]})을 SQL 조건으로 바꿉니다."""
+    if not where:
+        return "", []
+    conditions = where["$and"] if set(where) == {"$and"} else [where]
+    clauses, params = [], []
+    for condition in conditions:
+        for key, value in condition.items():
+            if not _WHERE_KEY.match(key) or isinstance(value, (dict, list)):
+                raise ValueError(f"지원하지 않는 where 조건입니다: {condition}")
+            # 경로를 리터럴로 써야 json_extract 식 인덱스를 사용할 수 있음
+            clauses.append(f"json_extract(metadata, '$.{key}') = ?")
+            params.append(value)
+    return " AND ".join(clauses), params
+
+
+def _pq_m(dim: int) -> int:
+    """차원을 나누어떨어지게 하는 PQ 부분 양자화기 수를 고릅니다. (기본: 차원/8 이하 최댓값)"""
+    if VECTOR_INDEX_PQ_M > 0:
+        if dim % VECTOR_INDEX_PQ_M:
+            raise ValueError(f"VECTOR_INDEX_PQ_M({VECTOR_INDEX_PQ_M})이 차원({dim})을 나누지 못합니다.")
+        return VECTOR_INDEX_PQ_M
+    return next(m for m in range(max(1, dim // 8), 0, -1) if dim % m == 0)
+
+
+class FaissVectorIndex(VectorIndex):
+    """컬렉션 하나의 FAISS HNSW 인덱스와 청크 저장소입니다.
+
+    한 프로세스에서는 컬렉션마다 인스턴스 하나를 공유해야 합니다. (`ServiceContainer.vectorstore`)
+    쓰기는 Chroma와 마찬가지로 한 번에 한 프로세스에서만 수행한다고 가정합니다.
+    다른 프로세스가 스냅샷을 교체하면 다음 검색 때 파일 수정 시각을 보고 다시 엽니다.
+    """
+
+    def __init__(self, directory: str):
+        import faiss
+
+        self._faiss = faiss
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.faiss")
+        self._db = sqlite3.connect(
+            os.path.join(directory, "chunks.sqlite3"), check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, "
+            "label INTEGER NOT NULL UNIQUE, document TEXT, metadata TEXT, vector BLOB NOT NULL)"
+        )
+        # 공유 컬렉션 모드의 user_id 필터를 색인으로 처리
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_chunks_user_id "
+            "ON chunks (json_extract(metadata, '$.user_id'))"
+        )
+        self._db.commit()
+        self._lock = threading.RLock()
+        self._index = None
+        self._loaded = False
+        self._mmapped = False
+        self._snapshot_mtime: Optional[float] = None
+        self._dirty = False
+        self._dim: Optional[int] = None
+        self._alive = 0
+        self._alive_labels: Optional[np.ndarray] = None
+
+    # ---- 인덱스 생성/적재 ----
+
+    def _new_index(self, dim: int, vectors: Optional[np.ndarray] = None):
+        faiss = self._faiss
+        if VECTOR_INDEX_COMPRESSION == "fp16":
+            index = faiss.IndexHNSWSQ(
+                dim, faiss.ScalarQuantizer.QT_fp16, VECTOR_INDEX_HNSW_M
+            )
+        elif (
+            VECTOR_INDEX_COMPRESSION == "pq"
+            and vectors is not None
+            and len(vectors) >= VECTOR_INDEX_PQ_MIN_TRAIN
+        ):
+            index = faiss.IndexHNSWPQ(dim, _pq_m(dim), VECTOR_INDEX_HNSW_M)
+            index.train(vectors)
+        else:
+            # PQ는 학습용 벡터가 충분히 모이기 전까지 압축하지 않은 인덱스를 사용
+            index = faiss.IndexHNSWFlat(dim, VECTOR_INDEX_HNSW_M)
+        index.hnsw.efConstruction = VECTOR_INDEX_EF_CONSTRUCTION
+        return index
+
+    def _read_snapshot(self, mmap: bool):
+        faiss = self._faiss
+        # 최신 faiss는 HNSW 저장소(IndexFlatCodes)의 메모리 매핑을 별도 플래그로 지원
+        flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) if mmap else 0
+        index = faiss.read_index(self._index_path, flag)
+        self._mmapped = mmap
+        self._snapshot_mtime = os.path.getmtime(self._index_path)
+        return index
+
+    def _load(self) -> None:
+        """처음 사용할 때, 또는 다른 프로세스가 스냅샷을 교체했을 때 인덱스를 엽니다."""
+        snapshot_mtime = (
+            os.path.getmtime(self._index_path) if os.path.exists(self._index_path) else None
+        )
+        if self._loaded and (self._dirty or snapshot_mtime == self._snapshot_mtime):
+            return
+        self._loaded = True
+        self._alive_labels = None
+        alive, max_label, dim = self._db.execute(
+            "SELECT COUNT(*), MAX(label), MAX(length(vector)) / 4 FROM chunks"
+        ).fetchone()
+        self._alive = alive
+        self._dim = dim
+        self._index = None
+        if snapshot_mtime is not None:
+            self._index = self._read_snapshot(VECTOR_INDEX_MMAP)
+        if alive and (self._index is None or max_label >= self._index.ntotal):
+            logger.warning(f"[VECTOR INDEX] 스냅샷이 저장소보다 오래되어 재구축합니다: {self.directory}")
+            self._rebuild()
+            if VECTOR_INDEX_MMAP:
+                self._index = self._read_snapshot(mmap=True)
+
+    def _ensure_writable(self) -> None:
+        # 메모리 매핑된 인덱스에 추가하면 프로세스가 중단되므로 먼저 메모리로 읽어 옴
+        if self._mmapped:
+            self._index = self._read_snapshot(mmap=False)
+
+    def _rebuild(self) -> None:
+        """살아 있는 벡터만으로 인덱스를 다시 만들고 라벨을 0부터 다시 매깁니다."""
+        rows = self._db.execute("SELECT id, vector FROM chunks ORDER BY label").fetchall()
+        self._alive = len(rows)
+        if not rows:
+            self._index = None
+            self._remove_snapshot()
+            return
+        vectors = np.stack([np.frombuffer(vector, dtype=np.float32) for _, vector in rows])
+        index = self._new_index(vectors.shape[1], vectors)
+        index.add(vectors)
+        with self._db:
+            # 라벨 순서대로 다시 매기므로 UNIQUE 제약과 충돌하지 않음
+            self._db.executemany(
+                "UPDATE chunks SET label = ? WHERE id = ?",
+                [(label, chunk_id) for label, (chunk_id, _) in enumerate(rows)],
+            )
+        self._index = index
+        self._mmapped = False
+        self._alive_labels = None
+        self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        tmp_path = f"{self._index_path}.tmp"
+        self._faiss.write_index(self._index, tmp_path)
+        os.replace(tmp_path, self._index_path)
+        self._snapshot_mtime = os.path.getmtime(self._index_path)
+        self._dirty = False
+
+    def _remove_snapshot(self) -> None:
+        try:
+            os.remove(self._index_path)
+        except FileNotFoundError:
+            pass
+        self._snapshot_mtime = None
+        self._mmapped = False
+        self._dirty = False
+
+    def _dead(self) -> int:
+        return (self._index.ntotal if self._index is not None else 0) - self._alive
+
+    # ---- VectorIndex ----
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        vectors = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        if not len(vectors):
+            return
+        with self._lock:
+            self._load()
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            if vectors.shape[1] != self._dim:
+                raise ValueError(
+                    f"임베딩 차원이 컬렉션({self._dim})과 다릅니다: {vectors.shape[1]}"
+                )
+            self._ensure_writable()
+            if self._index is None:
+                self._index = self._new_index(self._dim)
+            replaced = len(self._select_ids(ids, "id"))
+            start = self._index.ntotal
+            self._index.add(vectors)
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO chunks (id, label, document, metadata, vector) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            chunk_id,
+                            start + offset,
+                            document,
+                            json.dumps(metadata or {}, ensure_ascii=False),
+                            vector.tobytes(),
+                        )
+                        for offset, (chunk_id, document, metadata, vector) in enumerate(
+                            zip(ids, documents, metadatas, vectors)
+                        )
+                    ],
+                )
+            self._alive += len(set(ids)) - replaced
+            self._alive_labels = None
+            self._dirty = True
+
+    def _select_ids(self, ids: List[str], columns: str, where: Optional[dict] = None):
+        clause, params = _where_sql(where)
+        rows = []
+        for start in range(0, len(ids), _SQL_BATCH):
+            batch = ids[start : start + _SQL_BATCH]
+            sql = (
+                f"SELECT {columns} FROM chunks WHERE id IN ({', '.join('?' * len(batch))})"
+            )
+            if clause:
+                sql += f" AND {clause}"
+            rows.extend(self._db.execute(sql, batch + params).fetchall())
+        return rows
+
+    def get(self, ids=None, where=None, include=("documents", "metadatas")) -> dict:
+        include = list(include)
+        columns = "id, document, metadata, vector"
+        with self._lock:
+            if ids is not None:
+                rows = self._select_ids(list(ids), columns, where)
+            else:
+                clause, params = _where_sql(where)
+                sql = f"SELECT {columns} FROM chunks"
+                rows = self._db.execute(
+                    f"{sql} WHERE {clause}" if clause else sql, params
+                ).fetchall()
+        result = {"ids": [row[0] for row in rows]}
+        if "documents" in include:
+            result["documents"] = [row[1] for row in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(row[2]) for row in rows]
+        if "embeddings" in include:
+            result["embeddings"] = [np.frombuffer(row[3], dtype=np.float32) for row in rows]
+        return result
+
+    def delete(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            self._load()
+            with self._db:
+                for start in range(0, len(ids), _SQL_BATCH):
+                    batch = ids[start : start + _SQL_BATCH]
+                    cursor = self._db.execute(
+                        f"DELETE FROM chunks WHERE id IN ({', '.join('?' * len(batch))})",
+                        batch,
+                    )
+                    self._alive -= cursor.rowcount
+            self._alive_labels = None
+            self._dirty = True
+
+    def _allowed_labels(self, where: Optional[dict]) -> Optional[np.ndarray]:
+        """검색 대상 라벨을 반환합니다. 제외할 벡터가 없으면 None입니다."""
+        if where:
+            clause, params = _where_sql(where)
+            rows = self._db.execute(f"SELECT label FROM chunks WHERE {clause}", params)
+            return np.fromiter((label for (label,) in rows), dtype=np.int64)
+        if not self._dead():
+            return None
+        if self._alive_labels is None:
+            rows = self._db.execute("SELECT label FROM chunks")
+            self._alive_labels = np.fromiter((label for (label,) in rows), dtype=np.int64)
+        return self._alive_labels
+
+    def search_by_vector(self, embedding, k, where=None):
+        query = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        with self._lock:
+            self._load()
+            if self._index is None or not self._alive:
+                return []
+            labels = self._allowed_labels(where)
+            if labels is not None and not len(labels):
+                return []
+            # PQ 거리는 근사값이므로 후보를 넉넉히 찾은 뒤 원본 벡터로 다시 정렬
+            rerank = isinstance(self._index, self._faiss.IndexHNSWPQ)
+            fetch = k * _PQ_RERANK_FACTOR if rerank else k
+            ef_search = max(VECTOR_INDEX_EF_SEARCH, fetch)
+            selectivity = len(labels) / self._index.ntotal if labels is not None else 1.0
+            if labels is not None and (
+                len(labels) <= ef_search * _EXACT_SEARCH_FACTOR
+                or selectivity < _EXACT_SEARCH_SELECTIVITY
+            ):
+                # 통과한 벡터가 적으면 HNSW 그래프 탐색보다 전수 비교가 빠르고 정확함
+                stored = self._index.reconstruct_batch(labels)
+                distances = ((stored - query) ** 2).sum(axis=1)
+                order = np.argsort(distances)[:fetch]
+                hits = list(zip(labels[order].tolist(), distances[order].tolist()))
+            else:
+                # 걸러지는 노드만큼 탐색 후보를 늘려 필터 검색의 재현율을 유지
+                params = self._faiss.SearchParametersHNSW(
+                    efSearch=int(ef_search / selectivity)
+                )
+                if labels is not None:
+                    selector = self._faiss.IDSelectorBatch(labels)
+                    params.sel = selector
+                distances, found = self._index.search(
+                    query, min(fetch, self._alive), params=params
+                )
+                hits = [
+                    (int(label), float(distance))
+                    for label, distance in zip(found[0], distances[0])
+                    if label >= 0
+                ]
+            rows = {}
+            if hits:
+                rows = {
+                    label: (chunk_id, document, metadata, vector)
+                    for chunk_id, label, document, metadata, vector in self._db.execute(
+                        "SELECT id, label, document, metadata, vector FROM chunks "
+                        f"WHERE label IN ({', '.join('?' * len(hits))})",
+                        [label for label, _ in hits],
+                    )
+                }
+        hits = [(label, distance) for label, distance in hits if label in rows]
+        if rerank and hits:
+            stored = np.stack(
+                [np.frombuffer(rows[label][3], dtype=np.float32) for label, _ in hits]
+            )
+            distances = ((stored - query) ** 2).sum(axis=1)
+            hits = sorted(
+                zip([label for label, _ in hits], distances.tolist()),
+                key=lambda hit: hit[1],
+            )
+        # Chroma(l2)와 같은 방식으로 거리를 관련도 점수로 변환
+        to_score = VectorStore._euclidean_relevance_score_fn
+        return [
+            (
+                Document(
+                    id=rows[label][0],
+                    page_content=rows[label][1],
+                    metadata=json.loads(rows[label][2]),
+                ),
+                to_score(distance),
+            )
+            for label, distance in hits[:k]
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def flush(self) -> None:
+        """변경 내용을 스냅샷으로 저장하고, 설정에 따라 메모리 매핑으로 다시 엽니다.
+
+        죽은 벡터 비율이 높거나 PQ 학습에 충분한 벡터가 모였으면 재구축합니다.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            if not self._alive:
+                self._index = None
+                self._remove_snapshot()
+                return
+            needs_pq = (
+                VECTOR_INDEX_COMPRESSION == "pq"
+                and not isinstance(self._index, self._faiss.IndexHNSWPQ)
+                and self._alive >= VECTOR_INDEX_PQ_MIN_TRAIN
+            )
+            # 다른 프로세스가 그 사이 스냅샷을 교체했으면 덮어쓰지 않고 저장소 기준으로 재구축
+            replaced = self._snapshot_mtime != (
+                os.path.getmtime(self._index_path) if os.path.exists(self._index_path) else None
+            )
+            if (
+                replaced
+                or needs_pq
+                or self._dead() > VECTOR_INDEX_COMPACT_RATIO * self._index.ntotal
+            ):
+                self._rebuild()
+            else:
+                self._write_snapshot()
+            if self._index is not None and VECTOR_INDEX_MMAP:
+                self._index = self._read_snapshot(mmap=True)
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                self._db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "type": type(self._index).__name__ if self._index is not None else None,
+                "vectors": self._index.ntotal if self._index is not None else 0,
+                "alive": self._alive,
+                "mmap": self._mmapped,
+            }
+
+
+class FaissIndexRegistry:
+    """컬렉션 이름별 `FaissVectorIndex`를 프로세스 안에서 하나씩만 열어 공유합니다."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._indexes: Dict[str, FaissVectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, collection_name: str) -> FaissVectorIndex:
+        with self._lock:
+            index = self._indexes.get(collection_name)
+            if index is None:
+                index = FaissVectorIndex(os.path.join(self.root, collection_name))
+                self._indexes[collection_name] = index
+            return index
+
+    def close(self) -> None:
+        with self._lock:
+            indexes, self._indexes = list(self._indexes.values()), {}
+        for index in indexes:
+            try:
+                index.close()
+            except Exception as e:
+                logger.error(f"[VECTOR INDEX] 인덱스 종료 오류: {index.directory} ({e})")
+
+    def stats(self) -> dict:
+        """열린 인덱스 전체의 합계를 반환합니다. (컬렉션 이름에 사용자 ID가 들어가므로 노출하지 않음)"""
+        with self._lock:
+            indexes = list(self._indexes.values())
+        per_index = [index.stats() for index in indexes]
+        return {
+            "indexes": len(per_index),
+            "vectors": sum(s["vectors"] for s in per_index),
+            "alive": sum(s["alive"] for s in per_index),
+            "mmapped": sum(1 for s in per_index if s["mmap"]),
+            "types": sorted({s["type"] for s in per_index if s["type"]}),
+        }
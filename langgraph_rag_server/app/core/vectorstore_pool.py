@@ -0,0 +1,90 @@
+"""사용자별 벡터스토어 핸들을 재사용하기 위한 프로세스 전역 풀을 제공하는 모듈입니다."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from app.core.config import VECTORSTORE_POOL_IDLE_SECONDS, VECTORSTORE_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStorePool:
+    """컬렉션 이름별로 열린 벡터스토어 핸들을 LRU 방식으로 보관합니다.
+
+    - 최대 `max_size`개의 핸들만 유지하며, 초과 시 가장 오래 사용하지 않은 핸들을 제거합니다.
+    - `idle_seconds` 동안 사용되지 않은 핸들은 다음 조회 시 만료 처리됩니다.
+    - 문서 추가/삭제로 컬렉션이 변경되면 `invalidate`로 핸들을 즉시 폐기해야 합니다.
+    """
+
+    def __init__(self, max_size: int, idle_seconds: float):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._handles: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, collection_name: str, factory: Callable[[], Any]) -> Any:
+        """풀에서 핸들을 반환하고, 없으면 factory로 생성해 등록합니다."""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            handle = self._handles.get(collection_name)
+            if handle is not None:
+                self._handles.move_to_end(collection_name)
+                self._last_used[collection_name] = now
+                return handle
+        # 핸들 생성(SQLite/HNSW 세그먼트 오픈)은 잠금 밖에서 수행
+        handle = factory()
+        with self._lock:
+            existing = self._handles.get(collection_name)
+            if existing is not None:
+                # 다른 스레드가 먼저 등록한 핸들을 우선 사용
+                self._handles.move_to_end(collection_name)
+                self._last_used[collection_name] = now
+                return existing
+            self._handles[collection_name] = handle
+            self._last_used[collection_name] = now
+            while len(self._handles) > self.max_size:
+                evicted, _ = self._handles.popitem(last=False)
+                self._last_used.pop(evicted, None)
+                logger.debug(f"[POOL] LRU 제거: {evicted}")
+        return handle
+
+    def invalidate(self, collection_name: str) -> None:
+        """컬렉션이 변경되었을 때 해당 핸들을 풀에서 제거합니다."""
+        with self._lock:
+            self._handles.pop(collection_name, None)
+            self._last_used.pop(collection_name, None)
+
+    def clear(self) -> None:
+        """풀의 모든 핸들을 제거합니다."""
+        with self._lock:
+            self._handles.clear()
+            self._last_used.clear()
+
+    def _evict_idle(self, now: float) -> None:
+        if self.idle_seconds <= 0:
+            return
+        expired = [
+            name
+            for name, last_used in self._last_used.items()
+            if now - last_used > self.idle_seconds
+        ]
+        for name in expired:
+            self._handles.pop(name, None)
+            self._last_used.pop(name, None)
+            logger.debug(f"[POOL] 유휴 만료: {name}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._handles)
+
+
+# 프로세스 전역 풀 (rag_engine, document_ingest, views에서 공유)
+vectorstore_pool = VectorStorePool(
+    max_size=VECTORSTORE_POOL_SIZE,
+    idle_seconds=VECTORSTORE_POOL_IDLE_SECONDS,
+)
@@ -0,0 +1,54 @@
+"""사용자 데이터를 어느 Chroma 컬렉션에 저장하고 어떻게 걸러 조회할지 정하는 모듈입니다.
+
+- `per_user`(기본): 사용자마다 `rag_docs_<user_id>` 컬렉션을 사용합니다.
+- `shared`: 모든 사용자의 청크를 `VECTORSTORE_SHARDS`개의 공유 컬렉션에 나눠 저장하고,
+  인덱싱 시 기록하는 `user_id` 메타데이터로 필터링하여 조회합니다. 사용자 수가 많아질 때
+  컬렉션마다 생기는 HNSW 인덱스/파일 핸들/메모리 부담을 줄입니다.
+
+인덱싱 기록(`document_index`), 키워드 색인, 컬렉션 잠금은 저장 방식과 관계없이
+사용자별 논리 이름(`get_user_collection_name`) 단위로 관리합니다.
+청크 ID에는 사용자 ID가 접두사로 붙으므로 공유 컬렉션에서도 사용자 간에 겹치지 않습니다.
+"""
+
+import zlib
+from typing import Optional
+
+from app.core.config import VECTORSTORE_MODE, VECTORSTORE_SHARDS
+
+PER_USER = "per_user"
+SHARED = "shared"
+# 사용자 없이 인덱싱하는 경우(스크립트 등)의 컬렉션
+DEFAULT_COLLECTION = "rag_docs"
+
+if VECTORSTORE_MODE not in (PER_USER, SHARED):
+    raise ValueError(
+        f"VECTORSTORE_MODE는 {PER_USER} 또는 {SHARED}여야 합니다: {VECTORSTORE_MODE}"
+    )
+
+
+def get_user_collection_name(user_id: str) -> str:
+    """사용자별 컬렉션 이름(인덱싱 기록/키워드 색인의 단위)을 반환합니다."""
+    return f"rag_docs_{user_id}"
+
+
+def shard_index(user_id: str) -> int:
+    """사용자가 속한 공유 컬렉션 번호를 반환합니다. (프로세스/재시작과 무관하게 일정)"""
+    return zlib.crc32(user_id.encode("utf-8")) % VECTORSTORE_SHARDS
+
+
+def vectorstore_name(user_id: Optional[str]) -> str:
+    """사용자의 청크가 실제로 저장되는 Chroma 컬렉션 이름을 반환합니다."""
+    if not user_id:
+        return DEFAULT_COLLECTION
+    if VECTORSTORE_MODE == PER_USER:
+        return get_user_collection_name(user_id)
+    if VECTORSTORE_SHARDS == 1:
+        return "rag_docs_shared"
+    return f"rag_docs_shared_{shard_index(user_id):03d}"
+
+
+def user_filter(user_id: Optional[str]) -> Optional[dict]:
+    """공유 컬렉션에서 해당 사용자의 청크만 조회하기 위한 where 조건을 반환합니다."""
+    if not user_id or VECTORSTORE_MODE == PER_USER:
+        return None
+    return {"user_id": user_id}
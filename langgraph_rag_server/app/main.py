@@ -1,32 +1,83 @@
 """LangGraph RAG 서버의 FastAPI 엔트리포인트입니다."""
 
+import asyncio
 from contextlib import asynccontextmanager
 
-from app.api.v1 import auth, rag
+from app.api.v1 import auth, metrics, rag
 from app.core.config import (
+    OLLAMA_WARMUP,
     STATIC_DIR,
     TEMPLATES_DIR,
     clear_directories,
     ensure_directories,
 )
+from app.core import document_index
+from app.core.database import async_engine
+from app.core.ingest_jobs import fail_interrupted_jobs
+from app.core.llm_client import warmup
+from app.core.ollama_pool import ollama_pool
+from app.core.password_hasher import PasswordHasherBusy
+from app.core.scheduler import SchedulerSaturated
+from app.core.services import init_services, shutdown_services
 from app.web import views
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
-    """앱 시작 시 필요한 폴더를 생성합니다."""
+async def lifespan(app: FastAPI):
+    """앱 시작 시 필요한 폴더를 생성하고 중단된 인덱싱 작업을 정리한 뒤 모델을 예열합니다.
+
+    실행 중에는 Ollama 엔드포인트 헬스 체크를 백그라운드에서 수행합니다.
+    """
     clear_directories()
+    # 벡터스토어 폴더를 비웠으므로 파일/청크 ID 기록도 함께 초기화
+    document_index.clear_all()
     ensure_directories()
+    fail_interrupted_jobs()
+    # LLM/임베딩/Chroma 클라이언트는 앱 전체에서 하나씩만 만들어 공유
+    app.state.services = init_services()
+    # 모델 로드는 오래 걸릴 수 있으므로 시작을 막지 않고 백그라운드에서 진행
+    warmup_task = asyncio.create_task(warmup()) if OLLAMA_WARMUP else None
+    # Ollama 엔드포인트 상태/로드된 모델 목록을 주기적으로 갱신
+    health_task = asyncio.create_task(ollama_pool.run_health_checks())
     yield
+    health_task.cancel()
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    shutdown_services()
+    app.state.services = None
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 # FastAPI 앱 생성
 app = FastAPI(title="LangGraph RAG Server", lifespan=lifespan)
 
+
+@app.exception_handler(SchedulerSaturated)
+async def scheduler_saturated_handler(_: Request, exc: SchedulerSaturated):
+    """Ollama 요청 대기열이 가득 찬 경우 429와 Retry-After 헤더로 응답합니다."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(_: Request, exc: PasswordHasherBusy):
+    """비밀번호 해싱 대기열이 가득 찬 경우 429와 Retry-After 헤더로 응답합니다."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # CORS 미들웨어 설정
 app.add_middleware(
     CORSMiddleware,
@@ -43,4 +94,5 @@ templates = Jinja2Templates(directory=TEMPLATES_DIR)
 # 라우터 등록
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(rag.router, prefix="/api/v1/rag", tags=["rag"])
+app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["metrics"])
 app.include_router(views.router)
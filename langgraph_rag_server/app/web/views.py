@@ -7,36 +7,39 @@ import re
 
 from app.core.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
-    authenticate_user,
+    aauthenticate_user,
+    acreate_new_user,
     create_access_token,
-    create_new_user,
     get_current_user,
+    user_cache,
 )
-from app.core.config import (
-    CHROMA_PERSIST_DIR,
-    DOCUMENTS_DIR,
-    OLLAMA_BASE_URL,
-    OLLAMA_EMBEDDING_MODEL,
-    TEMPLATES_DIR,
-)
+from app.core.config import DOCUMENTS_DIR, TEMPLATES_DIR
+from app.core import blob_store, semantic_cache
 from app.core.database import get_db
-from app.core.document_ingest import ingest_documents
+from app.core.document_index import find_file_by_hash
+from app.core.document_ingest import (
+    compute_file_hash,
+    delete_document,
+    get_user_collection_name,
+)
+from app.core.ingest_jobs import get_job, submit_ingest_job
 from app.core.models import User
+from app.core.services import ServiceContainer, provide_services
+from app.core.upload_stream import UploadRejected, receive_pdf_upload
+from app.core.vectorstore_pool import vectorstore_pool
+from app.core.vectorstore_routing import vectorstore_name
 from fastapi import (
     APIRouter,
     Depends,
-    File,
     Form,
     HTTPException,
     Request,
-    UploadFile,
     status,
 )
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.templating import Jinja2Templates
-from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -112,7 +115,7 @@ async def login(
     db: Session = Depends(get_db),
 ):
     """로그인을 처리합니다."""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await aauthenticate_user(db, form_data.username, form_data.password)
     if not user:
         return templates.TemplateResponse(
             request,
@@ -169,7 +172,7 @@ async def register(
             {"error": "비밀번호는 8자 이상, 영문과 숫자를 모두 포함해야 합니다."},
         )
     try:
-        create_new_user(db, email, password)
+        await acreate_new_user(db, email, password)
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     except HTTPException as e:
         return templates.TemplateResponse(
@@ -180,8 +183,15 @@ async def register(
 
 
 @router.post("/logout")
-async def logout():
+async def logout(request: Request):
     """로그아웃을 처리합니다."""
+    # 캐시된 토큰 검증 결과도 함께 폐기
+    token = request.cookies.get("access_token")
+    if token:
+        user_cache.invalidate_token(token)
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        user_cache.invalidate_token(auth_header.replace("Bearer ", ""))
     response = RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     response.delete_cookie(key="access_token")
     return response
@@ -202,57 +212,80 @@ async def pdf_list(request: Request, db: Session = Depends(get_db)):
 @router.post("/upload")
 async def upload_pdf(
     request: Request,
-    file: UploadFile = File(...),
     db: Session = Depends(get_db),
+    services: ServiceContainer = Depends(provide_services),
 ):
-    """PDF 파일을 업로드하고 벡터스토어에 인덱싱합니다."""
-    current_user = await get_current_user_from_cookie(request, db)
-
-    # 파일명 검증: 경로 탐색 금지
-    if (
-        not file.filename
-        or ".." in file.filename
-        or "/" in file.filename
-        or "\\" in file.filename
-    ):
-        raise HTTPException(status_code=400, detail="유효하지 않은 파일명입니다.")
-
-    # 확장자 및 MIME 타입 체크
-    if not file.filename.lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="PDF 파일만 업로드할 수 있습니다.")
-    if file.content_type not in ["application/pdf", "application/octet-stream"]:
-        raise HTTPException(status_code=400, detail="PDF 파일만 업로드할 수 있습니다.")
-
-    # 파일 크기 제한 (10MB)
-    contents = await file.read()
-    if len(contents) > 10 * 1024 * 1024:
-        raise HTTPException(
-            status_code=400, detail="최대 10MB 이하의 파일만 업로드할 수 있습니다."
-        )
+    """PDF 파일을 업로드하고 백그라운드 인덱싱 작업을 등록합니다.
 
-    # PDF 시그니처 검사
-    if not contents.startswith(b"%PDF"):
-        raise HTTPException(status_code=400, detail="유효한 PDF 파일이 아닙니다.")
+    요청 본문은 메모리에 모으지 않고 도착하는 대로 디스크에 기록합니다.
+    (multipart 필드명: file)
+    """
+    current_user = await get_current_user_from_cookie(request, db)
 
     user_dir = os.path.join(DOCUMENTS_DIR, current_user.id)
     if not os.path.exists(user_dir):
         os.makedirs(user_dir)
 
+    # 개수 제한은 본문을 받기 전에 확인
     pdfs = [f for f in os.listdir(user_dir) if f.lower().endswith(".pdf")]
     if len(pdfs) >= 10:
         raise HTTPException(
             status_code=400, detail="최대 10개의 PDF만 업로드할 수 있습니다."
         )
 
-    file_path = os.path.join(user_dir, file.filename)
-    print(f"[UPLOAD] 실제 저장 경로: {file_path}")
-    with open(file_path, "wb") as f:
-        f.write(contents)
+    # 파일명/MIME 타입, 크기 제한(10MB), PDF 시그니처는 수신 중에 검사
+    try:
+        upload = await receive_pdf_upload(request, user_dir)
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+
+    # 같은 내용의 PDF가 이미 인덱싱되어 있으면 저장/임베딩을 반복하지 않음
+    file_path = os.path.join(user_dir, upload.filename)
+    duplicate = await run_in_threadpool(
+        find_file_by_hash, get_user_collection_name(current_user.id), upload.sha256
+    )
+    if duplicate is not None and os.path.exists(os.path.join(user_dir, duplicate)):
+        upload.discard()
+        if duplicate != upload.filename:
+            raise HTTPException(
+                status_code=400,
+                detail=f"같은 내용의 PDF가 이미 업로드되어 있습니다: {duplicate}",
+            )
+        print(f"[UPLOAD] 변경 없는 파일 재업로드: {file_path}")
+        return JSONResponse(
+            {
+                "result": "이미 업로드된 파일과 내용이 같아 인덱싱을 건너뜁니다.",
+                "filename": upload.filename,
+                "job_id": None,
+            }
+        )
+
+    # 원본은 내용 해시별로 한 부만 보관하고 사용자 폴더에는 링크를 만듦
+    await run_in_threadpool(blob_store.store, upload.temp_path, upload.sha256, file_path)
+    print(f"[UPLOAD] 실제 저장 경로: {file_path} ({upload.size} bytes)")
+
+    # 업로드 후 문서 처리는 백그라운드 작업으로 넘기고 작업 ID를 즉시 반환
+    job_id = await run_in_threadpool(
+        submit_ingest_job, user_dir, current_user.id, [upload.filename], services
+    )
+    print(f"[UPLOAD] 인덱싱 작업 등록: {job_id}")
+    return JSONResponse(
+        {
+            "result": "업로드 완료. 문서 인덱싱이 진행 중입니다.",
+            "filename": upload.filename,
+            "job_id": job_id,
+        }
+    )
 
-    # 업로드 후 자동 문서 처리
-    result = ingest_documents(user_dir, current_user.id)
-    print(f"result: {result}")
-    return JSONResponse({"result": result, "filename": file.filename})
+
+@router.get("/ingest_jobs/{job_id}")
+async def ingest_job_status(job_id: str, request: Request, db: Session = Depends(get_db)):
+    """인덱싱 작업의 상태와 진행 상황을 반환합니다."""
+    current_user = await get_current_user_from_cookie(request, db)
+    job = await run_in_threadpool(get_job, db, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 존재하지 않습니다.")
+    return job
 
 
 @router.post("/delete_pdf")
@@ -261,6 +294,7 @@ async def delete_pdf(
     filename: str = None,
     form_filename: str = Form(None, alias="filename"),
     db: Session = Depends(get_db),
+    services: ServiceContainer = Depends(provide_services),
 ):
     """PDF 파일을 삭제하고 벡터스토어에서 해당 벡터도 제거합니다.
     filename 파라미터는 쿼리 파라미터나 폼 데이터로 전달할 수 있습니다.
@@ -278,30 +312,24 @@ async def delete_pdf(
     # 1. PDF 파일 삭제
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="파일이 존재하지 않습니다.")
-    os.remove(file_path)
-
-    # 2. ChromaDB에서 해당 문서 벡터 삭제
-    if OLLAMA_EMBEDDING_MODEL is None:
-        raise HTTPException(
-            status_code=500,
-            detail="OLLAMA_EMBEDDING_MODEL 환경변수가 설정되어 있지 않습니다.",
-        )
-    embeddings = OllamaEmbeddings(
-        model=OLLAMA_EMBEDDING_MODEL, base_url=OLLAMA_BASE_URL
-    )
-    vectorstore = Chroma(
-        collection_name=f"rag_docs_{current_user.id}",
-        embedding_function=embeddings,
-        persist_directory=CHROMA_PERSIST_DIR,
-    )
+    # 다른 사용자가 같은 원본을 링크하고 있지 않으면 원본도 함께 삭제
+    file_hash = await run_in_threadpool(compute_file_hash, file_path)
+    await run_in_threadpool(blob_store.remove_document, file_path, file_hash)
 
-    # 3. ChromaDB 벡터 삭제 (where 조건 사용)
+    # 2. ChromaDB 벡터 삭제 (인덱싱 때 기록한 해당 파일의 청크 ID로만 삭제)
+    store_name = vectorstore_name(current_user.id)
     try:
-        vectorstore._collection.delete(where={"filename": actual_filename})
-        print(f"✅ ChromaDB에서 {actual_filename} 벡터가 삭제되었습니다.")
+        deleted = await run_in_threadpool(
+            delete_document, actual_filename, current_user.id, services
+        )
+        print(f"✅ ChromaDB에서 {actual_filename} 벡터 {deleted}개가 삭제되었습니다.")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"ChromaDB 삭제 중 오류 발생: {str(e)}"
         )
+    finally:
+        # 컬렉션이 변경되었으므로 풀의 핸들과 답변 캐시를 폐기
+        vectorstore_pool.invalidate(store_name)
+        semantic_cache.invalidate_user(current_user.id)
 
     return {"result": f"{actual_filename} 삭제 완료"}
@@ -0,0 +1,201 @@
+"""벡터 인덱스 백엔드(Chroma, FAISS HNSW 무압축/fp16/PQ)의 질의 지연/메모리/재현율을 비교합니다.
+
+임의 벡터로 공유 컬렉션 하나를 `app.core.vector_index`의 구현으로 임시 폴더에 만든 뒤,
+새 프로세스에서 인덱스를 열어 전체 검색과 사용자(user_id) 필터 검색을 반복하여 지연 시간
+(p50/p95), 상주 메모리(RSS) 증가량, 디스크 사용량, 전수 비교 대비 재현율(recall@k)을 측정합니다.
+Ollama/PostgreSQL 없이 실행할 수 있으며 faiss 구성은 `faiss-cpu`가 필요합니다.
+
+사용 예:
+    python scripts/benchmark_vector_index.py --chunks 100000 --users 100
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (이름, 백엔드, 압축 방식)
+CONFIGS = {
+    "chroma": ("chroma", "none"),
+    "faiss": ("faiss", "none"),
+    "faiss_fp16": ("faiss", "fp16"),
+    "faiss_pq": ("faiss", "pq"),
+}
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total / (1024 * 1024)
+
+
+def _data(args):
+    """주제(군집) 주변에 모인 청크 벡터와, 저장된 청크 근처의 질문 벡터를 만듭니다.
+
+    실제 임베딩처럼 구조가 있는 분포여야 근사 검색의 재현율이 의미 있게 측정됩니다.
+    """
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((args.topics, args.dim))
+    topics = rng.integers(args.topics, size=args.chunks)
+    noise = rng.standard_normal((args.chunks, args.dim))
+    vectors = (centers[topics] + 0.5 * noise).astype(np.float32)
+    users = [f"user{i % args.users:05d}" for i in range(args.chunks)]
+    anchors = rng.integers(args.chunks, size=args.queries)
+    queries = vectors[anchors] + 0.3 * rng.standard_normal((args.queries, args.dim))
+    return vectors, users, queries.astype(np.float32)
+
+
+def _configure(compression: str, args):
+    # 설정 모듈이 읽기 전에 환경변수를 지정 (각 구성은 별도 프로세스에서 실행)
+    os.environ.update(
+        {
+            "VECTOR_INDEX_COMPRESSION": compression,
+            "VECTOR_INDEX_EF_SEARCH": str(args.ef_search),
+            "VECTOR_INDEX_HNSW_M": str(args.m),
+            "VECTOR_INDEX_PQ_MIN_TRAIN": str(min(args.chunks, 10000)),
+        }
+    )
+    from app.core import vector_index
+
+    return vector_index
+
+
+def _open_index(path: str, backend: str, vector_index):
+    if backend == "faiss":
+        return vector_index.FaissVectorIndex(path)
+    import chromadb
+    from chromadb.config import Settings
+    from langchain_chroma import Chroma
+
+    client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+    return vector_index.ChromaVectorIndex(
+        Chroma(client=client, collection_name="rag_docs_shared")
+    )
+
+
+def _build_phase(path, backend, compression, args, out):
+    vectors, users, _ = _data(args)
+    index = _open_index(path, backend, _configure(compression, args))
+    started = time.perf_counter()
+    for start in range(0, len(vectors), 1000):
+        end = start + 1000
+        index.upsert(
+            ids=[f"c{i:07d}" for i in range(start, min(end, len(vectors)))],
+            embeddings=vectors[start:end],
+            documents=[""] * len(vectors[start:end]),
+            metadatas=[{"user_id": user} for user in users[start:end]],
+        )
+    index.flush()
+    out.put(time.perf_counter() - started)
+
+
+def _query_phase(path, backend, compression, args, out):
+    vectors, users, queries = _data(args)
+    vector_index = _configure(compression, args)
+    # 라이브러리 적재분을 빼고 인덱스가 차지하는 메모리만 측정
+    rss_before = _rss_mb()
+    index = _open_index(path, backend, vector_index)
+    users_arr = np.asarray(users)
+    result = {}
+    for label, filtered in (("all", False), ("user", True)):
+        latencies, recalls = [], []
+        for q, query in enumerate(queries):
+            user = f"user{q % args.users:05d}"
+            where = {"user_id": user} if filtered else None
+            started = time.perf_counter()
+            hits = index.search_by_vector(query.tolist(), k=args.k, where=where)
+            latencies.append((time.perf_counter() - started) * 1000)
+            candidates = np.flatnonzero(users_arr == user) if filtered else None
+            pool = vectors[candidates] if filtered else vectors
+            exact = np.argsort(((pool - query) ** 2).sum(axis=1))[: args.k]
+            exact_ids = {
+                f"c{(candidates[i] if filtered else i):07d}" for i in exact
+            }
+            recalls.append(len(exact_ids & {doc.id for doc, _ in hits}) / len(exact_ids))
+        latencies.sort()
+        result[f"{label}_p50_ms"] = round(statistics.median(latencies), 2)
+        result[f"{label}_p95_ms"] = round(latencies[int(0.95 * (len(latencies) - 1))], 2)
+        result[f"{label}_recall"] = round(statistics.mean(recalls), 3)
+    result["rss_mb"] = round(_rss_mb() - rss_before, 1)
+    out.put(result)
+
+
+def _run(target, *args):
+    # 빌드 단계의 캐시가 측정에 섞이지 않도록 단계마다 새 프로세스에서 실행
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    process = ctx.Process(target=target, args=(*args, out))
+    process.start()
+    result = out.get()
+    process.join()
+    return result
+
+
+def run_case(args, name: str) -> dict:
+    backend, compression = CONFIGS[name]
+    path = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    try:
+        build_seconds = _run(_build_phase, path, backend, compression, args)
+        result = _run(_query_phase, path, backend, compression, args)
+        return {
+            "config": name,
+            "build_s": round(build_seconds, 1),
+            "disk_mb": round(_dir_size_mb(path), 1),
+            **result,
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--topics", type=int, default=500, help="청크 벡터의 군집 수")
+    parser.add_argument("--dim", type=int, default=768, help="임베딩 차원 (nomic-embed-text: 768)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20, help="질의당 검색 수 (RAG_CANDIDATE_K)")
+    parser.add_argument("--m", type=int, default=32, help="VECTOR_INDEX_HNSW_M")
+    parser.add_argument("--ef-search", type=int, default=64, help="VECTOR_INDEX_EF_SEARCH")
+    parser.add_argument("--configs", default=",".join(CONFIGS))
+    args = parser.parse_args()
+
+    print(
+        f"{'config':<11}{'build_s':>8}{'disk_mb':>8}{'rss_mb':>8}"
+        f"{'all_p50':>8}{'all_p95':>8}{'recall':>7}{'user_p50':>9}{'user_p95':>9}{'recall':>7}"
+    )
+    for name in args.configs.split(","):
+        r = run_case(args, name)
+        print(
+            f"{r['config']:<11}{r['build_s']:>8}{r['disk_mb']:>8}{r['rss_mb']:>8}"
+            f"{r['all_p50_ms']:>8}{r['all_p95_ms']:>8}{r['all_recall']:>7}"
+            f"{r['user_p50_ms']:>9}{r['user_p95_ms']:>9}{r['user_recall']:>7}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
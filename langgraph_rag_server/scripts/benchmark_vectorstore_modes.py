@@ -0,0 +1,196 @@
+"""사용자별 컬렉션(per_user)과 공유 컬렉션(shared) 저장 방식의 질의 지연/메모리를 비교합니다.
+
+임의 벡터로 사용자 수별 Chroma 데이터를 임시 폴더에 만든 뒤, 새 프로세스에서 클라이언트를 열어
+무작위 사용자의 질의를 반복하여 지연 시간(p50/p95), 상주 메모리(RSS) 증가량,
+열린 파일 수, 디스크 사용량을 측정합니다. Ollama/PostgreSQL 없이 실행할 수 있습니다.
+
+사용 예:
+    python scripts/benchmark_vectorstore_modes.py --users 10,100,1000 --chunks-per-user 50
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    # /proc가 없는 환경(macOS)에서는 최대 RSS로 대체 (바이트 단위)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+
+
+def _open_files() -> int:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total / (1024 * 1024)
+
+
+def _collection_name(mode: str, user_id: str, shards: int) -> str:
+    # app/core/vectorstore_routing.py와 같은 이름 규칙
+    if mode == "per_user":
+        return f"rag_docs_{user_id}"
+    if shards == 1:
+        return "rag_docs_shared"
+    return f"rag_docs_shared_{zlib.crc32(user_id.encode('utf-8')) % shards:03d}"
+
+
+def _client(path: str):
+    return chromadb.PersistentClient(
+        path=path, settings=Settings(anonymized_telemetry=False)
+    )
+
+
+def build(path: str, mode: str, users: int, chunks: int, dim: int, shards: int) -> float:
+    """사용자별로 `chunks`개의 임의 벡터를 저장하고 걸린 시간(초)을 반환합니다."""
+    client = _client(path)
+    rng = np.random.default_rng(0)
+    started = time.perf_counter()
+    collections = {}
+    for u in range(users):
+        user_id = f"user{u:05d}"
+        name = _collection_name(mode, user_id, shards)
+        if name not in collections:
+            collections[name] = client.get_or_create_collection(
+                name, metadata={"hnsw:space": "l2"}
+            )
+        vectors = rng.standard_normal((chunks, dim)).astype(np.float32)
+        collections[name].upsert(
+            ids=[f"{user_id}-{i:05d}" for i in range(chunks)],
+            embeddings=vectors.tolist(),
+            documents=[f"{user_id} 청크 {i}" for i in range(chunks)],
+            metadatas=[{"user_id": user_id, "page": i} for i in range(chunks)],
+        )
+    return time.perf_counter() - started
+
+
+def _query_phase(path, mode, users, dim, shards, queries, k, seed, out):
+    rss_before = _rss_mb()
+    files_before = _open_files()
+    client = _client(path)
+    rng = random.Random(seed)
+    vectors = np.random.default_rng(seed).standard_normal((queries, dim)).astype(
+        np.float32
+    )
+    handles = {}
+    latencies = []
+    leaked = 0
+    for q in range(queries):
+        user_id = f"user{rng.randrange(users):05d}"
+        name = _collection_name(mode, user_id, shards)
+        started = time.perf_counter()
+        collection = handles.get(name)
+        if collection is None:
+            collection = handles[name] = client.get_collection(name)
+        result = collection.query(
+            query_embeddings=[vectors[q].tolist()],
+            n_results=k,
+            where={"user_id": user_id} if mode == "shared" else None,
+            include=["metadatas", "distances"],
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        # 공유 컬렉션에서도 다른 사용자의 청크가 섞이면 안 됨
+        leaked += sum(m["user_id"] != user_id for m in result["metadatas"][0])
+    latencies.sort()
+    out.put(
+        {
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+            "rss_mb": round(_rss_mb() - rss_before, 1),
+            "open_files": _open_files() - files_before,
+            "collections": len(client.list_collections()),
+            "leaked": leaked,
+        }
+    )
+
+
+def run_case(args, mode: str, users: int) -> dict:
+    path = tempfile.mkdtemp(prefix=f"bench_{mode}_{users}_")
+    try:
+        build_seconds = build(path, mode, users, args.chunks_per_user, args.dim, args.shards)
+        # 빌드 단계의 캐시가 측정에 섞이지 않도록 새 프로세스에서 질의
+        ctx = multiprocessing.get_context("spawn")
+        out = ctx.Queue()
+        process = ctx.Process(
+            target=_query_phase,
+            args=(path, mode, users, args.dim, args.shards, args.queries, args.k, 1, out),
+        )
+        process.start()
+        result = out.get()
+        process.join()
+        return {
+            "mode": mode,
+            "users": users,
+            "build_s": round(build_seconds, 1),
+            "disk_mb": round(_dir_size_mb(path), 1),
+            **result,
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", default="10,100,1000", help="쉼표로 구분한 사용자 수 목록")
+    parser.add_argument("--chunks-per-user", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=768, help="임베딩 차원 (nomic-embed-text: 768)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20, help="질의당 검색 수 (RAG_CANDIDATE_K)")
+    parser.add_argument("--shards", type=int, default=1, help="shared 모드의 컬렉션 수")
+    parser.add_argument("--modes", default="per_user,shared")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = []
+    header = (
+        f"{'mode':<9}{'users':>6}{'build_s':>9}{'disk_mb':>9}{'p50_ms':>8}"
+        f"{'p95_ms':>8}{'rss_mb':>8}{'files':>7}{'colls':>7}{'leaked':>7}"
+    )
+    print(header)
+    for users in [int(u) for u in args.users.split(",")]:
+        for mode in args.modes.split(","):
+            r = run_case(args, mode, users)
+            results.append(r)
+            print(
+                f"{r['mode']:<9}{r['users']:>6}{r['build_s']:>9}{r['disk_mb']:>9}"
+                f"{r['p50_ms']:>8}{r['p95_ms']:>8}{r['rss_mb']:>8}"
+                f"{r['open_files']:>7}{r['collections']:>7}{r['leaked']:>7}",
+                flush=True,
+            )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if any(r["leaked"] for r in results):
+        sys.exit("다른 사용자의 청크가 검색 결과에 포함되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
+import asyncio
+import json
 import platform
 import tempfile
+import time
 from pathlib import Path
 import os
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 import jwt
+import pytest
 from datetime import datetime, timedelta
-from app.core.auth import create_new_user, SECRET_KEY, ALGORITHM
+from app.core.auth import (
+    ALGORITHM,
+    SECRET_KEY,
+    create_new_user,
+    update_password,
+    user_cache,
+)
 from app.core.config import ensure_directories
 from app.main import app
 from app.core.database import SessionLocal
-from app.core.models import UserDB
+from app.core.models import DocumentChunkDB, SemanticCacheDB, UserDB
+from app.core.scheduler import SchedulerSaturated
+from app.core.vectorstore_pool import vectorstore_pool
 from fastapi.testclient import TestClient
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
@@ -110,6 +122,18 @@ def login_user(email, password):
     return {"Authorization": f"Bearer {token}"}
 
 
+# 업로드 후 백그라운드 인덱싱 작업 완료 대기
+def wait_for_ingest(upload_response, headers, timeout=120):
+    job_id = upload_response.json()["job_id"]
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/ingest_jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.5)
+    raise AssertionError(f"인덱싱 작업이 {timeout}초 안에 끝나지 않았습니다: {job_id}")
+
+
 def test_pdf_upload_and_limit():
     headers = login_user("user1@example.com", "password123")
     for i in range(10):
@@ -186,6 +210,7 @@ def test_rag_query_with_docs():
                 headers=headers,
             )
         assert response.status_code == 200
+        wait_for_ingest(response, headers)
 
     # 질의
     query = {
@@ -200,6 +225,11 @@ def test_rag_query_with_docs():
     assert "sources" in data
     assert isinstance(data["sources"], list)
     assert len(data["sources"]) > 0
+    # 컨텍스트 조립 통계: 사용된 청크 수가 출처 수와 같고 토큰 예산을 넘지 않음
+    stats = data["context_stats"]
+    assert stats["chunks_used"] == len(data["sources"])
+    assert stats["tokens_after"] <= stats["tokens_before"]
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"]
     # (선택) answer에 '고구려' 또는 '장수왕'이 포함되는지 등 추가 검증 가능
 
     # 정리: 업로드한 PDF 삭제
@@ -219,6 +249,7 @@ def test_multi_user_data_isolation():
                 headers=user1_headers,
             )
         assert response.status_code == 200
+        wait_for_ingest(response, user1_headers)
 
     # 두 번째 사용자로 로그인하고 다른 PDF 업로드
     user2_headers = login_user("user2@example.com", "password456")
@@ -232,6 +263,7 @@ def test_multi_user_data_isolation():
                 headers=user2_headers,
             )
         assert response.status_code == 200
+        wait_for_ingest(response, user2_headers)
 
     # 각 사용자의 문서 목록 확인
     response = client.get("/pdf_list", headers=user1_headers)
@@ -313,6 +345,75 @@ def test_register_login_logout():
     response = client.get("/pdf_list", headers=headers)
     assert response.status_code == 200
 
+    # 로그인 처리량 지표가 기록되어 있어야 함
+    stats = client.get("/api/v1/metrics", headers=headers).json()["password_hasher"]
+    assert stats["logins_succeeded"] >= 1
+    assert stats["completed"] >= 2  # 회원가입 해싱 + 로그인 검증
+
+
+def test_auth_cache_invalidation():
+    email = f"test_user_{uuid.uuid4()}@example.com"
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": email, "password": "test_password2"},
+    )
+    assert response.status_code == 200
+    headers = login_user(email, "test_password2")
+    token = headers["Authorization"].replace("Bearer ", "")
+
+    # 인증된 요청 후에는 토큰 검증 결과가 캐시되어 있어야 함
+    assert client.get("/pdf_list", headers=headers).status_code == 200
+    assert user_cache.get(token) is not None
+
+    # 비밀번호 변경 시 해당 사용자의 캐시 항목이 제거되어야 함
+    db = SessionLocal()
+    try:
+        update_password(db, email, "new_password3")
+    finally:
+        db.close()
+    assert user_cache.get(token) is None
+    headers = login_user(email, "new_password3")
+    token = headers["Authorization"].replace("Bearer ", "")
+
+    # 로그아웃 시 해당 토큰의 캐시 항목이 제거되어야 함
+    assert client.get("/pdf_list", headers=headers).status_code == 200
+    client.post("/logout", headers=headers, follow_redirects=False)
+    assert user_cache.get(token) is None
+
+
+def test_change_password():
+    email = f"test_user_{uuid.uuid4()}@example.com"
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": email, "password": "test_password2"},
+    )
+    assert response.status_code == 200
+    headers = login_user(email, "test_password2")
+    token = headers["Authorization"].replace("Bearer ", "")
+    assert client.get("/pdf_list", headers=headers).status_code == 200
+
+    def change(current, new, headers=headers):
+        return client.post(
+            "/api/v1/auth/password",
+            json={"current_password": current, "new_password": new},
+            headers=headers,
+        )
+
+    # 로그인하지 않았거나 현재 비밀번호가 틀리거나 새 비밀번호가 정책에 맞지 않으면 거절
+    assert change("test_password2", "new_password3", headers={}).status_code == 401
+    assert change("wrong_password1", "new_password3").status_code == 400
+    assert change("test_password2", "short").status_code == 422
+
+    # 변경 후에는 새 비밀번호로만 로그인되고, 캐시된 토큰 검증 결과는 폐기되어야 함
+    assert change("test_password2", "new_password3").status_code == 200
+    assert user_cache.get(token) is None
+    response = client.post(
+        "/api/v1/auth/token",
+        data={"username": email, "password": "test_password2"},
+    )
+    assert response.status_code == 401
+    login_user(email, "new_password3")
+
 
 def test_rag_query_llm_error():
     headers = login_user("user1@example.com", "password123")
@@ -327,12 +428,14 @@ def test_rag_query_llm_error():
                 headers=headers,
             )
         assert response.status_code == 200
+        wait_for_ingest(response, headers)
     query = {
         "question": "고구려 장수왕은 누구입니까?",
         "thinking_mode": True,
     }
     with patch(
-        "app.core.rag_engine.cached_llm_response",
+        "app.core.rag_engine.acached_llm_response",
+        new_callable=AsyncMock,
         side_effect=Exception("LLM Error!"),
     ):
         response = client.post(
@@ -354,7 +457,7 @@ def test_rag_query_vectorstore_error():
     }
     # 벡터스토어에서 InvalidCollectionException 발생 모킹
     with patch(
-        "app.core.rag_engine.Chroma.similarity_search_with_score",
+        "app.core.rag_engine.Chroma.similarity_search_by_vector_with_relevance_scores",
         side_effect=Exception("Vectorstore Error!"),
     ):
         response = client.post(
@@ -372,7 +475,8 @@ def test_rag_query_unknown_error():
         "question": "알 수 없는 예외 테스트",
         "thinking_mode": True,
     }
-    # Chroma 생성에서 예외 발생 모킹
+    # Chroma 생성에서 예외 발생 모킹 (풀에 남은 핸들이 재사용되지 않도록 비움)
+    vectorstore_pool.clear()
     with patch(
         "app.core.rag_engine.Chroma",
         side_effect=Exception("Unknown Error!"),
@@ -527,6 +631,7 @@ def test_rag_query_thinking_mode_true_and_false():
                 headers=headers,
             )
         assert response.status_code == 200
+        wait_for_ingest(response, headers)
 
     # 추론 모드 (thinking_mode=True)
     query = {
@@ -552,3 +657,1020 @@ def test_rag_query_thinking_mode_true_and_false():
 
     # 정리: 업로드한 PDF 삭제
     client.post("/delete_pdf", params={"filename": "test_rag.pdf"}, headers=headers)
+
+
+def test_rag_query_stream():
+    headers = login_user("user1@example.com", "password123")
+    # PDF 업로드
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        create_test_pdf(tmp.name, text="테스트 PDF\n고구려 장수왕")
+        tmp.seek(0)
+        with open(tmp.name, "rb") as f:
+            response = client.post(
+                "/upload",
+                files={"file": ("test_rag.pdf", f, "application/pdf")},
+                headers=headers,
+            )
+        assert response.status_code == 200
+        wait_for_ingest(response, headers)
+
+    # 스트리밍 질의: sources 이벤트가 먼저, done 이벤트가 마지막에 와야 함
+    query = {
+        "question": "고구려 장수왕은 누구입니까?",
+        "thinking_mode": True,
+        "stream": True,
+    }
+    response = client.post("/api/v1/rag/query", json=query, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert events[0]["type"] == "sources"
+    assert len(events[0]["sources"]) > 0
+    assert events[-1]["type"] == "done"
+    assert events[-1]["answer"]
+    assert all(e["type"] in ("sources", "think", "answer", "done") for e in events)
+
+    # 정리: 업로드한 PDF 삭제
+    client.post("/delete_pdf", params={"filename": "test_rag.pdf"}, headers=headers)
+
+
+def test_ingest_job_status():
+    headers = login_user("user1@example.com", "password123")
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        create_test_pdf(tmp.name, text="테스트 PDF\n고구려 장수왕")
+        tmp.seek(0)
+        with open(tmp.name, "rb") as f:
+            response = client.post(
+                "/upload",
+                files={"file": ("test_job.pdf", f, "application/pdf")},
+                headers=headers,
+            )
+        assert response.status_code == 200
+        assert response.json()["job_id"]
+
+    # 작업이 완료되면 파일별 진행 상황과 결과가 기록되어 있어야 함
+    job = wait_for_ingest(response, headers)
+    assert job["status"] == "completed"
+    assert job["filenames"] == ["test_job.pdf"]
+    assert job["progress"]["total_chunks"] > 0
+    assert job["progress"]["embedded_chunks"] == job["progress"]["total_chunks"]
+    assert job["progress"]["files"]["test_job.pdf"]["status"] == "done"
+
+    # 다른 사용자는 작업을 조회할 수 없어야 함
+    other_headers = login_user("user2@example.com", "password456")
+    response = client.get(f"/ingest_jobs/{job['job_id']}", headers=other_headers)
+    assert response.status_code == 404
+
+    # 같은 내용을 다시 올리면 인덱싱 없이 응답하고, 다른 이름으로 올리면 거절해야 함
+    with open(tmp.name, "rb") as f:
+        response = client.post(
+            "/upload",
+            files={"file": ("test_job.pdf", f, "application/pdf")},
+            headers=headers,
+        )
+    assert response.status_code == 200
+    assert response.json()["job_id"] is None
+    with open(tmp.name, "rb") as f:
+        response = client.post(
+            "/upload",
+            files={"file": ("test_job_copy.pdf", f, "application/pdf")},
+            headers=headers,
+        )
+    assert response.status_code == 400
+    assert "test_job.pdf" in response.json()["detail"]
+
+    # 인덱싱된 청크 ID가 파일별로 기록되어 있어야 함
+    def chunk_count():
+        db = SessionLocal()
+        try:
+            return (
+                db.query(DocumentChunkDB)
+                .filter(DocumentChunkDB.filename == "test_job.pdf")
+                .count()
+            )
+        finally:
+            db.close()
+
+    assert chunk_count() == job["progress"]["total_chunks"]
+
+    # 삭제 시 기록된 청크 ID로 삭제되고 기록도 함께 제거되어야 함
+    response = client.post(
+        "/delete_pdf", params={"filename": "test_job.pdf"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert chunk_count() == 0
+
+
+def test_shared_pdf_across_users():
+    user1_headers = login_user("user1@example.com", "password123")
+    user2_headers = login_user("user2@example.com", "password456")
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        create_test_pdf(tmp.name, text=f"공유 문서 {uuid.uuid4()}\n가야 김수로왕")
+
+    def upload(headers):
+        with open(tmp.name, "rb") as f:
+            response = client.post(
+                "/upload",
+                files={"file": ("shared_doc.pdf", f, "application/pdf")},
+                headers=headers,
+            )
+        assert response.status_code == 200
+        return wait_for_ingest(response, headers)
+
+    # 두 번째 사용자의 같은 PDF는 공유 청크 캐시에서 벡터를 복사해야 함
+    job1 = upload(user1_headers)
+    hits = client.get("/api/v1/metrics", headers=user1_headers).json()["chunk_cache"][
+        "hits"
+    ]
+    job2 = upload(user2_headers)
+    assert job1["status"] == job2["status"] == "completed"
+    assert job2["progress"]["total_chunks"] == job1["progress"]["total_chunks"]
+    metrics = client.get("/api/v1/metrics", headers=user1_headers).json()
+    assert metrics["chunk_cache"]["hits"] == hits + 1
+
+    # 한 사용자가 삭제해도 다른 사용자의 파일과 청크는 남아 있어야 함
+    response = client.post(
+        "/delete_pdf", params={"filename": "shared_doc.pdf"}, headers=user1_headers
+    )
+    assert response.status_code == 200
+    assert "shared_doc.pdf" not in client.get(
+        "/pdf_list", headers=user1_headers
+    ).json()["pdfs"]
+    assert "shared_doc.pdf" in client.get(
+        "/pdf_list", headers=user2_headers
+    ).json()["pdfs"]
+    response = client.post(
+        "/delete_pdf", params={"filename": "shared_doc.pdf"}, headers=user2_headers
+    )
+    assert response.status_code == 200
+
+
+def test_rag_query_scheduler_saturated():
+    headers = login_user("user1@example.com", "password123")
+    query = {"question": "고구려 장수왕은 누구입니까?", "thinking_mode": True}
+    # 대기열이 가득 찬 경우 429와 Retry-After 헤더로 응답해야 함
+    with patch(
+        "app.core.rag_engine.aanswer",
+        new_callable=AsyncMock,
+        side_effect=SchedulerSaturated("generate", 7),
+    ):
+        response = client.post("/api/v1/rag/query", json=query, headers=headers)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+    # 지표는 로그인한 사용자만 조회할 수 있어야 함
+    assert client.get("/api/v1/metrics").status_code == 401
+
+    # 스케줄러 지표에 작업 종류별 대기열 상태가 포함되어야 함
+    response = client.get("/api/v1/metrics", headers=headers)
+    assert response.status_code == 200
+    classes = response.json()["scheduler"]["classes"]
+    assert set(classes) == {"generate", "query_embed", "ingest_embed"}
+
+
+def test_faiss_vector_index():
+    pytest.importorskip("faiss")
+    from app.core.vector_index import FaissIndexRegistry, FaissVectorIndex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = FaissVectorIndex(os.path.join(tmp, "rag_docs_shared"))
+        ids = [f"u{i % 2}-{i}" for i in range(40)]
+        vectors = [[float(i), float(i % 5), 1.0] for i in range(40)]
+        index.upsert(
+            ids=ids,
+            embeddings=vectors,
+            documents=[f"청크 {i}" for i in range(40)],
+            metadatas=[{"user_id": f"u{i % 2}", "page": i} for i in range(40)],
+        )
+        index.flush()
+
+        # user_id 조건을 주면 해당 사용자의 청크만 검색되어야 함
+        results = index.search_by_vector(vectors[7], k=3, where={"user_id": "u0"})
+        assert results and all(doc.metadata["user_id"] == "u0" for doc, _ in results)
+        assert index.search_by_vector(vectors[7], k=1)[0][0].id == "u1-7"
+
+        # 메모리 매핑된 스냅샷에 다시 쓰고, 삭제한 청크는 검색/조회에서 빠져야 함
+        index.upsert(
+            ids=["u1-7"], embeddings=[vectors[7]], documents=["새 청크"], metadatas=[{}]
+        )
+        index.delete(ids=ids[20:])
+        index.flush()
+        assert index.count() == 20
+        stored = index.get(ids=["u1-7", "u0-30"], include=["documents"])
+        assert stored["documents"] == ["새 청크"]
+        index.close()
+
+        # 새로 연 인덱스도 저장된 스냅샷으로 같은 결과를 반환해야 함
+        reopened = FaissVectorIndex(os.path.join(tmp, "rag_docs_shared"))
+        assert reopened.search_by_vector(vectors[7], k=1)[0][0].page_content == "새 청크"
+        reopened.close()
+
+        # 지표에는 컬렉션(사용자) 이름 없이 합계만 포함되어야 함
+        registry = FaissIndexRegistry(tmp)
+        registry.get("rag_docs_shared").search_by_vector(vectors[7], k=1)
+        stats = registry.stats()
+        assert stats["indexes"] == 1 and stats["alive"] == 20
+        assert "rag_docs_shared" not in str(stats)
+        registry.close()
+
+
+def test_blob_store_reupload_removes_orphaned_blob(monkeypatch):
+    from app.core import blob_store
+    from app.core.document_ingest import compute_file_hash
+
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setattr(blob_store, "BLOB_DIR", os.path.join(tmp, "blobs"))
+        dest = os.path.join(tmp, "doc.pdf")
+
+        def put(content: bytes, path: str) -> str:
+            temp = os.path.join(tmp, f".{uuid.uuid4().hex}.part")
+            Path(temp).write_bytes(content)
+            blob_store.store(temp, compute_file_hash(temp), path)
+            return blob_store.blob_path(compute_file_hash(path))
+
+        old = put(b"%PDF-1.4 old", dest)
+        shared = put(b"%PDF-1.4 shared", os.path.join(tmp, "other.pdf"))
+
+        # 같은 이름에 다른 내용을 올리면 더 이상 참조되지 않는 이전 원본은 삭제되어야 함
+        new = put(b"%PDF-1.4 new", dest)
+        assert not os.path.exists(old) and os.path.exists(new)
+
+        # 다른 파일이 링크하고 있는 원본은 덮어써도 남아 있어야 함
+        assert put(b"%PDF-1.4 shared", dest) == shared
+        assert not os.path.exists(new)
+        put(b"%PDF-1.4 again", dest)
+        assert os.path.exists(shared)
+        assert Path(dest).read_bytes() == b"%PDF-1.4 again"
+
+
+def _split_stream(chunks):
+    from app.core.think_splitter import ThinkStreamSplitter
+
+    splitter = ThinkStreamSplitter()
+    events = []
+    for chunk in chunks:
+        events += splitter.feed(chunk)
+    events += splitter.finish()
+    return splitter, events
+
+
+def test_think_stream_splitter_tags_across_chunks():
+    # 태그가 토큰 경계에서 잘려 들어와도 추론/답변을 나누어야 함
+    splitter, events = _split_stream(["  <thi", "nk>추론 ", "내용</th", "ink>\n답", "변"])
+    assert events == [
+        ("think", "추론 "),
+        ("think", "내용"),
+        ("answer", "답"),
+        ("answer", "변"),
+    ]
+    assert splitter.think_text == "추론 내용"
+    assert splitter.answer_text == "답변"
+
+    # 태그 앞에 다른 텍스트가 있으면 전체가 답변이어야 함
+    splitter, events = _split_stream(["hello <th", "ink>x</think> y"])
+    assert {kind for kind, _ in events} == {"answer"}
+    assert splitter.answer_text == "hello <think>x</think> y"
+
+
+def test_think_stream_splitter_matches_format_answer():
+    from app.core.rag_engine import _format_answer
+
+    texts = [
+        "<think>추론</think>답변",
+        "\n <think>\n추론\n</think>\n\n답변\n",
+        "hello <think>x</think> y",
+        "<think>닫는 태그 없음",
+        "<think></think>",
+        "태그 없는 답변",
+        "<think>a</think>b<think>c</think>d",
+        "<thin",
+        "",
+    ]
+    for text in texts:
+        expected = _format_answer(text, [], [])
+        # 한 번에, 한 글자씩, 3글자씩 나누어 들어와도 정규식 분리와 같은 결과여야 함
+        for size in (max(len(text), 1), 1, 3):
+            chunks = [text[i : i + size] for i in range(0, len(text), size)]
+            splitter, _ = _split_stream(chunks)
+            assert splitter.think_text.strip() == expected["think"], (text, size)
+            assert splitter.answer_text.strip() == expected["answer"], (text, size)
+
+
+def test_ingest_job_status_from_ingest_result():
+    from app.core import ingest_jobs
+    from app.core.document_ingest import IngestError
+
+    updates = []
+
+    def run(**patched):
+        updates.clear()
+        with patch.object(
+            ingest_jobs, "_update_job", lambda job_id, **f: updates.append(f)
+        ), patch.object(ingest_jobs, "ingest_documents", **patched):
+            ingest_jobs._run_job("job", "/nonexistent", "user")
+        return updates[-1]
+
+    # 작업 상태는 결과 메시지의 내용이 아니라 성공/예외 여부로 결정되어야 함
+    final = run(return_value="a.pdf 처리 중 오류 없이 저장되었습니다.")
+    assert final["status"] == "completed"
+    assert final["result"] == "a.pdf 처리 중 오류 없이 저장되었습니다."
+
+    final = run(side_effect=IngestError("유효한 문서 내용이 추출되지 않았습니다."))
+    assert final["status"] == "failed"
+    assert final["error"] == "유효한 문서 내용이 추출되지 않았습니다."
+
+
+def _collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+
+    return asyncio.create_task(run())
+
+
+def test_singleflight_coalesces_and_joins_in_flight_stream():
+    from app.core.singleflight import StreamSingleFlight
+
+    async def scenario():
+        flights = StreamSingleFlight("test")
+        release = asyncio.Event()
+        calls = []
+
+        async def source():
+            calls.append(1)
+            yield "a"
+            await release.wait()
+            yield "b"
+
+        first = _collect(flights.stream("k", source))
+        await asyncio.sleep(0.01)
+        # "a"가 이미 생성된 뒤 합류한 요청도 처음부터 같은 조각을 받아야 함
+        second = _collect(flights.stream("k", source))
+        assert flights.stats()["in_flight"] == 1
+        release.set()
+        assert await first == await second == ["a", "b"]
+        assert len(calls) == 1
+        assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 1}
+
+        # 완료된 뒤 같은 키로 요청하면 새로 생성해야 함
+        assert await _collect(flights.stream("k", source)) == ["a", "b"]
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_singleflight_cancels_when_all_subscribers_leave():
+    from app.core.singleflight import StreamSingleFlight
+
+    async def scenario():
+        flights = StreamSingleFlight("test")
+        cancelled = asyncio.Event()
+
+        async def source():
+            try:
+                yield "a"
+                await asyncio.Event().wait()
+            finally:
+                cancelled.set()
+
+        waiters = [_collect(flights.stream("k", source)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        # 한 요청만 끊기면 생성은 계속되어야 함
+        waiters[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+        assert flights.stats()["in_flight"] == 1
+
+        # 모든 요청이 끊기면 생성을 취소하고 등록을 해제해야 함
+        waiters[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert flights.stats()["in_flight"] == 0
+        for waiter in waiters:
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+    asyncio.run(scenario())
+
+
+class _FakeEmbeddings:
+    """텍스트 길이로 벡터를 만드는 임베딩. POISON이 든 배치는 실패하고 delay만큼 지연합니다."""
+
+    def __init__(self, delay=None):
+        self.delay = delay or (lambda texts: 0)
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(self.delay(texts))
+        if any("POISON" in text for text in texts):
+            raise ValueError("poisoned chunk")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class _FakeCollection:
+    def __init__(self, fail_ids=()):
+        self.rows = {}
+        self.fail_ids = set(fail_ids)
+        self.writes = []
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        if self.fail_ids & set(ids):
+            raise RuntimeError("disk full")
+        self.rows.update(zip(ids, embeddings))
+        self.writes.append(list(ids))
+
+
+def _docs(*texts):
+    from langchain_core.documents import Document
+
+    return [Document(page_content=text) for text in texts]
+
+
+def test_embedding_pipeline_adjusts_batch_size():
+    from app.core.embedding_pipeline import EmbeddingPipeline
+
+    pipeline = EmbeddingPipeline(
+        _FakeEmbeddings(),
+        _FakeCollection(),
+        min_batch=8,
+        max_batch=32,
+        initial_batch=16,
+        target_latency=1.0,
+    )
+    # 목표 지연 이내의 꽉 찬 배치는 min_batch씩 증가 (최대 max_batch)
+    pipeline._adjust(0.1, 16, ok=True)
+    assert pipeline.batch_size == 24
+    pipeline._adjust(0.1, 10, ok=True)
+    assert pipeline.batch_size == 24
+    pipeline._adjust(0.1, 24, ok=True)
+    pipeline._adjust(0.1, 32, ok=True)
+    assert pipeline.batch_size == 32
+    # 지연 초과나 실패 시 절반으로 감소 (최소 min_batch)
+    pipeline._adjust(5.0, 32, ok=True)
+    assert pipeline.batch_size == 16
+    pipeline._adjust(0.1, 16, ok=False)
+    pipeline._adjust(0.1, 8, ok=False)
+    assert pipeline.batch_size == 8
+    assert pipeline.close() == {}
+
+
+def test_embedding_pipeline_isolates_failed_chunks():
+    from app.core.embedding_pipeline import EmbeddingPipeline
+
+    embeddings = _FakeEmbeddings()
+    collection = _FakeCollection(fail_ids={"c-0"})
+    pipeline = EmbeddingPipeline(
+        embeddings, collection, min_batch=8, initial_batch=8, max_retries=0
+    )
+    ids = [f"{name}-{i}" for name in "ab" for i in range(4)]
+    pipeline.submit("a.pdf", _docs("a0", "a1", "POISON", "a3"), ids[:4])
+    pipeline.submit("b.pdf", _docs("b0", "b1", "b2", "b3"), ids[4:])
+    pipeline.submit("c.pdf", _docs("c0"), ["c-0"])
+    failures = pipeline.close()
+
+    # 원인 청크가 속한 파일과 저장에 실패한 파일만 실패로 기록되어야 함
+    assert set(failures) == {"a.pdf", "c.pdf"}
+    assert failures["a.pdf"].startswith("임베딩 실패")
+    assert failures["c.pdf"].startswith("벡터스토어 저장 실패")
+    assert set(collection.rows) == {"a-0", "a-1", "a-3", "b-0", "b-1", "b-2", "b-3"}
+    assert collection.rows["b-0"] == [2.0, 1.0]
+    # 8개 배치 -> 4+4 -> 2+2 -> 1+1로 나누어 원인 청크를 찾음
+    assert ["POISON"] in embeddings.calls
+
+
+def test_embedding_pipeline_progress_with_out_of_order_writes():
+    from app.core.embedding_pipeline import EmbeddingPipeline
+
+    # 첫 배치를 늦게 끝나게 하여 뒤 배치가 먼저 저장되도록 함
+    embeddings = _FakeEmbeddings(delay=lambda texts: 0.2 if "a0" in texts else 0)
+    collection = _FakeCollection()
+    progress = []
+    pipeline = EmbeddingPipeline(
+        embeddings,
+        collection,
+        concurrency=2,
+        min_batch=2,
+        max_batch=2,
+        initial_batch=2,
+        on_written=lambda key, written, expected: progress.append(
+            (key, written, expected)
+        ),
+    )
+    pipeline.submit("a.pdf", _docs("a0", "a1", "a2", "a3"), [f"a-{i}" for i in range(4)])
+    pipeline.submit_vectors("b.pdf", _docs("b0"), ["b-0"], [[0.0, 1.0]])
+    assert pipeline.close() == {}
+
+    writes = collection.writes
+    assert writes.index(["a-2", "a-3"]) < writes.index(["a-0", "a-1"])
+    # 저장 순서와 관계없이 파일별 저장 수는 누적되어 전체 청크 수에 도달해야 함
+    assert [written for key, written, _ in progress if key == "a.pdf"] == [2, 4]
+    assert {key: (written, expected) for key, written, expected in progress} == {
+        "a.pdf": (4, 4),
+        "b.pdf": (1, 1),
+    }
+
+
+def test_semantic_cache_threshold_validation_and_eviction(monkeypatch):
+    from app.core import semantic_cache
+
+    monkeypatch.setattr(semantic_cache, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(semantic_cache, "SEMANTIC_CACHE_THRESHOLD", 0.95)
+    monkeypatch.setattr(semantic_cache, "SEMANTIC_CACHE_MAX_ENTRIES", 2)
+    monkeypatch.setattr(semantic_cache, "SEMANTIC_CACHE_TTL_SECONDS", 86400)
+    user_id = f"cache-{uuid.uuid4().hex}"
+
+    def store(question, embedding, chunk_ids=("c1",)):
+        result = {"answer": f"{question} 답변", "think": "", "sources": []}
+        semantic_cache.store(
+            user_id, question, embedding, True, result, list(chunk_ids)
+        )
+
+    def lookup(embedding, thinking_mode=True, valid=True):
+        hit = semantic_cache.lookup(
+            user_id, embedding, thinking_mode, lambda ids: valid
+        )
+        return hit["answer"] if hit else None
+
+    def questions():
+        db = SessionLocal()
+        try:
+            rows = db.query(SemanticCacheDB).filter(SemanticCacheDB.user_id == user_id)
+            return sorted(row.question for row in rows)
+        finally:
+            db.close()
+
+    try:
+        store("q1", [1.0, 0.0, 0.0])
+        # 유사도가 임계값 이상이고 추론 모드가 같을 때만 적중해야 함
+        assert lookup([1.0, 0.1, 0.0]) == "q1 답변"
+        assert lookup([1.0, 1.0, 0.0]) is None
+        assert lookup([1.0, 0.0, 0.0], thinking_mode=False) is None
+
+        # 근거 청크가 삭제된 항목은 적중하지 않고 제거되어야 함
+        assert lookup([1.0, 0.0, 0.0], valid=False) is None
+        assert questions() == []
+
+        # TTL이 지난 항목은 조회되지 않고 다음 저장 때 제거되어야 함
+        store("q2", [0.0, 1.0, 0.0])
+        db = SessionLocal()
+        try:
+            db.query(SemanticCacheDB).filter(SemanticCacheDB.user_id == user_id).update(
+                {SemanticCacheDB.created_at: datetime.now() - timedelta(days=2)}
+            )
+            db.commit()
+        finally:
+            db.close()
+        assert lookup([0.0, 1.0, 0.0]) is None
+        store("q3", [0.0, 0.0, 1.0])
+        assert questions() == ["q3"]
+
+        # 최대 항목 수를 넘으면 오래된 항목부터 제거되어야 함
+        store("q4", [1.0, 0.0, 0.0])
+        store("q5", [0.0, 1.0, 0.0])
+        assert questions() == ["q4", "q5"]
+        assert lookup([0.0, 0.0, 1.0]) is None
+        assert lookup([0.0, 1.0, 0.0]) == "q5 답변"
+    finally:
+        semantic_cache.invalidate_user(user_id)
+
+
+def test_lexical_tokenizer_korean_particles_and_numbers():
+    from app.core.lexical_index import tokenize
+
+    tokens = tokenize("고구려 장수왕은 427년에 평양으로 천도하였다.")
+    # 조사 제거, 복합어 2글자 조각, 숫자+단위와 숫자만 토큰
+    assert {"장수왕", "장수", "수왕", "427년", "427", "평양", "천도"} <= set(tokens)
+    assert not {"장수왕은", "에", "평양으로"} & set(tokens)
+    assert tokenize("Version 1.5, 2,000명") == ["version", "1.5", "2,000명", "2,000"]
+
+
+def test_lexical_index_search_and_update(monkeypatch):
+    from app.core import lexical_index
+
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setattr(lexical_index, "LEXICAL_INDEX_DIR", tmp)
+        collection = f"lexical_{uuid.uuid4().hex}"
+        lexical_index.update(
+            collection,
+            {
+                "c1": "장수왕은 427년에 평양으로 천도하였다.",
+                "c2": "광개토대왕은 영토를 넓혔다.",
+                "c3": "고구려는 668년에 멸망하였다.",
+            },
+        )
+        # "427년" 질문은 "427년에"가 든 청크를 가장 먼저 찾아야 함
+        assert lexical_index.search(collection, "427년", 3)[0][0] == "c1"
+        assert lexical_index.search(collection, "장수왕이 천도한 곳", 3)[0][0] == "c1"
+        assert lexical_index.search(collection, "없는 단어", 3) == []
+
+        # 삭제/변경된 청크는 검색되지 않아야 함
+        lexical_index.update(collection, {"c3": "백제는 660년에 멸망하였다."}, ["c1"])
+        assert lexical_index.search(collection, "427년", 3) == []
+        assert [cid for cid, _ in lexical_index.search(collection, "660년", 3)] == ["c3"]
+        assert lexical_index.missing_ids(collection, ["c1", "c2"]) == ["c1"]
+
+
+def test_hybrid_search_rrf_fusion(monkeypatch):
+    from langchain_core.documents import Document
+    from app.core import rag_engine
+
+    class FakeVectorIndex:
+        def search_by_vector(self, embedding, k, where=None):
+            ranked = ["v1", "both", "v2"]
+            return [(Document(id=cid, page_content=cid), 0.0) for cid in ranked]
+
+        def get(self, ids, where=None, include=None):
+            return {"ids": ids, "documents": ids, "metadatas": [{} for _ in ids]}
+
+    monkeypatch.setattr(rag_engine, "HYBRID_SEARCH_ENABLED", True)
+    monkeypatch.setattr(rag_engine, "SEARCH_K", 3)
+    monkeypatch.setattr(rag_engine, "RRF_K", 60)
+    monkeypatch.setattr(
+        rag_engine.lexical_index,
+        "search",
+        lambda collection, query, k: [("both", 9.0), ("lex", 5.0)],
+    )
+    results = rag_engine._search(FakeVectorIndex(), "rag_docs_x", "427년", [0.0])
+
+    # 두 검색 모두에 나온 청크가 먼저, 키워드 전용 청크는 벡터스토어에서 본문을 가져옴
+    assert [doc.id for doc, _ in results] == ["both", "v1", "lex"]
+    assert results[0][1] == pytest.approx(1 / 62 + 1 / 61)
+    assert results[1][1] == pytest.approx(1 / 61)
+    assert results[2][1] == pytest.approx(1 / 62)
+    assert results[2][0].page_content == "lex"
+
+
+def test_ollama_pool_least_outstanding_and_affinity():
+    from app.core.ollama_pool import OllamaPool
+
+    pool = OllamaPool(["http://a", "http://b", "http://c"], 2, 15)
+    a, b, c = pool.backends
+
+    def choices(model="llm"):
+        return {pool._choose(model).url for _ in range(len(pool.backends) * 2)}
+
+    # 처리 중 요청이 가장 적은 엔드포인트를 골라야 함 (순환 시작점과 무관)
+    a.outstanding, b.outstanding, c.outstanding = 2, 0, 1
+    assert choices() == {"http://b"}
+
+    # 모델이 로드된 엔드포인트는 처리 중 요청 차이가 affinity_slack 이하이면 우선
+    a.loaded_models = {"llm:latest"}
+    assert choices("llm") == {"http://a"}
+    assert choices("other") == {"http://b"}
+    a.outstanding = 3
+    assert choices("llm") == {"http://b"}
+
+    # 비정상 엔드포인트는 제외하고, 모두 비정상이면 전체에서 고름
+    a.outstanding = 2
+    b.healthy = False
+    assert choices("other") == {"http://c"}
+    a.healthy = c.healthy = False
+    assert choices("other") == {"http://b"}
+
+
+def test_ollama_pool_lease_and_health_check():
+    import httpx
+    from app.core.ollama_pool import OllamaPool
+
+    pool = OllamaPool(["http://a", "http://b"], 2, 15)
+    a, b = pool.backends
+
+    # 성공한 요청은 모델을 로드된 것으로, 연결 오류는 엔드포인트를 비정상으로 기록
+    with pool.lease("llm") as backend:
+        assert backend.outstanding == 1
+    assert backend.outstanding == 0 and "llm:latest" in backend.loaded_models
+    with pytest.raises(ConnectionError):
+        with pool.lease("embed") as down:
+            raise ConnectionError("refused")
+    assert not down.healthy and down.failures == 1 and down.outstanding == 0
+    # 요청 자체의 오류는 엔드포인트 장애로 보지 않음 (비정상 엔드포인트는 선택되지 않음)
+    with pytest.raises(ValueError):
+        with pool.lease("embed") as up:
+            raise ValueError("bad request")
+    assert up is not down and up.healthy and up.failures == 0
+
+    # 헬스 체크가 상태와 로드된 모델 목록을 갱신해야 함
+    def handler(request):
+        if request.url.host == "a":
+            return httpx.Response(200, json={"models": [{"name": "qwen3:8b"}]})
+        raise httpx.ConnectError("down", request=request)
+
+    async def check():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await pool.check_health(client)
+
+    a.healthy, b.healthy = False, True
+    asyncio.run(check())
+    assert a.healthy and a.loaded_models == {"qwen3:8b"}
+    assert not b.healthy
+    assert [s["healthy"] for s in pool.stats()["backends"]] == [True, False]
+
+
+def test_vectorstore_routing_modes(monkeypatch):
+    from app.core import vectorstore_routing as routing
+
+    monkeypatch.setattr(routing, "VECTORSTORE_MODE", routing.PER_USER)
+    assert routing.vectorstore_name("u1") == "rag_docs_u1"
+    assert routing.vectorstore_name(None) == routing.DEFAULT_COLLECTION
+    assert routing.user_filter("u1") is None
+
+    monkeypatch.setattr(routing, "VECTORSTORE_MODE", routing.SHARED)
+    monkeypatch.setattr(routing, "VECTORSTORE_SHARDS", 1)
+    assert routing.vectorstore_name("u1") == "rag_docs_shared"
+    assert routing.user_filter("u1") == {"user_id": "u1"}
+    assert routing.user_filter(None) is None
+    # 인덱싱 기록/키워드 색인의 단위는 저장 방식과 관계없이 사용자별
+    assert routing.get_user_collection_name("u1") == "rag_docs_u1"
+
+    # 샤드 번호는 사용자별로 일정하고 범위 안에 있어야 함
+    monkeypatch.setattr(routing, "VECTORSTORE_SHARDS", 8)
+    users = [f"user-{i}" for i in range(200)]
+    shards = [routing.shard_index(user) for user in users]
+    assert shards == [routing.shard_index(user) for user in users]
+    assert set(shards) == set(range(8))
+    assert routing.vectorstore_name(users[0]) == f"rag_docs_shared_{shards[0]:03d}"
+
+
+def test_shared_collection_user_isolation(monkeypatch):
+    import chromadb
+    from chromadb.config import Settings
+    from langchain_chroma import Chroma
+    from app.core import rag_engine
+    from app.core import vectorstore_routing as routing
+    from app.core.vector_index import ChromaVectorIndex
+
+    monkeypatch.setattr(routing, "VECTORSTORE_MODE", routing.SHARED)
+    monkeypatch.setattr(routing, "VECTORSTORE_SHARDS", 1)
+    monkeypatch.setattr(rag_engine, "SEARCH_K", 5)
+    monkeypatch.setattr(rag_engine, "RAG_CANDIDATE_K", 5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client_db = chromadb.PersistentClient(
+            path=tmp, settings=Settings(anonymized_telemetry=False)
+        )
+        index = ChromaVectorIndex(
+            Chroma(client=client_db, collection_name=routing.vectorstore_name("u1"))
+        )
+        # 두 사용자가 같은 공유 컬렉션에 같은 내용(같은 벡터)의 청크를 저장
+        texts = {"u1": "백제 무령왕", "u2": "신라 진흥왕"}
+        for user_id, text in texts.items():
+            index.upsert(
+                ids=[f"{user_id}-{i}" for i in range(3)],
+                embeddings=[[1.0, float(i), 0.0] for i in range(3)],
+                documents=[f"{text} {i}" for i in range(3)],
+                metadatas=[{"user_id": user_id, "page": i} for i in range(3)],
+            )
+        assert routing.vectorstore_name("u2") == routing.vectorstore_name("u1")
+
+        # 다른 사용자의 청크 ID가 키워드 검색 결과에 섞여도 where 조건으로 걸러져야 함
+        monkeypatch.setattr(
+            rag_engine.lexical_index,
+            "search",
+            lambda collection, query, k: [("u2-0", 3.0), ("u1-2", 1.0)],
+        )
+        for hybrid in (False, True):
+            monkeypatch.setattr(rag_engine, "HYBRID_SEARCH_ENABLED", hybrid)
+            for user_id, text in texts.items():
+                results = rag_engine._search(
+                    index,
+                    routing.get_user_collection_name(user_id),
+                    "누가 왕입니까?",
+                    [1.0, 0.0, 0.0],
+                    routing.user_filter(user_id),
+                )
+                assert results
+                assert all(doc.metadata["user_id"] == user_id for doc, _ in results)
+                assert all(doc.page_content.startswith(text) for doc, _ in results)
+
+        # 한 사용자의 청크를 지워도 다른 사용자의 청크는 남아 있어야 함
+        index.delete(ids=[f"u1-{i}" for i in range(3)])
+        assert index.get(where={"user_id": "u1"})["ids"] == []
+        assert len(index.get(where=routing.user_filter("u2"))["ids"]) == 3
+
+
+def _chunk(text, score, page=0, start_index=None, source="a.pdf"):
+    from langchain_core.documents import Document
+
+    metadata = {"source": source, "page": page}
+    if start_index is not None:
+        metadata["start_index"] = start_index
+    return Document(page_content=text, metadata=metadata), score
+
+
+def test_pack_context_trims_overlap_by_start_index():
+    """start_index가 있으면 앞 청크와 겹치는 앞부분을 위치로 잘라냅니다."""
+    from app.core.context_packer import pack_context
+
+    body = "가" * 100 + "나" * 100 + "다" * 100
+    results = [
+        _chunk(body[100:300], 0.9, start_index=100),
+        _chunk(body[:200], 0.8, start_index=0),
+    ]
+    packed, stats = pack_context(results, budget_tokens=10_000)
+
+    assert [doc.page_content for doc, _ in packed] == [body[:200], "다" * 100]
+    assert stats["trimmed_chunks"] == 1
+    assert stats["dropped_budget"] == stats["dropped_overlap"] == 0
+    # 원본 청크는 바뀌지 않아야 함
+    assert results[0][0].page_content == body[100:300]
+
+
+def test_pack_context_text_overlap_fallback():
+    """start_index가 없으면 텍스트 비교로 오버랩과 포함된 청크를 찾습니다."""
+    from app.core.context_packer import pack_context
+
+    first = "alpha " * 10 + "shared overlap text between two chunks"
+    second = "shared overlap text between two chunks" + " omega" * 10
+    results = [
+        _chunk(first, 0.9),
+        _chunk(second, 0.8),
+        _chunk("alpha " * 5, 0.7),
+    ]
+    packed, stats = pack_context(results, budget_tokens=10_000)
+
+    texts = [doc.page_content for doc, _ in packed]
+    assert first in texts
+    assert ("omega " * 10).strip() in texts
+    assert stats["trimmed_chunks"] == 1
+    assert stats["dropped_overlap"] == 1
+
+
+def test_pack_context_min_score_ratio():
+    """최고 점수 대비 비율 미만인 청크는 제외됩니다."""
+    from app.core.context_packer import pack_context
+
+    results = [
+        _chunk("첫 번째", 1.0, page=0),
+        _chunk("두 번째", 0.5, page=1),
+        _chunk("세 번째", 0.3, page=2),
+    ]
+    packed, stats = pack_context(results, budget_tokens=10_000, min_score_ratio=0.4)
+
+    assert [doc.page_content for doc, _ in packed] == ["첫 번째", "두 번째"]
+    assert stats["dropped_low_score"] == 1
+
+
+def test_pack_context_keeps_top_chunk_over_budget():
+    """예산을 넘더라도 최고 점수 청크는 항상 포함됩니다."""
+    from app.core.context_packer import pack_context
+
+    results = [_chunk("가" * 500, 0.9, page=0), _chunk("나" * 10, 0.5, page=1)]
+    packed, stats = pack_context(results, budget_tokens=100)
+
+    assert [doc.page_content for doc, _ in packed] == ["가" * 500]
+    assert stats["dropped_budget"] == 1
+    assert stats["tokens_after"] == 500
+
+
+def test_pack_context_document_order():
+    """고른 청크는 점수와 관계없이 (파일, 페이지, 시작 위치) 순서로 정렬됩니다."""
+    from app.core.context_packer import pack_context
+
+    results = [
+        _chunk("b 파일", 0.9, source="b.pdf"),
+        _chunk("a 2쪽", 0.8, page=2),
+        _chunk("a 1쪽 뒤", 0.7, page=1, start_index=500),
+        _chunk("a 1쪽 앞", 0.6, page=1, start_index=0),
+    ]
+    packed, _ = pack_context(results, budget_tokens=10_000)
+
+    assert [doc.page_content for doc, _ in packed] == [
+        "a 1쪽 앞",
+        "a 1쪽 뒤",
+        "a 2쪽",
+        "b 파일",
+    ]
+
+
+def test_pack_context_does_not_trim_against_dropped_chunk():
+    """예산 때문에 빠진 청크와의 오버랩은 잘라내지 않아야 합니다."""
+    from app.core.context_packer import pack_context
+
+    body = "x" * 1220
+    # 낮은 점수 청크(0~1000)와 높은 점수 청크(800~1220)가 200자 겹침
+    results = [
+        _chunk(body[:1000], 0.5, start_index=0),
+        _chunk(body[800:], 0.9, start_index=800),
+    ]
+    packed, stats = pack_context(results, budget_tokens=300)
+
+    assert [doc.page_content for doc, _ in packed] == [body[800:]]
+    assert stats["dropped_budget"] == 1
+    assert stats["trimmed_chunks"] == 0
+    assert stats["tokens_after"] <= 300
+
+
+def test_cached_embeddings_async_disk_io_off_event_loop(tmp_path, monkeypatch):
+    """비동기 임베딩은 SQLite 디스크 캐시를 이벤트 루프가 아닌 스레드에서 읽고 씁니다."""
+    import threading
+
+    from langchain_core.embeddings import Embeddings
+
+    from app.core.embedding_cache import CachedEmbeddings
+
+    class LengthEmbeddings(Embeddings):
+        def __init__(self):
+            self.calls = 0
+
+        def embed_documents(self, texts):
+            self.calls += len(texts)
+            return [[float(len(text)), 1.0] for text in texts]
+
+        def embed_query(self, text):
+            return self.embed_documents([text])[0]
+
+    disk_threads = []
+    for name in ("_load", "_persist"):
+        original = getattr(CachedEmbeddings, name)
+
+        def traced(self, *args, _original=original):
+            disk_threads.append(threading.get_ident())
+            return _original(self, *args)
+
+        monkeypatch.setattr(CachedEmbeddings, name, traced)
+
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def run():
+        loop_thread = threading.get_ident()
+        first = CachedEmbeddings(LengthEmbeddings(), "m", disk_path=path)
+        vectors = await first.aembed_documents(["가나", "다", "가나"])
+        first.close()
+
+        # 새 인스턴스(재시작)는 메모리가 비어 있으므로 디스크에서 읽어야 함
+        base = LengthEmbeddings()
+        second = CachedEmbeddings(base, "m", disk_path=path)
+        query = await second.aembed_query("다")
+        again = await second.aembed_documents(["가나", "다"])
+        second.close()
+        return loop_thread, vectors, query, again, base.calls
+
+    loop_thread, vectors, query, again, calls = asyncio.run(run())
+
+    assert vectors == [[2.0, 1.0], [1.0, 1.0], [2.0, 1.0]]
+    assert query == [1.0, 1.0]
+    assert again == [[2.0, 1.0], [1.0, 1.0]]
+    assert calls == 0
+    assert disk_threads
+    assert loop_thread not in disk_threads
+
+
+def test_ingest_invalidates_caches_when_write_fails(tmp_path):
+    """쓰기 단계에서 오류가 나도 벡터스토어 풀과 답변 캐시는 폐기되어야 합니다."""
+    from unittest.mock import MagicMock
+
+    from app.core import document_ingest
+
+    services = MagicMock()
+    services.vectorstore.return_value.get.return_value = {"ids": [], "documents": []}
+    manifest = {"old.pdf": {"hash": "h", "chunk_ids": ["c1"]}}
+    invalidated = []
+    with patch.object(
+        document_ingest.document_index, "load_manifest", return_value=manifest
+    ), patch.object(
+        document_ingest.document_index,
+        "save_entries",
+        side_effect=RuntimeError("db down"),
+    ), patch.object(document_ingest.lexical_index, "update"), patch.object(
+        document_ingest.vectorstore_pool,
+        "invalidate",
+        side_effect=lambda name: invalidated.append(name),
+    ), patch.object(
+        document_ingest.semantic_cache,
+        "invalidate_user",
+        side_effect=lambda user_id: invalidated.append(user_id),
+    ):
+        # 문서 폴더가 비어 있으므로 old.pdf의 청크를 지우다가 기록 저장에서 실패
+        with pytest.raises(RuntimeError):
+            document_ingest._ingest_locked(str(tmp_path), "u1", "col", None, services)
+
+    services.vectorstore.return_value.delete.assert_called_once_with(ids=["c1"])
+    assert invalidated == [document_ingest.vectorstore_name("u1"), "u1"]
+
+
+def test_search_slots_follow_running_loop(monkeypatch):
+    """검색 세마포어는 실행 중인 루프마다 새로 만들어져 다른 루프에서도 사용할 수 있어야 합니다."""
+    from types import SimpleNamespace
+
+    from app.core import rag_engine, services as services_module
+
+    monkeypatch.setattr(services_module, "RAG_SEARCH_WORKERS", 1)
+    monkeypatch.setattr(services_module, "RAG_SEARCH_MAX_PENDING", 0)
+    # 클라이언트를 만들지 않도록 세마포어 상태만 가진 컨테이너 대역 사용
+    container = SimpleNamespace(_search_slots=None, _search_slots_loop=None)
+    container.search_slots = lambda: services_module.ServiceContainer.search_slots(
+        container
+    )
+
+    async def run():
+        # 슬롯이 하나뿐이므로 두 번째 검색은 세마포어에서 대기 (루프에 묶임)
+        return await asyncio.gather(
+            rag_engine._run_search(container, time.sleep, 0.05),
+            rag_engine._run_search(container, lambda: "done"),
+        )
+
+    first_slots = None
+    for _ in range(2):
+        assert asyncio.run(run()) == [None, "done"]
+        assert container._search_slots is not first_slots
+        first_slots = container._search_slots